@@ -0,0 +1,121 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import datetime as dt
+from threading import Lock
+
+OPTION_CHAIN_TTL = 30  # seconds
+
+
+def request_key(method, data):
+    """Cache key for an API call: hash of the method name and the request payload."""
+    payload = json.dumps({'method': method, 'data': data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _range_end_date(data):
+    """Last date a history request covers (range_to is a date string or an epoch, per date_format)."""
+    range_to = data.get('range_to')
+    if str(data.get('date_format', '0')) == '1':
+        return dt.date.fromisoformat(str(range_to)[:10])
+    return dt.datetime.fromtimestamp(int(range_to)).date()
+
+
+def history_ttl(data, today=None):
+    """
+    None (keep forever) for windows that ended before today, 0 (do not cache)
+    for windows that include today, whose bars are still forming.
+    """
+    today = today or dt.date.today()
+    try:
+        return None if _range_end_date(data) < today else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+class CachedFyers:
+    """
+    Wraps a FyersModel and caches `history` and `optionchain` responses on disk.
+
+    Responses are stored as gzip-compressed JSON under a hash of the request
+    payload. History windows that ended before today are kept permanently;
+    windows touching today are never cached. Option chains expire after
+    `option_chain_ttl` seconds. Only successful responses (s == 'ok') are stored.
+    Every other attribute is passed through to the wrapped model.
+    """
+    def __init__(self, fyers, cache_dir, option_chain_ttl=OPTION_CHAIN_TTL):
+        self._fyers = fyers
+        self.cache_dir = cache_dir
+        self.option_chain_ttl = option_chain_ttl
+        self.hits = {'history': 0, 'optionchain': 0}
+        self.misses = {'history': 0, 'optionchain': 0}
+        self._lock = Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self._fyers, name)
+
+    def _path(self, method, key):
+        return os.path.join(self.cache_dir, method, key[:2], f"{key}.json.gz")
+
+    def _load(self, method, key):
+        path = self._path(method, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable API cache entry {path}: {e}")
+            return None
+        if entry['ttl'] is not None and time.time() - entry['stored_at'] > entry['ttl']:
+            return None
+        return entry['response']
+
+    def _store(self, method, key, data, response, ttl):
+        path = self._path(method, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'stored_at': time.time(), 'ttl': ttl, 'request': data, 'response': response}, f,
+                      separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _cached_call(self, method, data, ttl):
+        if ttl == 0:
+            with self._lock:
+                self.misses[method] += 1
+            return getattr(self._fyers, method)(data=data)
+
+        key = request_key(method, data)
+        response = self._load(method, key)
+        with self._lock:
+            if response is not None:
+                self.hits[method] += 1
+            else:
+                self.misses[method] += 1
+        if response is not None:
+            return response
+
+        response = getattr(self._fyers, method)(data=data)
+        if isinstance(response, dict) and response.get('s') == 'ok':
+            self._store(method, key, data, response, ttl)
+        return response
+
+    def history(self, data):
+        return self._cached_call('history', data, history_ttl(data))
+
+    def optionchain(self, data):
+        return self._cached_call('optionchain', data, self.option_chain_ttl)
+
+    def stats(self):
+        with self._lock:
+            return {method: {'hits': self.hits[method], 'misses': self.misses[method]} for method in self.hits}
+
+    def print_stats(self):
+        for method, counts in self.stats().items():
+            total = counts['hits'] + counts['misses']
+            rate = counts['hits'] / total * 100 if total else 0.0
+            print(f"API cache {method}: {counts['hits']} hits, {counts['misses']} misses ({rate:.0f}% hit rate)")
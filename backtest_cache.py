@@ -0,0 +1,240 @@
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import argparse
+import datetime as dt
+
+from trade_manager import TradeManager
+
+# Modules whose source decides what a replayed day produces
+STRATEGY_MODULES = (
+    'candle_df_multiprocessor.py',
+    'enhanced_candle_manager.py',
+    'signal_generator.py',
+    'trade_manager.py',
+    'tick_replay.py',
+    'historical_bar_cache.py',
+    'fractals.py',
+    'jit_kernels.py',
+    'live_option_chain.py',
+    'instrument_master.py',
+    'greeks_engine.py',
+)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'backtest_cache')
+WARMUP_LOOKBACK_DAYS = 30
+LOSS_LIMIT_FRACTION = -0.05  # mirrors TradeManager.set_capital
+
+# Key components, in the order they are reported as the reason for a recompute
+KEY_COMPONENTS = (
+    ('tick_file', "tick file changed"),
+    ('strategy_source', "strategy source changed"),
+    ('params', "strategy parameters changed"),
+    ('warmup', "warm-up history changed"),
+    ('capital_tier', "capital tier changed"),
+)
+
+
+def _sha256_file(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def strategy_source_hash(modules=STRATEGY_MODULES):
+    """Hash of the strategy modules' source; any edit to them invalidates every day."""
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in modules:
+        digest.update(name.encode())
+        with open(os.path.join(base, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def first_limit_crossing(checks, capital):
+    """Index of the first loss-limit check that halts trading at `capital`, or None."""
+    limit = LOSS_LIMIT_FRACTION * capital
+    for i, pnl in enumerate(checks):
+        if pnl <= limit:
+            return i
+    return None
+
+
+class BacktestCache:
+    """
+    Content-addressed store of per-day backtest results.
+
+    A day's entry is keyed by the tick file's hash, the strategy parameters, the
+    warm-up history, the source of the strategy modules and the lot tier of the
+    starting capital. Within a tier, capital only matters through the daily loss
+    limit, so each entry also keeps the daily P&L at every loss-limit check and is
+    reused only if the limit for the new capital halts trading at the same check.
+
+    Layout: `entries/<key>.pkl` holds the result; `index.json` remembers, per tick
+    file, the last key and its components (to explain a recompute) and the file's
+    size/mtime/hash (to avoid re-hashing unchanged files).
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.entries_dir = os.path.join(self.cache_dir, 'entries')
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        os.makedirs(self.entries_dir, exist_ok=True)
+        self.index = self._load_index()
+        self.source_hash = strategy_source_hash()
+        self.report = []  # (file name, 'cached' | 'recomputed', reason)
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable cache index ({e}).")
+        return {'files': {}}
+
+    def save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.entries_dir, f"{key}.pkl")
+
+    # --- Keys ---
+
+    def tick_file_hash(self, file_path):
+        """sha256 of the tick file, reusing the stored hash while size and mtime are unchanged."""
+        stat = os.stat(file_path)
+        record = self.index['files'].setdefault(os.path.basename(file_path), {})
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        if record.get('stat') != stamp or 'sha256' not in record:
+            record['stat'] = stamp
+            record['sha256'] = _sha256_file(file_path)
+        return record['sha256']
+
+    def key_components(self, file_path, capital, params, bar_cache=None, trade_date=None):
+        warmup = None
+        if bar_cache is not None and trade_date is not None:
+            day_start = dt.datetime.combine(trade_date.date(), dt.time())
+            warmup = bar_cache.fingerprint(day_start - dt.timedelta(days=WARMUP_LOOKBACK_DAYS),
+                                           day_start - dt.timedelta(seconds=1))
+        return {
+            'tick_file': self.tick_file_hash(file_path),
+            'strategy_source': self.source_hash,
+            'params': json.dumps(params, sort_keys=True),
+            'warmup': warmup,
+            'capital_tier': TradeManager.lots_for_capital(capital),
+        }
+
+    @staticmethod
+    def make_key(components):
+        return hashlib.sha256(json.dumps(components, sort_keys=True).encode()).hexdigest()
+
+    # --- Lookup / store ---
+
+    def get(self, file_path, capital, components):
+        """Cached trades for the day, or None. Records why the day has to be recomputed."""
+        name = os.path.basename(file_path)
+        key = self.make_key(components)
+        entry = None
+        if os.path.exists(self._entry_path(key)):
+            try:
+                with open(self._entry_path(key), 'rb') as f:
+                    entry = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                print(f"Discarding unreadable cache entry for {name} ({e}).")
+
+        if entry is not None:
+            if first_limit_crossing(entry['loss_limit_checks'], capital) == entry['halted_at_check']:
+                self.report.append((name, 'cached', ''))
+                return entry['trades']
+            reason = "daily loss limit crossing changed"
+        else:
+            reason = self._miss_reason(name, components)
+        self.report.append((name, 'recomputed', reason))
+        return None
+
+    def _miss_reason(self, name, components):
+        previous = self.index['files'].get(name, {}).get('components')
+        if previous is None:
+            return "not cached"
+        for component, reason in KEY_COMPONENTS:
+            if previous.get(component) != components[component]:
+                return reason
+        return "entry missing"
+
+    def put(self, file_path, capital, components, trades, loss_limit_checks):
+        key = self.make_key(components)
+        entry = {
+            'file': os.path.basename(file_path),
+            'created': dt.datetime.now().isoformat(timespec='seconds'),
+            'capital': capital,
+            'trades': trades,
+            'loss_limit_checks': list(loss_limit_checks),
+            'halted_at_check': first_limit_crossing(loss_limit_checks, capital),
+        }
+        tmp_path = self._entry_path(key) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._entry_path(key))
+
+        record = self.index['files'].setdefault(entry['file'], {})
+        record['key'] = key
+        record['components'] = components
+
+    def print_report(self):
+        if not self.report:
+            return
+        cached = sum(1 for _, status, _ in self.report if status == 'cached')
+        print("\n--- Backtest Cache Report ---")
+        print(f"Reused {cached} of {len(self.report)} days from {self.cache_dir}")
+        for name, status, reason in self.report:
+            if status == 'recomputed':
+                print(f"  recomputed {name}: {reason}")
+
+    # --- Management ---
+
+    def stats(self):
+        entries = [f for f in os.listdir(self.entries_dir) if f.endswith('.pkl')]
+        size = sum(os.path.getsize(os.path.join(self.entries_dir, f)) for f in entries)
+        live = {record.get('key') for record in self.index['files'].values()}
+        stale = sum(1 for f in entries if f[:-4] not in live)
+        return {'entries': len(entries), 'stale_entries': stale, 'files_tracked': len(self.index['files']),
+                'size_mb': size / 1e6}
+
+    def prune(self):
+        """Removes entries that are no longer the latest key of any tick file."""
+        live = {record.get('key') for record in self.index['files'].values()}
+        removed = 0
+        for f in os.listdir(self.entries_dir):
+            if f.endswith('.pkl') and f[:-4] not in live:
+                os.remove(os.path.join(self.entries_dir, f))
+                removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.entries_dir, exist_ok=True)
+        self.index = {'files': {}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the per-day backtest result cache.")
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'])
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    cache = BacktestCache(args.cache_dir)
+    if args.command == 'stats':
+        for name, value in cache.stats().items():
+            print(f"{name:15s} {value:.2f}" if isinstance(value, float) else f"{name:15s} {value}")
+    elif args.command == 'prune':
+        print(f"Removed {cache.prune()} stale entries from {cache.cache_dir}")
+    else:
+        cache.clear()
+        print(f"Cleared {cache.cache_dir}")
@@ -0,0 +1,182 @@
+import os
+import json
+import argparse
+from threading import Lock
+import numpy as np
+import pandas as pd
+
+BAR_DTYPE = np.dtype([('ts', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                      ('close', '<f8'), ('volume', '<f8')])
+FIELD_COLUMNS = {'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'tradingVolume': 'volume'}
+MANIFEST_NAME = 'manifest.json'
+ARCHIVE_VERSION = 1
+
+
+def _symbol_dir(symbol):
+    return symbol.replace(':', '__').replace('/', '_')
+
+
+def to_records(df):
+    """OHLCV frame (HDF or lowercase column names, timestamp index) to a BAR_DTYPE array sorted by time."""
+    df = df.rename(columns=FIELD_COLUMNS)
+    index = pd.to_datetime(df.index).values.astype('datetime64[ns]')
+    order = np.argsort(index, kind='stable')
+    records = np.empty(len(df), dtype=BAR_DTYPE)
+    records['ts'] = index.view(np.int64)[order]
+    for name in BAR_DTYPE.names[1:]:
+        records[name] = df[name].to_numpy(dtype=np.float64)[order] if name in df.columns else np.nan
+    return records
+
+
+def to_frame(records):
+    """BAR_DTYPE array to a DataFrame with lowercase columns (this copies)."""
+    index = pd.DatetimeIndex(records['ts'].astype('datetime64[ns]'), name='timestamp')
+    return pd.DataFrame({name: records[name] for name in BAR_DTYPE.names[1:]}, index=index, copy=True)
+
+
+class BarArchive:
+    """
+    Per-symbol, per-year arrays of 1-minute bars (BAR_DTYPE) saved as .npy files,
+    with a manifest.json listing symbols, years, row counts and time spans.
+
+    Reads open the year files with np.memmap (read-only) and bisect on `ts`, so a
+    slice within one year is a view onto the mapped file: nothing is decompressed
+    or copied, and worker processes reading the same archive share the pages
+    through the OS cache.
+    """
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.manifest_path = os.path.join(archive_dir, MANIFEST_NAME)
+        self._maps = {}
+        self._lock = Lock()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f"Unsupported archive version {manifest.get('version')} in {self.manifest_path}")
+            return manifest
+        return {'version': ARCHIVE_VERSION, 'dtype': BAR_DTYPE.descr, 'symbols': {}}
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _year_path(self, symbol, year):
+        return os.path.join(self.archive_dir, _symbol_dir(symbol), f"{year}.npy")
+
+    # --- Writing ---
+
+    def write_symbol(self, symbol, df):
+        """Writes (replacing) the symbol's bars, one .npy file per calendar year."""
+        records = to_records(df)
+        years = records['ts'].astype('datetime64[ns]').astype('datetime64[Y]').astype(int) + 1970
+        os.makedirs(os.path.join(self.archive_dir, _symbol_dir(symbol)), exist_ok=True)
+
+        # Release our maps of the old files before replacing them
+        with self._lock:
+            self._maps = {k: v for k, v in self._maps.items() if k[0] != symbol}
+
+        entry = {}
+        starts = np.r_[0, np.flatnonzero(np.diff(years)) + 1] if len(records) else np.empty(0, dtype=int)
+        for first, chunk in zip(starts, np.split(records, starts[1:]) if len(records) else []):
+            year = int(years[first])
+            path = self._year_path(symbol, year)
+            tmp_path = path + '.tmp.npy'
+            np.save(tmp_path, chunk)
+            os.replace(tmp_path, path)
+            entry[str(year)] = {'rows': len(chunk),
+                                'first': str(pd.Timestamp(chunk['ts'][0])),
+                                'last': str(pd.Timestamp(chunk['ts'][-1]))}
+
+        self.manifest['symbols'][symbol] = {'dir': _symbol_dir(symbol), 'years': entry}
+        self._save_manifest()
+        return sum(e['rows'] for e in entry.values())
+
+    # --- Reading ---
+
+    def symbols(self):
+        return list(self.manifest['symbols'])
+
+    def years(self, symbol):
+        return sorted(int(y) for y in self.manifest['symbols'][symbol]['years'])
+
+    def year_array(self, symbol, year):
+        """The memory-mapped BAR_DTYPE array of one symbol-year (read-only)."""
+        key = (symbol, year)
+        with self._lock:
+            if key not in self._maps:
+                self._maps[key] = np.load(self._year_path(symbol, year), mmap_mode='r')
+            return self._maps[key]
+
+    def slices(self, symbol, start, end):
+        """Zero-copy views, one per year touched, of the bars with start <= ts <= end."""
+        start_ns = pd.Timestamp(start).value
+        end_ns = pd.Timestamp(end).value
+        views = []
+        for year in self.years(symbol):
+            if year < pd.Timestamp(start).year or year > pd.Timestamp(end).year:
+                continue
+            arr = self.year_array(symbol, year)
+            lo = np.searchsorted(arr['ts'], start_ns, side='left')
+            hi = np.searchsorted(arr['ts'], end_ns, side='right')
+            if hi > lo:
+                views.append(arr[lo:hi])
+        return views
+
+    def slice(self, symbol, start, end):
+        """
+        Bars with start <= ts <= end. A view when the range falls within one year;
+        a range spanning years is concatenated into a new array.
+        """
+        views = self.slices(symbol, start, end)
+        if not views:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return views[0] if len(views) == 1 else np.concatenate(views)
+
+    def frame(self, symbol, start, end):
+        """The same range as a DataFrame with lowercase OHLCV columns."""
+        return to_frame(self.slice(symbol, start, end))
+
+
+def build_from_hdf(hdf_file_path, archive_dir, symbols=None):
+    """Archives each symbol's `/{symbol}/historical_data` key of an HDF file."""
+    archive = BarArchive(archive_dir)
+    with pd.HDFStore(hdf_file_path, mode='r') as store:
+        keys = [k for k in store.keys() if k.endswith('/historical_data')]
+        for key in keys:
+            symbol = key.split('/')[1]
+            if symbols is not None and symbol not in symbols:
+                continue
+            rows = archive.write_symbol(symbol, store[key])
+            print(f"{symbol}: {rows} bars archived")
+    return archive
+
+
+def build_from_dict(stocks_dict, archive_dir):
+    """Archives a data_utilities-style dict {'/SYMBOL/...': df}."""
+    archive = BarArchive(archive_dir)
+    for key, df in stocks_dict.items():
+        symbol = key.split('/')[1] if key.startswith('/') else key
+        archive.write_symbol(symbol, df)
+    return archive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect a memory-mapped bar archive.")
+    parser.add_argument('archive_dir')
+    parser.add_argument('--from-hdf', help="HDF file whose /SYMBOL/historical_data keys are archived.")
+    parser.add_argument('--symbols', nargs='*', help="Only archive these symbols.")
+    args = parser.parse_args()
+
+    if args.from_hdf:
+        archive = build_from_hdf(args.from_hdf, args.archive_dir, set(args.symbols) if args.symbols else None)
+    else:
+        archive = BarArchive(args.archive_dir)
+    for symbol, entry in archive.manifest['symbols'].items():
+        rows = sum(e['rows'] for e in entry['years'].values())
+        print(f"{symbol:30s} {rows:10d} bars  years {', '.join(sorted(entry['years']))}")
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'tradingVolume')
+
+
+def _symbol_of(key):
+    """'/SBIN/historical_data' -> 'SBIN'; plain symbols are returned unchanged."""
+    return key.split('/')[1] if key.startswith('/') else key
+
+
+def _rolling(values, window):
+    """(symbol, time) -> (symbol, time, window) windows ending at each time, first window-1 padded with NaN."""
+    padded = np.concatenate([np.full((values.shape[0], window - 1), np.nan), values], axis=1)
+    return sliding_window_view(padded, window, axis=1)
+
+
+class BarPanel:
+    """
+    Aligned bars of many symbols at one timeframe: `values` is a contiguous
+    float64 array of shape (symbol, time, field), with `symbols` and `index`
+    (timestamps) as the axes. Missing bars are NaN.
+
+    Per-symbol frames and per-field matrices are views onto `values`;
+    indicators are computed for every symbol at once along the time axis.
+    """
+    def __init__(self, symbols, index, values, fields=FIELDS, timeframe=None):
+        self.symbols = pd.Index(symbols, name='symbol')
+        self.index = pd.DatetimeIndex(index, name='timestamp')
+        self.fields = tuple(fields)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.timeframe = timeframe
+        expected = (len(self.symbols), len(self.index), len(self.fields))
+        if self.values.shape != expected:
+            raise ValueError(f"values has shape {self.values.shape}, expected {expected}")
+
+    def __repr__(self):
+        span = f"{self.index[0]} .. {self.index[-1]}" if len(self.index) else "empty"
+        return f"BarPanel(timeframe={self.timeframe}, symbols={len(self.symbols)}, bars={len(self.index)}, {span})"
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    # --- Construction ---
+
+    @classmethod
+    def from_frames(cls, frames, fields=FIELDS, timeframe=None):
+        """dict{symbol or '/SYMBOL/...' key: OHLCV dataframe} -> panel on the union of their timestamps."""
+        symbols = [_symbol_of(key) for key in frames]
+        indexes = [pd.DatetimeIndex(df.index) for df in frames.values()]
+        index = indexes[0].append(indexes[1:]).unique().sort_values() if indexes else pd.DatetimeIndex([])
+        values = np.full((len(symbols), len(index), len(fields)), np.nan)
+        for i, (df, df_index) in enumerate(zip(frames.values(), indexes)):
+            rows = index.get_indexer(df_index)
+            for j, field in enumerate(fields):
+                if field in df.columns:
+                    values[i, rows, j] = df[field].to_numpy(dtype=np.float64)
+        return cls(symbols, index, values, fields, timeframe)
+
+    # --- Views ---
+
+    def symbol(self, symbol):
+        """One symbol's bars as a DataFrame backed by the panel (no copy; all-NaN rows included)."""
+        i = self.symbols.get_loc(symbol)
+        return pd.DataFrame(self.values[i], index=self.index, columns=list(self.fields), copy=False)
+
+    def field(self, field):
+        """(symbol, time) view of one field."""
+        return self.values[:, :, self.fields.index(field)]
+
+    def field_frame(self, field):
+        """One field as a DataFrame: timestamps down, symbols across."""
+        return pd.DataFrame(self.field(field).T, index=self.index, columns=self.symbols, copy=False)
+
+    def between(self, start, end):
+        """Panel of the bars with start <= timestamp <= end, sharing memory with this one."""
+        lo = self.index.searchsorted(pd.Timestamp(start), side='left')
+        hi = self.index.searchsorted(pd.Timestamp(end), side='right')
+        return BarPanel(self.symbols, self.index[lo:hi], self.values[:, lo:hi], self.fields, self.timeframe)
+
+    def select(self, symbols):
+        """Panel of a subset of symbols (copies)."""
+        rows = self.symbols.get_indexer(symbols)
+        if (rows < 0).any():
+            raise KeyError(f"Not in panel: {[s for s, r in zip(symbols, rows) if r < 0]}")
+        return BarPanel(self.symbols[rows], self.index, self.values[rows], self.fields, self.timeframe)
+
+    def to_frames(self, dropna=True):
+        """dict{symbol: dataframe} (copies), without the rows a symbol has no bar for."""
+        frames = {}
+        for symbol in self.symbols:
+            df = self.symbol(symbol).copy()
+            frames[symbol] = df.dropna(how='all') if dropna else df
+        return frames
+
+    def frame(self, array):
+        """Wraps a (symbol, time) indicator array as a DataFrame: timestamps down, symbols across."""
+        return pd.DataFrame(np.asarray(array).T, index=self.index, columns=self.symbols)
+
+    # --- Cross-sectional indicators (all symbols at once, (symbol, time) arrays) ---
+
+    def returns(self, periods=1, field='Close'):
+        values = self.field(field)
+        out = np.full(values.shape, np.nan)
+        out[:, periods:] = values[:, periods:] / values[:, :-periods] - 1.0
+        return out
+
+    def sma(self, window, field='Close'):
+        """Simple moving average; NaN until `window` bars (and across any missing bar), as pandas rolling."""
+        return _rolling(self.field(field), window).mean(axis=-1)
+
+    def willr(self, window=20):
+        """Williams %R over `window` bars, -100..0."""
+        highest = _rolling(self.field('High'), window).max(axis=-1)
+        lowest = _rolling(self.field('Low'), window).min(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (highest - self.field('Close')) / (highest - lowest) * -100.0
+
+    def rank(self, array):
+        """Cross-sectional rank at each timestamp, 0..1 (NaN stays NaN)."""
+        array = np.asarray(array, dtype=np.float64)
+        valid = ~np.isnan(array)
+        order = np.argsort(np.where(valid, array, np.inf), axis=0, kind='stable')
+        ranks = np.empty(array.shape)
+        np.put_along_axis(ranks, order, np.arange(array.shape[0], dtype=np.float64)[:, None], axis=0)
+        counts = valid.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(valid, ranks / np.maximum(counts - 1, 1), np.nan)
+
+    def zscore(self, array):
+        """Cross-sectional z-score at each timestamp."""
+        array = np.asarray(array, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (array - np.nanmean(array, axis=0)) / np.nanstd(array, axis=0)
+
+
+# --- Converters from the data_utilities outputs ---
+
+def from_resampled_dict(resampled, timeframe=None, fields=FIELDS):
+    """data_utilities.resampled_dict output {'/SYMBOL/...': df} -> BarPanel."""
+    return BarPanel.from_frames(resampled, fields, timeframe)
+
+
+def from_universe(universe, fields=FIELDS):
+    """data_utilities.resample_universe output {key: {timeframe: df}} -> {timeframe: BarPanel}."""
+    timeframes = list(next(iter(universe.values()))) if universe else []
+    return {tf: BarPanel.from_frames({key: frames[tf] for key, frames in universe.items()}, fields, tf)
+            for tf in timeframes}
+
+
+def from_combined(combined, timeframes=(5, 15, 30, 60), fields=FIELDS):
+    """data_utilities.combine_dicts output {symbol: [df_5, df_15, df_30, df_60]} -> {timeframe: BarPanel}."""
+    return {tf: BarPanel.from_frames({symbol: dfs[i] for symbol, dfs in combined.items() if dfs[i] is not None},
+                                     fields, tf)
+            for i, tf in enumerate(timeframes)}
+
+
+def from_weekly_monthly(pairs, fields=FIELDS):
+    """{key: resample_daily_to_weekly_monthly(df)} i.e. {key: (weekly_df, monthly_df)} -> {'W': panel, 'M': panel}."""
+    return {
+        'W': BarPanel.from_frames({key: weekly for key, (weekly, _) in pairs.items()}, fields, 'W'),
+        'M': BarPanel.from_frames({key: monthly for key, (_, monthly) in pairs.items()}, fields, 'M'),
+    }
@@ -0,0 +1,209 @@
+import os
+import json
+import datetime as dt
+from threading import Lock
+import pandas as pd
+
+from final_scripts.historical import full_df_generator
+from hdf_table_store import read_range, upsert_table
+
+STORE_DIR_NAME = 'bar_store'
+STORE_FILE_NAME = 'bars.h5'
+MANIFEST_NAME = 'manifest.json'
+
+
+def _to_date(value):
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def merge_ranges(ranges):
+    """Merges [start, end] date ranges (inclusive) that overlap or touch."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + dt.timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(covered, start, end):
+    """Parts of [start, end] (dates, inclusive) not inside any covered range."""
+    gaps, cursor = [], start
+    for lo, hi in merge_ranges(covered):
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - dt.timedelta(days=1)))
+        cursor = max(cursor, hi + dt.timedelta(days=1))
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class LocalBarStore:
+    """
+    On-disk OHLCV store per (symbol, resolution) that remembers which dates it covers.
+
+    Bars are kept in one HDF file (key `/{symbol}/r{resolution}`, same columns as
+    index_data.h5) next to a manifest.json of covered date ranges. `read` fetches
+    only the uncovered dates from the API, merges them in and serves the rest from
+    disk. Today is never marked covered, since its bars are still forming.
+
+    A store made with `seed_hdf_path` imports each symbol's `/{symbol}/historical_data`
+    from that file (e.g. index_data.h5) on first use, and again when the file changes.
+    """
+    def __init__(self, store_dir, seed_hdf_path=None):
+        self.store_dir = store_dir
+        self.store_path = os.path.join(store_dir, STORE_FILE_NAME)
+        self.manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+        self.seed_hdf_path = seed_hdf_path
+        self._lock = Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    @classmethod
+    def for_hdf(cls, hdf_file_path):
+        """The store kept beside an index_data.h5, seeded from it."""
+        return cls(os.path.join(os.path.dirname(os.path.abspath(hdf_file_path)), STORE_DIR_NAME),
+                   seed_hdf_path=hdf_file_path)
+
+    # --- Manifest ---
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, 'r') as f:
+            raw = json.load(f)
+        for entry in raw.values():
+            entry['covered'] = [[dt.date.fromisoformat(lo), dt.date.fromisoformat(hi)] for lo, hi in entry['covered']]
+        return raw
+
+    def _save_manifest(self):
+        raw = {name: dict(entry, covered=[[lo.isoformat(), hi.isoformat()] for lo, hi in entry['covered']])
+               for name, entry in self.manifest.items()}
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(raw, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _key(symbol, resolution):
+        return f"/{symbol}/r{resolution}"
+
+    def coverage(self, symbol, resolution='1'):
+        entry = self.manifest.get(self._key(symbol, resolution))
+        return [] if entry is None else [tuple(r) for r in entry['covered']]
+
+    # --- Storage ---
+
+    def _read_local(self, symbol, resolution):
+        key = self._key(symbol, resolution)
+        if key not in self.manifest or not os.path.exists(self.store_path):
+            return pd.DataFrame()
+        return pd.read_hdf(self.store_path, key=key).sort_index()
+
+    def _merge(self, symbol, resolution, new_df, covered):
+        """Upserts new bars into the stored table (no full rewrite) and extends the covered ranges."""
+        key = self._key(symbol, resolution)
+        if new_df is not None and not new_df.empty:
+            upsert_table(new_df, self.store_path, key)
+        entry = self.manifest.setdefault(key, {'covered': []})
+        entry['covered'] = merge_ranges(entry['covered'] + [list(r) for r in covered])
+        self._save_manifest()
+
+    def _sync_seed(self, symbol, resolution):
+        """Imports the seed HDF's history for the symbol when it is new or has changed."""
+        if self.seed_hdf_path is None or str(resolution) != '1' or not os.path.exists(self.seed_hdf_path):
+            return
+        key = self._key(symbol, resolution)
+        stamp = os.path.getmtime(self.seed_hdf_path)
+        entry = self.manifest.get(key, {})
+        if entry.get('seed_mtime') == stamp:
+            return
+        try:
+            seed_df = pd.read_hdf(self.seed_hdf_path, key=f"/{symbol}/historical_data")
+        except (KeyError, OSError) as e:
+            print(f"Bar store: no seed history for {symbol} ({e}).")
+            return
+        covered = []
+        if not seed_df.empty:
+            seed_df = seed_df.sort_index()
+            last_complete = min(seed_df.index[-1].date(), dt.date.today() - dt.timedelta(days=1))
+            covered = [(seed_df.index[0].date(), last_complete)]
+        print(f"Bar store: importing {len(seed_df)} {symbol} bars from {self.seed_hdf_path}")
+        self._merge(symbol, resolution, seed_df, covered)
+        self.manifest[key]['seed_mtime'] = stamp
+        self._save_manifest()
+
+    def write(self, symbol, resolution, df, covered=()):
+        """Merges bars built elsewhere (e.g. weekly rollups) into the store, marking `covered` date ranges."""
+        with self._lock:
+            self._merge(symbol, resolution, df, covered)
+
+    # --- Reads ---
+
+    def read(self, symbol, start, end, resolution='1', fyers=None):
+        """
+        Bars with start <= timestamp <= end, fetching uncovered dates first when a
+        `fyers` model is given. Columns are as in index_data.h5 (Open, High, ...).
+        """
+        with self._lock:
+            self._sync_seed(symbol, resolution)
+            gaps = missing_ranges(self.coverage(symbol, resolution), _to_date(start), _to_date(end))
+            if gaps and fyers is None:
+                print(f"Bar store: {len(gaps)} uncovered range(s) for {symbol} and no API session; serving local bars only.")
+            elif gaps:
+                self._fill_gaps(symbol, resolution, gaps, fyers)
+            if self._key(symbol, resolution) not in self.manifest or not os.path.exists(self.store_path):
+                return pd.DataFrame()
+            # Range read pushed down to the table, so only the window is loaded
+            return read_range(self.store_path, self._key(symbol, resolution), start, end)
+
+    def read_stored(self, symbol, start, end, resolution='1'):
+        """Stored bars with start <= timestamp <= end, without fetching or syncing anything."""
+        with self._lock:
+            if self._key(symbol, resolution) not in self.manifest or not os.path.exists(self.store_path):
+                return pd.DataFrame()
+            return read_range(self.store_path, self._key(symbol, resolution), start, end)
+
+    def read_all(self, symbol, resolution='1'):
+        """Everything stored for the symbol (after syncing the seed file)."""
+        with self._lock:
+            self._sync_seed(symbol, resolution)
+            return self._read_local(symbol, resolution)
+
+    def _fill_gaps(self, symbol, resolution, gaps, fyers):
+        today = dt.date.today()
+        for gap_start, gap_end in gaps:
+            print(f"Bar store: fetching {symbol} {gap_start} -> {gap_end} from the API")
+            try:
+                df = full_df_generator(symbol, None, resolution, fyers, start_date=gap_start, end_date=gap_end,
+                                       verbose=False, raise_on_failure=True)
+            except RuntimeError as e:
+                print(f"Bar store: {e}. Leaving the range uncovered.")
+                continue
+            # Only dates that are over count as covered; today is refetched next time
+            covered_end = min(gap_end, today - dt.timedelta(days=1))
+            covered = [(gap_start, covered_end)] if covered_end >= gap_start else []
+            self._merge(symbol, resolution, df, covered)
+
+
+# --- Shared stores ---
+
+_stores = {}
+_stores_lock = Lock()
+
+def get_bar_store(hdf_file_path):
+    """Returns the process-wide store kept beside `hdf_file_path`."""
+    key = os.path.abspath(hdf_file_path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = LocalBarStore.for_hdf(hdf_file_path)
+        return _stores[key]
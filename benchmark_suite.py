@@ -0,0 +1,363 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import contextlib
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+from candle_df_multiprocessor import MultiTimeframeProcessor
+from historical_bar_cache import HistoricalBarCache, register_bar_cache
+from full_backtest_runner import run_backtest_day
+from tick_generator import SyntheticTickGenerator
+
+INDEX_SYMBOL = 'NSE:NIFTY50-INDEX'
+SYNTHETIC_HDF = 'synthetic://benchmark'
+BENCH_DAY = dt.datetime(2025, 12, 2)  # a Tuesday, so capital-based lot sizing applies
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+
+
+# --- Synthetic, seeded data ---
+
+def synthetic_history(days, end_date=BENCH_DAY, seed=7, start_price=24000.0):
+    """Seeded random-walk 1-minute bars for the `days` weekdays before `end_date`."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp(end_date) - pd.Timedelta(days=1), periods=days)
+    index = (dates.values[:, None] + np.timedelta64(555, 'm') + np.arange(375) * np.timedelta64(1, 'm')).ravel()
+    close = start_price + np.cumsum(rng.normal(0, 4, len(index)))
+    spread = np.abs(rng.normal(0, 3, len(index)))
+    df = pd.DataFrame({
+        'open': np.r_[start_price, close[:-1]],
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(1000, 5000, len(index)).astype(float),
+    }, index=pd.DatetimeIndex(index, name='timestamp'))
+    df['high'] = df[['open', 'high', 'close']].max(axis=1)
+    df['low'] = df[['open', 'low', 'close']].min(axis=1)
+    return df
+
+
+def synthetic_ticks(n_symbols, n_ticks, day=BENCH_DAY, seed=11, start_price=24000.0):
+    """Seeded Fyers-format ticks: the index plus the `n_symbols - 1` options nearest ATM, over the whole session."""
+    generator = SyntheticTickGenerator(day.date(), spot=start_price, strikes_per_side=n_symbols // 4 + 1,
+                                       ticks_per_second=n_ticks / (n_symbols * 375 * 60),
+                                       max_options=n_symbols - 1, seed=seed)
+    return list(generator.iter_ticks())
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences the pipeline's console output while timing."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _history_cache(days=40):
+    cache = HistoricalBarCache(synthetic_history(days))
+    register_bar_cache(SYNTHETIC_HDF, INDEX_SYMBOL, cache)
+    return cache
+
+
+def _warm_processor(cache, plotter=None):
+    processor = MultiTimeframeProcessor(timeframes=[1, 3], trading_timeframe=3, hdf_file_path=SYNTHETIC_HDF,
+                                        mode='test', plotter=plotter)
+    signal_generator = processor.signal_generator
+    seed = cache.seed_for_date(BENCH_DAY, timeframe=3, fractal_length=signal_generator.fractal_length)
+    signal_generator.load_pre_fetched_data(seed['bars_1m'], df_tf=seed['bars'], fractal_seed=(seed['up'], seed['down']))
+    processor.trade_manager.set_capital(25000.0)
+    return processor
+
+
+# --- Scenarios ---
+# Each returns {metric_name: (value, unit, higher_is_better)}
+
+def bench_process_tick(repeats, n_ticks=20000):
+    results = {}
+    with quiet():
+        cache = _history_cache()
+    for n_symbols in (1, 40, 200):
+        ticks = synthetic_ticks(n_symbols, n_ticks)
+        rates = []
+        for _ in range(repeats):
+            with quiet():
+                processor = _warm_processor(cache)
+                t0 = time.perf_counter()
+                for tick in ticks:
+                    processor.process_tick(message=tick)
+                elapsed = time.perf_counter() - t0
+            rates.append(n_ticks / elapsed)
+        results[f'process_tick_{n_symbols}_symbols'] = (statistics.median(rates), 'ticks/s', True)
+    return results
+
+
+def bench_append_candle(repeats, n_candles=30):
+    results = {}
+    for n_bars in (500, 2000, 8000):
+        history = synthetic_history(n_bars * 3 // 375 + 2)
+        with quiet():
+            processor = MultiTimeframeProcessor(timeframes=[1, 3], trading_timeframe=3, hdf_file_path=SYNTHETIC_HDF, mode='test')
+            processor.signal_generator.load_pre_fetched_data(history)
+        base_1m = processor.signal_generator.dataframes[1]
+        base_tf = processor.signal_generator.dataframes[3]
+        last = base_tf.index[-1]
+        candles = [{'timestamp': last + pd.Timedelta(minutes=3 * (i + 1)), 'open': 24000.0, 'high': 24010.0,
+                    'low': 23990.0, 'close': 24000.0 + i, 'volume': 1000.0} for i in range(n_candles)]
+        costs = []
+        for _ in range(repeats):
+            signal_generator = processor.signal_generator
+            signal_generator.dataframes[1] = base_1m
+            signal_generator.dataframes[3] = base_tf.copy()
+            signal_generator.awaiting_breakout = None
+            with quiet():
+                t0 = time.perf_counter()
+                for candle in candles:
+                    signal_generator._append_candle_to_df(3, candle)
+                costs.append((time.perf_counter() - t0) / n_candles * 1000)
+        results[f'append_candle_{n_bars}_bars'] = (statistics.median(costs), 'ms/candle', False)
+    return results
+
+
+def bench_historical_fractals(repeats, days=30):
+    history = synthetic_history(days)
+    with quiet():
+        processor = MultiTimeframeProcessor(timeframes=[1, 3], trading_timeframe=3, hdf_file_path=SYNTHETIC_HDF, mode='test')
+        processor.signal_generator.load_pre_fetched_data(history)
+    costs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        processor.signal_generator._calculate_historical_fractals()
+        costs.append((time.perf_counter() - t0) * 1000)
+    return {f'historical_fractals_{days}_days': (statistics.median(costs), 'ms', False)}
+
+
+def bench_jit_kernels(repeats, n_bars=100000, n_ticks=200000):
+    """Parity of the kernel backends (and of the Supertrend with pandas_ta), then their speed."""
+    import jit_kernels
+    from fractals import fractal_flags
+
+    rng = np.random.default_rng(5)
+    close = 24000 + np.cumsum(rng.normal(0, 5, n_bars))
+    high, low = close + rng.uniform(0, 8, n_bars), close - rng.uniform(0, 8, n_bars)
+    atr = pd.Series(high - low).rolling(10).mean().to_numpy()
+    up, down = fractal_flags(high, low, window=5, strict=False)
+    premium = np.maximum(120 + np.cumsum(rng.normal(0, 0.3, n_ticks)), 0.05)
+    eod = np.zeros(n_ticks, dtype=bool)
+    eod[-1000:] = True
+    tp_levels = np.array([144.0, 156.0, 168.0])
+
+    kernels = {
+        'supertrend': lambda backend: jit_kernels.supertrend(high, low, close, atr, 3.0, backend=backend),
+        'confirm_fractals': lambda backend: jit_kernels.confirm_fractals(up, down, high, low, 5, backend=backend),
+        'simulate_exits': lambda backend: jit_kernels.simulate_exits(premium, eod, 120.0, tp_levels, backend=backend),
+        'simulate_exits_at_level': lambda backend: jit_kernels.simulate_exits(premium, eod, 120.0, tp_levels,
+                                                                              fill_at_level=True, backend=backend),
+    }
+    results = {'jit_warmup': (jit_kernels.warmup(verbose=False), 's', False)}
+
+    outputs = {backend: {name: run(backend) for name, run in kernels.items()} for backend in jit_kernels.BACKENDS}
+    reference = outputs['python']
+    for backend, produced in outputs.items():
+        for name, values in produced.items():
+            for got, want in zip(values, reference[name]):
+                np.testing.assert_allclose(got, want, equal_nan=True, err_msg=f"{name}: {backend} != python")
+    print(f"  - kernel parity OK ({', '.join(jit_kernels.BACKENDS)})")
+
+    # What SignalGenerator._supertrend trades on, against the pandas_ta column it replaced.
+    # Bar 0 is the one known difference: NaN from the kernel, 0 from pandas_ta.
+    import pandas_ta as ta
+    bars = pd.DataFrame({'high': high[:20000], 'low': low[:20000], 'close': close[:20000]})
+    expected = ta.supertrend(bars['high'], bars['low'], bars['close'], length=10, multiplier=3.0)['SUPERT_10_3.0']
+    bars_atr = ta.atr(bars['high'], bars['low'], bars['close'], length=10)
+    for backend in jit_kernels.BACKENDS:
+        trend, _ = jit_kernels.supertrend(bars['high'], bars['low'], bars['close'], bars_atr, 3.0, backend=backend)
+        np.testing.assert_allclose(trend[1:], expected.to_numpy()[1:], rtol=1e-9, equal_nan=True,
+                                   err_msg=f"supertrend: {backend} != pandas_ta")
+    print("  - supertrend matches pandas_ta (from bar 1)")
+
+    for backend in jit_kernels.BACKENDS:
+        for name, run in kernels.items():
+            costs = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                run(backend)
+                costs.append((time.perf_counter() - t0) * 1000)
+            results[f'{name}_{backend}'] = (statistics.median(costs), 'ms', False)
+    return results
+
+
+def bench_plot_render(repeats):
+    from plotly_live_plotter import DashPlotter
+
+    with quiet():
+        cache = _history_cache()
+        plotter = DashPlotter(start_server=False)
+        processor = _warm_processor(cache, plotter=plotter)
+        for tick in synthetic_ticks(40, 4000):
+            processor.process_tick(message=tick)
+        processor.signal_generator._update_plotter()
+    costs, patch_costs = [], []
+    for n in range(repeats):
+        t0 = time.perf_counter()
+        _, _, state = plotter.update_graph_and_table(n)
+        costs.append((time.perf_counter() - t0) * 1000)
+        # A forming candle moving: the browser gets a patch of its last bar
+        partial = processor.candle_manager.get_partial_candle(INDEX_SYMBOL, 3)
+        if partial is None:
+            continue
+        plotter.update_partial_candle(partial)
+        t0 = time.perf_counter()
+        plotter.update_graph_and_table(n, state)
+        patch_costs.append((time.perf_counter() - t0) * 1000)
+    return {'update_graph_and_table': (statistics.median(costs), 'ms', False),
+            'update_graph_patch': (statistics.median(patch_costs) if patch_costs else float('nan'), 'ms', False)}
+
+
+def bench_backtest_day(repeats, n_symbols=40, n_ticks=60000):
+    results = {}
+    with quiet():
+        cache = _history_cache()
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, f"ws_{BENCH_DAY.strftime('%m%d%y')}_synthetic.txt")
+        with open(file_path, 'w') as f:
+            for tick in synthetic_ticks(n_symbols, n_ticks):
+                f.write(json.dumps(tick) + "\n")
+        for label, fast_forward in (('full', False), ('fast', True)):
+            costs = []
+            for _ in range(repeats):
+                with quiet():
+                    t0 = time.perf_counter()
+                    run_backtest_day(file_path, 25000.0, SYNTHETIC_HDF, fast_forward=fast_forward, bar_cache=cache)
+                    costs.append(time.perf_counter() - t0)
+            results[f'backtest_day_{label}'] = (statistics.median(costs), 's/day', False)
+    return results
+
+
+def bench_recorded_day(repeats, tick_file):
+    """Throughput and replay time on a recorded tick file (no history warm-up)."""
+    from tick_replay import load_tick_log
+
+    tick_log = load_tick_log(tick_file)
+    ticks = list(tick_log.iter_messages())
+    rates, costs = [], []
+    for _ in range(repeats):
+        failures, first_error = 0, None
+        with quiet():
+            processor = MultiTimeframeProcessor(timeframes=[1, 3], trading_timeframe=3, hdf_file_path=SYNTHETIC_HDF, mode='test')
+            t0 = time.perf_counter()
+            for tick in ticks:
+                try:
+                    processor.process_tick(message=tick)
+                except Exception as e:
+                    failures += 1
+                    first_error = first_error or e
+            rate = len(ticks) / (time.perf_counter() - t0)
+        # A failing tick returns early, so the rate would look better than the real pipeline
+        if failures:
+            raise RuntimeError(f"recorded day: {failures} of {len(ticks)} ticks raised in process_tick "
+                               f"({rate:,.0f} ticks/s is not meaningful); first error: {first_error!r}") from first_error
+        rates.append(rate)
+        with quiet():
+            t0 = time.perf_counter()
+            run_backtest_day(tick_file, 25000.0, SYNTHETIC_HDF, fast_forward=True)
+            costs.append(time.perf_counter() - t0)
+    return {
+        'recorded_process_tick': (statistics.median(rates), 'ticks/s', True),
+        'recorded_backtest_day_fast': (statistics.median(costs), 's/day', False),
+    }
+
+
+SCENARIOS = {
+    'process_tick': bench_process_tick,
+    'append_candle': bench_append_candle,
+    'historical_fractals': bench_historical_fractals,
+    'plot_render': bench_plot_render,
+    'backtest_day': bench_backtest_day,
+    'jit_kernels': bench_jit_kernels,
+}
+
+
+# --- Baselines and reporting ---
+
+def run_benchmarks(names, repeats, tick_file=None):
+    results = {}
+    scenarios = [(name, lambda name=name: SCENARIOS[name](repeats)) for name in names]
+    if tick_file:
+        scenarios.append(('recorded_day', lambda: bench_recorded_day(repeats, tick_file)))
+    for name, scenario in scenarios:
+        print(f"Running {name}...")
+        t0 = time.perf_counter()
+        try:
+            results.update(scenario())
+        except ImportError as e:
+            print(f"  - Skipped {name}: {e}")
+            continue
+        print(f"  - done in {time.perf_counter() - t0:.1f}s")
+    return results
+
+
+def regression_report(results, baseline, tolerance):
+    """Prints current vs baseline per metric; returns the names of regressed metrics."""
+    regressions = []
+    print("\n" + "=" * 86)
+    print(f"{'Metric':<34}{'Baseline':>14}{'Current':>14}{'Change':>10}  Status")
+    print("=" * 86)
+    for metric, (value, unit, higher_is_better) in results.items():
+        base = baseline.get(metric)
+        if base is None:
+            print(f"{metric:<34}{'-':>14}{value:>14.3f}{'':>10}  NEW ({unit})")
+            continue
+        change = (value - base['value']) / base['value'] if base['value'] else 0.0
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            status = "REGRESSION"
+            regressions.append(metric)
+        elif worse < -tolerance:
+            status = "IMPROVED"
+        else:
+            status = "OK"
+        print(f"{metric:<34}{base['value']:>14.3f}{value:>14.3f}{change:>+10.1%}  {status} ({unit})")
+    print("=" * 86)
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)['metrics']
+
+
+def save_baseline(results, path):
+    payload = {
+        'created': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'metrics': {m: {'value': v, 'unit': u, 'higher_is_better': h} for m, (v, u, h) in results.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    print(f"Baseline saved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the tick pipeline and strategy hot paths.")
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all): {', '.join(SCENARIOS)}.")
+    parser.add_argument('--repeats', type=int, default=3, help="Repetitions per scenario; the median is reported.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+    parser.add_argument('--tick-file', help="Also benchmark a recorded tick file (JSON lines or .ticks.npz).")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(args.scenarios or list(SCENARIOS), args.repeats, tick_file=args.tick_file)
+    regressions = regression_report(results, load_baseline(args.baseline), args.tolerance)
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+    sys.exit(1 if regressions else 0)
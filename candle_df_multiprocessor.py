@@ -2,14 +2,22 @@ import datetime as dt
 from enhanced_candle_manager import CandleManager
 from trade_manager import TradeManager
 from signal_generator import SignalGenerator
+from live_option_chain import LiveOptionChain
+from greeks_engine import GreeksEngine
 
 class MultiTimeframeProcessor:
-    def __init__(self, timeframes, trading_timeframe, hdf_file_path, mode='test', fyers_model=None, plotter=None, real_trade=False):
+    def __init__(self, timeframes, trading_timeframe, hdf_file_path, mode='test', fyers_model=None, plotter=None, real_trade=False,
+                 target_delta=None):
         self.timeframes = set(timeframes)
         self.trading_timeframe = trading_timeframe
         
         self.candle_manager = CandleManager(self.timeframes)
-        self.trade_manager = TradeManager(self, mode=mode, fyers_model=fyers_model, real_trade=real_trade)
+        self.option_chain = LiveOptionChain()
+        self.greeks = GreeksEngine()
+        self.index_ltp = None
+        self.index_feed_time = None
+        self.trade_manager = TradeManager(self, mode=mode, fyers_model=fyers_model, real_trade=real_trade,
+                                          target_delta=target_delta)
         self.signal_generator = SignalGenerator(
             candle_manager=self.candle_manager,
             trade_manager=self.trade_manager,
@@ -18,8 +26,10 @@ class MultiTimeframeProcessor:
             mode=mode,
             fyers_model=fyers_model,
             plotter=plotter,
-            hdf_file_path=hdf_file_path
+            hdf_file_path=hdf_file_path,
+            option_chain_provider=self.chain_and_greeks
         )
+        self.subscription_manager = None  # optional SubscriptionManager (live mode)
 
     def process_tick(self, message):
         symbol = message.get("symbol")
@@ -31,9 +41,18 @@ class MultiTimeframeProcessor:
             self.trade_manager.check_for_exit(message)
 
         if symbol == 'NSE:NIFTY50-INDEX':
+            if message.get("ltp"):
+                self.index_ltp = message["ltp"]
+                self.index_feed_time = message.get('exch_feed_time')
             self.signal_generator.run_live_strategy(message)
 
+        if self.subscription_manager is not None:
+            self.subscription_manager.on_tick(message)
+
         self.candle_manager.update_partial_candle_from_tick(message)
+        plotter = self.signal_generator.plotter
+        if plotter is not None and symbol == 'NSE:NIFTY50-INDEX':
+            plotter.update_partial_candle(self.candle_manager.get_partial_candle(symbol, self.trading_timeframe))
 
         ltp = message.get("ltp")
         volume = message.get("vol_traded_today", 0)
@@ -41,6 +60,9 @@ class MultiTimeframeProcessor:
         
         candle_time = self.candle_manager.get_candle_time(timestamp, 1)
 
+        if ltp:
+            self.option_chain.update(symbol, ltp, volume, message.get('exch_feed_time'), message.get('oi'))
+
         if symbol not in self.candle_manager.tick_candles[1]:
             self.candle_manager.initialize_tick_candle(symbol, ltp, volume, candle_time)
             return
@@ -63,5 +85,22 @@ class MultiTimeframeProcessor:
         else:
             self.candle_manager.update_tick_candle(symbol, ltp, volume)
 
+    def chain_with_greeks(self):
+        """Current option chain snapshot, with the greeks engine brought up to date against the index."""
+        snapshot = self.option_chain.snapshot()
+        if self.index_ltp and self.index_feed_time:
+            self.greeks.refresh(snapshot, self.index_ltp, self.index_feed_time)
+        return snapshot
+
+    def chain_and_greeks(self):
+        """(chain_with_greeks(), the greeks engine's per-expiry results), as the plot shows them."""
+        snapshot = self.chain_with_greeks()
+        return snapshot, self.greeks.results()
+
+    def traded_symbols(self):
+        """Option symbols with an open or pending trade."""
+        symbol = self.trade_manager.current_trade.get('symbol')
+        return {symbol} if symbol else set()
+
     def process_order_update(self, message):
         self.trade_manager.process_order_update(message)
\ No newline at end of file
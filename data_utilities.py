@@ -1,8 +1,123 @@
+import numpy as np
 import pandas as pd
 import os
+import time
 import datetime as dt
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from hdf_table_store import read_range
+from bar_archive import BarArchive, FIELD_COLUMNS, MANIFEST_NAME as ARCHIVE_MANIFEST_NAME
+from bar_panel import BarPanel
 
 ############## RESAMPLE BY Timeframe ###################################################################
+SESSION_START_MINUTE = 9 * 60 + 15   # buckets are anchored at 09:15
+SESSION_END_MINUTE = 15 * 60 + 30
+OHLCV_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'tradingVolume': 'sum'
+}
+
+
+def timeframe_minutes(timeframe):
+    """15, '15T', '15min' or '1h' -> minutes (int)"""
+    if isinstance(timeframe, (int, np.integer)):
+        return int(timeframe)
+    return int(pd.Timedelta(pd.tseries.frequencies.to_offset(timeframe)) // pd.Timedelta(minutes=1))
+
+
+def _reduce_buckets(columns, starts):
+    """One grouped reduction per column over contiguous buckets beginning at `starts`"""
+    ends = np.append(starts[1:], len(next(iter(columns.values())))) - 1
+    reduced = {}
+    for name, (how, values) in columns.items():
+        if how == 'first':
+            reduced[name] = (how, values[starts])
+        elif how == 'last':
+            reduced[name] = (how, values[ends])
+        elif how == 'max':
+            reduced[name] = (how, (np.fmax if values.dtype.kind == 'f' else np.maximum).reduceat(values, starts))
+        elif how == 'min':
+            reduced[name] = (how, (np.fmin if values.dtype.kind == 'f' else np.minimum).reduceat(values, starts))
+        else:  # sum
+            summed = np.nan_to_num(values) if values.dtype.kind == 'f' else values
+            reduced[name] = (how, np.add.reduceat(summed, starts))
+    return reduced
+
+
+def session_resample(df, timeframes=(5, 15, 30, 60, 75), agg=None):
+    """resamples intraday bars into several session-anchored timeframes in one pass
+
+    Bucket ids are integer minutes since 09:15 of each day floor-divided by the
+    timeframe, so a 75 minute day is 09:15, 10:30, ... regardless of the first bar
+    of the day. Bars outside 09:15-15:30 are ignored and empty buckets are not
+    emitted. The input frame is neither copied nor modified.
+
+    The data is reduced once to the greatest common divisor of the timeframes
+    (e.g. 5 minutes) and every timeframe is built from those bars.
+
+    Args:
+        df (dataframe): df of stock OHLCV values indexed by timestamp
+        timeframes (list): minutes or pandas strings eg [5, '15T', '75min']
+        agg (dict): column -> 'first'/'last'/'max'/'min'/'sum', default OHLCV_AGG
+
+    Returns:
+        (dict): dict{timeframe: dataframe}, keyed as passed in
+    """
+    agg = {name: how for name, how in (agg or OHLCV_AGG).items() if name in df.columns}
+    minutes_by_tf = {tf: timeframe_minutes(tf) for tf in timeframes}
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    # Integer minutes since the epoch, split into day and minute-of-session
+    minutes = index.asi8 // 60_000_000_000
+    order = None if index.is_monotonic_increasing else np.argsort(minutes, kind='stable')
+    if order is not None:
+        minutes = minutes[order]
+    day = minutes // 1440
+    offset = minutes % 1440 - SESSION_START_MINUTE
+    in_session = (offset >= 0) & (offset <= SESSION_END_MINUTE - SESSION_START_MINUTE)
+    keep = None if in_session.all() else np.flatnonzero(in_session)
+    if keep is not None:
+        day, offset = day[keep], offset[keep]
+
+    def column(name):
+        values = df[name].to_numpy()
+        if order is not None:
+            values = values[order]
+        return values if keep is None else values[keep]
+
+    index_name = df.index.name or 'timestamp'
+    if len(day) == 0:
+        empty = pd.DataFrame(columns=list(agg), index=pd.DatetimeIndex([], name=index_name))
+        return {tf: empty.copy() for tf in timeframes}
+
+    # Pass over the raw bars: reduce to the common base timeframe
+    base = int(np.gcd.reduce(list(minutes_by_tf.values())))
+    base_bucket = offset // base
+    starts = np.flatnonzero(np.r_[True, (np.diff(day) != 0) | (np.diff(base_bucket) != 0)])
+    base_bars = _reduce_buckets({name: (how, column(name)) for name, how in agg.items()}, starts)
+    base_day, base_bucket = day[starts], base_bucket[starts]
+
+    resampled = {}
+    for tf, tf_minutes in minutes_by_tf.items():
+        bucket = base_bucket * base // tf_minutes
+        if tf_minutes == base:
+            bars, tf_starts = base_bars, np.arange(len(bucket))
+        else:
+            tf_starts = np.flatnonzero(np.r_[True, (np.diff(base_day) != 0) | (np.diff(bucket) != 0)])
+            bars = _reduce_buckets(base_bars, tf_starts)
+        stamp = (base_day[tf_starts] * 1440 + SESSION_START_MINUTE + bucket[tf_starts] * tf_minutes) * 60
+        resampled[tf] = pd.DataFrame(
+            {name: values for name, (_, values) in bars.items()},
+            index=pd.DatetimeIndex((stamp * 1_000_000_000).astype('datetime64[ns]'), name=index_name))
+    return resampled
+
+
 def resample_df(df, timeframe):
     """base function to resample dataframes where index is timestamp 
 
@@ -13,29 +128,7 @@ def resample_df(df, timeframe):
     Returns:
         _type_: _description_
     """
-    df.index = pd.to_datetime(df.index)
-    df['day'] = df.index.date
-
-    # Filter data within the time range 09:15 to 15:30
-    df = df.between_time('09:15', '15:30')
-
-    gp = df.groupby('day')
-    dflist = []
-
-    for k, res in gp:
-        resample_dataframe = res.resample(timeframe, origin='start').agg({
-            'Open': 'first',
-            'High': 'max',
-            'Low': 'min',
-            'Close': 'last',
-            'tradingVolume': 'sum'
-        })
-        resample_dataframe.reset_index(inplace=True)
-        dflist.append(resample_dataframe)
-
-    resample_dataframe = pd.concat(dflist, ignore_index=True)
-    resample_dataframe.set_index('timestamp', inplace=True)
-    return resample_dataframe
+    return session_resample(df, [timeframe])[timeframe]
 
 def resample_daily_to_weekly_monthly(df):
     '''
@@ -79,9 +172,144 @@ def resample_daily_to_weekly_monthly(df):
     return weekly_df,monthly_df
 
 
+############## BATCH WEEKLY / MONTHLY ROLLUPS ###########################################################
+def _period_labels(dates, rule):
+    """labels as resample(rule) gives them: 'W' = W-MON with label='left', 'M' = MS"""
+    days = dates.values.astype('datetime64[D]')
+    if rule == 'M':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    # W-MON bins are (Monday, next Monday], labelled with the earlier Monday
+    weekday = (days.astype(np.int64) - 4) % 7          # 1970-01-01 was a Thursday; Monday = 0
+    return days - ((weekday - 1) % 7 + 1).astype('timedelta64[D]')
+
+
+def _long_daily(daily):
+    """BarPanel or long frame (symbol column, date index) -> (symbols, dates, ohlcv frame) sorted by symbol, date"""
+    if isinstance(daily, BarPanel):
+        n_symbols, n_times, _ = daily.shape
+        flat = daily.values.reshape(n_symbols * n_times, len(daily.fields))
+        keep = ~np.isnan(flat).all(axis=1)
+        symbols = np.repeat(daily.symbols.to_numpy(), n_times)[keep]
+        dates = pd.DatetimeIndex(np.tile(daily.index.to_numpy(), n_symbols)[keep])
+        return symbols, dates, pd.DataFrame(flat[keep], columns=list(daily.fields))
+    dates = pd.DatetimeIndex(daily.index)
+    symbols = daily['symbol'].to_numpy()
+    order = np.lexsort((dates.asi8, pd.factorize(symbols, sort=True)[0]))
+    return symbols[order], dates[order], daily.iloc[order].reset_index(drop=True)
+
+
+def _period_start(date, rule):
+    """first calendar day of the W / M period holding `date`"""
+    label = pd.Timestamp(_period_labels(pd.DatetimeIndex([date]), rule)[0]).date()
+    return label + dt.timedelta(days=1) if rule == 'W' else label
+
+
+def _extend_from_store(symbols, dates, bars, store):
+    """prepends the stored daily bars ('D') that complete each symbol's first W / M period
+
+    An incremental update usually starts mid-period, and the bar already stored for
+    that period may itself be partial (an earlier rollup ran mid-week), so the
+    period is rebuilt from its stored daily bars rather than kept or skipped.
+    """
+    extra = []
+    for symbol, first in pd.Series(dates).groupby(symbols).min().items():
+        first = first.date()
+        rules = [rule for rule in ('W', 'M') if store.coverage(symbol, rule)]
+        if not rules:
+            continue
+        need = min(_period_start(first, rule) for rule in rules)
+        before = first - dt.timedelta(days=1)
+        if need > before:
+            continue
+        if not store.coverage(symbol, 'D'):
+            continue  # no daily history to rebuild from; _write_rollups keeps the stored bar
+        stored = store.read_stored(symbol, need, dt.datetime.combine(before, dt.time.max), resolution='D')
+        if not stored.empty:
+            extra.append((symbol, stored))
+    if not extra:
+        return symbols, dates, bars
+    columns = list(bars.columns)
+    symbols = np.concatenate([symbols] + [np.full(len(df), symbol, dtype=object) for symbol, df in extra])
+    dates = dates.append([pd.DatetimeIndex(df.index) for _, df in extra])
+    bars = pd.concat([bars] + [df.reindex(columns=columns) for _, df in extra], ignore_index=True)
+    order = np.lexsort((dates.asi8, pd.factorize(symbols, sort=True)[0]))
+    return symbols[order], dates[order], bars.iloc[order].reset_index(drop=True)
+
+
+def rollup_weekly_monthly(daily, store=None):
+    """weekly (W-MON, label='left') and monthly (MS) bars for many symbols in one grouped reduction each
+
+    Same bars as resample_daily_to_weekly_monthly per symbol (except that periods
+    without any daily bar are not emitted), but for the whole universe at once and
+    without the Date column / set_index / reset_index round trips.
+
+    Args:
+        daily (BarPanel | dataframe): daily panel, or long frame with a 'symbol' column and date index
+        store (LocalBarStore): when given, each symbol's bars are written to it as resolutions 'W' and 'M'
+            (and the daily bars as 'D'); a first period that starts before `daily` is completed
+            from the daily bars stored by earlier rollups
+
+    Returns:
+        (dict): dict{'W': dataframe, 'M': dataframe}, long frames with a 'symbol' column and 'Date' index
+    """
+    symbols, dates, bars = _long_daily(daily)
+    if store is not None:
+        symbols, dates, bars = _extend_from_store(symbols, dates, bars, store)
+    agg = {name: how for name, how in OHLCV_AGG.items() if name in bars.columns}
+    codes = pd.factorize(symbols, sort=True)[0]
+    rollups = {}
+    for rule in ('W', 'M'):
+        labels = _period_labels(dates, rule)
+        if len(labels) == 0:
+            rollups[rule] = pd.DataFrame(columns=['symbol'] + list(agg), index=pd.DatetimeIndex([], name='Date'))
+            continue
+        # Rows are sorted by symbol then date, so every (symbol, period) group is contiguous
+        starts = np.flatnonzero(np.r_[True, (np.diff(codes) != 0) | (np.diff(labels.astype(np.int64)) != 0)])
+        reduced = _reduce_buckets({name: (how, bars[name].to_numpy()) for name, how in agg.items()}, starts)
+        frame = pd.DataFrame({name: values for name, (_, values) in reduced.items()},
+                             index=pd.DatetimeIndex(labels[starts], name='Date'))
+        frame.insert(0, 'symbol', symbols[starts])
+        rollups[rule] = frame
+
+    if store is not None:
+        _write_rollups(rollups, symbols, dates, bars, store)
+    return rollups
+
+
+def _write_rollups(rollups, symbols, dates, bars, store):
+    """writes each symbol's daily bars and rollups to the bar store, covering the daily dates they were built from"""
+    yesterday = dt.date.today() - dt.timedelta(days=1)
+    first = pd.Series(dates).groupby(symbols).min()
+    last = pd.Series(dates).groupby(symbols).max()
+
+    def covered(symbol):
+        start, end = first[symbol].date(), min(last[symbol].date(), yesterday)
+        return start, [(start, end)] if end >= start else []
+
+    no_daily = {symbol for symbol in first.index if not store.coverage(symbol, 'D')}
+    daily = bars.set_index(pd.DatetimeIndex(dates, name='Date'))
+    for symbol, rows in daily.groupby(symbols, sort=False):
+        store.write(symbol, 'D', rows, covered(symbol)[1])
+    for rule, frame in rollups.items():
+        for symbol, rule_bars in frame.groupby('symbol', sort=False):
+            rule_bars = rule_bars.drop(columns='symbol')
+            start, ranges = covered(symbol)
+            # Only reached for stores without the daily bars to rebuild the period from
+            # (see _extend_from_store): keep the stored bar rather than overwrite it with a partial one
+            if (symbol in no_daily and store.coverage(symbol, rule)
+                    and _period_start(rule_bars.index[0].date(), rule) < start):
+                print(f"Rollups: no stored daily bars before {start} for {symbol}; "
+                      f"kept its stored {rule} bar for {rule_bars.index[0].date()} (run a full rollup to rebuild it)")
+                rule_bars = rule_bars.iloc[1:]
+            store.write(symbol, rule, rule_bars, ranges)
+        print(f"Rollups: wrote {rule} bars for {frame['symbol'].nunique()} symbols to {store.store_dir}")
+
+
 def filter_stocks_dict(stocks_dict, watchlist):
     """filters the raw dict ciontaining all dataframes and stocks data with our oun list of stocks and data
 
+    Prefer iter_universe / load_universe, which never load the other stocks at all.
+
     Args:
         stocks_dict (_type_): _description_
         watchlist (_type_): _description_
@@ -97,26 +325,102 @@ def filter_stocks_dict(stocks_dict, watchlist):
             filtered_dict[key] = stocks_dict[key]
     return filtered_dict
 
-def filter_last_300_days(df_dict):
-    """when passed with a dict it only keeps the data for last available 300 days for fast analysis
+def filter_last_300_days(df_dict, days=300):
+    """when passed with a dict it only keeps the data for last available `days` days for fast analysis
+
+    Prefer iter_universe / load_universe, which only read those rows off disk.
 
     Args:
         df_dict (dict): dict{stock: dataframe}
+        days (int): calendar days to keep, counted back from today
 
     Returns:
         (dict): dict{stock: dataframe}
     """
     days_300_dict = {}
     current_date = pd.to_datetime("today")
-    cutoff_date = current_date - pd.Timedelta(days=200)
+    cutoff_date = current_date - pd.Timedelta(days=days)
 
     for key, df in df_dict.items():
-        # Filter the DataFrame to keep only rows within the last 300 days
+        # Filter the DataFrame to keep only rows within the last `days` days
         filtered_df = df[df.index >= cutoff_date]
         days_300_dict[key] = filtered_df
 
     return days_300_dict
 
+
+############## LAZY UNIVERSE LOADING ###################################################################
+def _universe_window(days, start, end):
+    end = pd.Timestamp(end) if end is not None else pd.to_datetime("today")
+    start = pd.Timestamp(start) if start is not None else end - pd.Timedelta(days=days)
+    return start, end
+
+
+def _iter_hdf(hdf_file_path, watchlist, start, end, columns):
+    with pd.HDFStore(hdf_file_path, mode='r') as store:
+        keys = [k for k in store.keys() if k.endswith('/historical_data')]
+        for key in keys:
+            symbol = key.split('/')[1]
+            if watchlist is not None and symbol not in watchlist:
+                continue
+            if store.get_storer(key).is_table:
+                # Row filter pushed down to PyTables: only the window is read
+                df = read_range(hdf_file_path, key, start, end, columns=columns)
+            else:
+                # Fixed format cannot be queried; one symbol is in memory at a time
+                df = store[key]
+                df = df.loc[(df.index >= start) & (df.index <= end), columns or df.columns]
+            yield key, df
+
+
+def _iter_archive(archive, watchlist, start, end, columns):
+    if not isinstance(archive, BarArchive):
+        archive = BarArchive(archive)
+    names = {field: column for column, field in FIELD_COLUMNS.items()}
+    for symbol in archive.symbols():
+        if watchlist is not None and symbol not in watchlist:
+            continue
+        df = archive.frame(symbol, start, end).rename(columns=names)
+        yield f"/{symbol}/historical_data", df[columns] if columns else df
+
+
+def iter_universe(source, watchlist=None, days=300, start=None, end=None, columns=None):
+    """streams (key, dataframe) one stock at a time, reading only the watchlist and the date window
+
+    Replaces loading the whole HDF file and then calling filter_stocks_dict and
+    filter_last_300_days: keys outside the watchlist are never opened, and rows
+    before the cutoff are not read (pushed down for table-format HDF keys, bisected
+    in a bar archive). Peak memory is one stock's window.
+
+    Args:
+        source (str | BarArchive): HDF file path, bar archive directory or BarArchive
+            (FileNotFoundError when the path is neither)
+        watchlist (iterable): symbols as in the keys, eg 'NSE:SBIN-EQ'; None for all
+        days (int): calendar days back from `end` when `start` is not given
+        start, end: window bounds, default today - days .. today
+        columns (list): only these columns, eg ['Close', 'tradingVolume']
+
+    Yields:
+        (key, dataframe): key is '/SYMBOL/historical_data' as in the HDF file
+    """
+    watchlist = set(watchlist) if watchlist is not None else None
+    start, end = _universe_window(days, start, end)
+    columns = list(columns) if columns else None
+    if isinstance(source, BarArchive):
+        return _iter_archive(source, watchlist, start, end, columns)
+    if os.path.isfile(source):
+        return _iter_hdf(source, watchlist, start, end, columns)
+    # BarArchive treats a missing directory as an empty archive; a wrong path should not look like one
+    if not os.path.isfile(os.path.join(source, ARCHIVE_MANIFEST_NAME)):
+        raise FileNotFoundError(f"iter_universe: {source} is neither an HDF file nor a bar archive directory")
+    return _iter_archive(source, watchlist, start, end, columns)
+
+
+def load_universe(source, watchlist=None, days=300, start=None, end=None, columns=None):
+    """iter_universe collected into dict{key: dataframe}, the shape filter_stocks_dict returned"""
+    return dict(iter_universe(source, watchlist, days, start, end, columns))
+
+
 def resampled_dict(filtered_stocks_dictionary,Timeframe):
     """used when we have a dict with keys and dataframes to resample full dict
 
@@ -127,14 +431,119 @@ def resampled_dict(filtered_stocks_dictionary,Timeframe):
     Returns:
         (dict): dict{stock: dataframe}
     """
-    resample_dfs = {}
-    for key, test_df in filtered_stocks_dictionary.items():
-        test_df = resample_df(test_df,Timeframe)
-        df_copy = test_df.copy()  # To avoid SettingWithCopyWarning
-        # dtosc_df = dtosc(df_copy)
-
-        resample_dfs[key] = df_copy
-    return resample_dfs
+    universe = resample_universe(filtered_stocks_dictionary, [Timeframe], verbose=False)
+    return {key: frames[Timeframe] for key, frames in universe.items()}
+
+
+############## PARALLEL UNIVERSE RESAMPLING ############################################################
+def _universe_offsets(stocks_dict):
+    """row offset of each frame in the packed block; the last entry is the total row count"""
+    return np.r_[0, np.cumsum([len(df) for df in stocks_dict.values()])].astype(np.int64)
+
+
+def _pack_universe(stocks_dict, columns, shm, offsets):
+    """copies every frame once into the shared memory block: int64 timestamps then float64 columns"""
+    keys = list(stocks_dict)
+    total = int(offsets[-1])
+    stamps = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((len(columns), total), dtype=np.float64, buffer=shm.buf, offset=total * 8)
+    try:
+        for key, start, end in zip(keys, offsets[:-1], offsets[1:]):
+            df = stocks_dict[key]
+            index = pd.DatetimeIndex(df.index)
+            stamps[start:end] = (index.tz_localize(None) if index.tz is not None else index).asi8
+            for i, col in enumerate(columns):
+                values[i, start:end] = df[col].to_numpy(dtype=np.float64)
+    finally:
+        # Views onto shm.buf would keep the caller from closing the block
+        del stamps, values
+    return [(key, int(start), int(end)) for key, start, end in zip(keys, offsets[:-1], offsets[1:])]
+
+
+def _resample_shared(shm_name, total, columns, jobs, timeframes):
+    """worker: attaches to the shared block and resamples its symbols; returns plain arrays"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        stamps = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray((len(columns), total), dtype=np.float64, buffer=shm.buf, offset=total * 8)
+        results = []
+        for key, start, end in jobs:
+            df = pd.DataFrame({col: values[i, start:end].copy() for i, col in enumerate(columns)},
+                              index=pd.DatetimeIndex(stamps[start:end].copy().view('datetime64[ns]'), name='timestamp'))
+            frames = session_resample(df, timeframes)
+            results.append((key, {tf: (frame.index.asi8, frame.to_numpy()) for tf, frame in frames.items()}))
+        del stamps, values
+        return results
+    finally:
+        shm.close()
+
+
+def resample_universe(stocks_dict, timeframes=(5, 15, 30, 60), max_workers=None, min_parallel=8, verbose=True):
+    """resamples every stock into all timeframes, spreading the symbols over a process pool
+
+    The frames are copied once into shared memory and the workers read them from
+    there instead of receiving pickled DataFrames; only the (much smaller)
+    resampled arrays are sent back. Small universes (< min_parallel stocks) or
+    max_workers=1 run in this process. On Windows call it under
+    `if __name__ == "__main__":`.
+
+    Args:
+        stocks_dict (dict): dict{'/SYMBOL/historical_data': dataframe}
+        timeframes (list): minutes or pandas strings eg [5, '15T', 30, 60]
+        max_workers (int): processes, default os.cpu_count()
+
+    Returns:
+        (dict): dict{key: dict{timeframe: dataframe}}, keys as in stocks_dict
+    """
+    started = time.perf_counter()
+    timeframes = list(timeframes)
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(stocks_dict) < min_parallel:
+        universe = {key: session_resample(df, timeframes) for key, df in stocks_dict.items()}
+        if verbose:
+            print(f"Resampled {len(universe)} stocks into {timeframes} in {time.perf_counter() - started:.2f}s (single process)")
+        return universe
+
+    # Only the OHLCV columns every frame has can be packed side by side
+    columns = [col for col in OHLCV_AGG if all(col in df.columns for df in stocks_dict.values())]
+    missing = sorted({col for df in stocks_dict.values() for col in OHLCV_AGG if col in df.columns} - set(columns))
+    if missing:
+        print(f"resample_universe: {missing} not in every frame; resampling without them")
+    if not columns:
+        raise ValueError("resample_universe: the frames have no OHLCV column in common")
+    dtypes = {key: df[columns].dtypes.to_dict() for key, df in stocks_dict.items()}
+    offsets = _universe_offsets(stocks_dict)
+    total = int(offsets[-1])
+
+    universe = {}
+    shm = None
+    try:
+        shm = shared_memory.SharedMemory(create=True, size=max(total * 8 * (1 + len(columns)), 8))
+        jobs = _pack_universe(stocks_dict, columns, shm, offsets)
+        packed = time.perf_counter()
+        chunk = max(1, len(jobs) // (workers * 4))
+        chunks = [jobs[i:i + chunk] for i in range(0, len(jobs), chunk)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_resample_shared, shm.name, total, columns, part, timeframes) for part in chunks]
+            for future in as_completed(futures):
+                for key, frames in future.result():
+                    universe[key] = {
+                        tf: pd.DataFrame(block, columns=columns,
+                                         index=pd.DatetimeIndex(stamps.view('datetime64[ns]'), name='timestamp'))
+                                       .astype(dtypes[key])
+                        for tf, (stamps, block) in frames.items()}
+                if verbose:
+                    print(f"  resampled {len(universe)}/{len(jobs)} stocks ({time.perf_counter() - started:.1f}s)")
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    if verbose:
+        elapsed = time.perf_counter() - started
+        print(f"Resampled {len(universe)} stocks ({total:,} bars) into {timeframes} with {workers} processes "
+              f"in {elapsed:.2f}s (packing {packed - started:.2f}s, {total / max(elapsed, 1e-9):,.0f} bars/s)")
+    return {key: universe[key] for key in stocks_dict}
 
 
 def combine_dicts(dict_5min, dict_15min, dict_30min, dict_60min):
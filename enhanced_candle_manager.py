@@ -48,6 +48,14 @@ class CandleManager:
         data["close"] = ltp
         data["current_volume"] = volume
 
+    def drop_symbol(self, symbol):
+        """Forgets every candle of `symbol`, e.g. after it is unsubscribed."""
+        for candles in self.tick_candles.values():
+            candles.pop(symbol, None)
+        for tf in self.live_resampled_candles:
+            self.live_resampled_candles[tf].pop(symbol, None)
+            self.resampled_dfs[tf].pop(symbol, None)
+
     def get_completed_tick_candle(self, symbol):
         data = self.tick_candles[1][symbol]
         return {
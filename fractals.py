@@ -1,64 +1,107 @@
-import pandas as pd
-def add_fractals(df):
-    df['upfractal'] = False
-    df['downfractal'] = False
-
-    for i in range(4, len(df)):
-        # Use .iloc for consistent integer-based indexing
-        if (df['close'].iloc[i-2] > df['close'].iloc[i] and
-            df['close'].iloc[i-2] > df['close'].iloc[i-1] and
-            df['close'].iloc[i-2] > df['close'].iloc[i-3] and
-            df['close'].iloc[i-2] > df['close'].iloc[i-4]):
-            df.iloc[i-2, df.columns.get_loc('upfractal')] = True  # Use .iloc and column name
-
-        if (df['close'].iloc[i-2] < df['close'].iloc[i] and
-            df['close'].iloc[i-2] < df['close'].iloc[i-1] and
-            df['close'].iloc[i-2] < df['close'].iloc[i-3] and
-            df['close'].iloc[i-2] < df['close'].iloc[i-4]):
-            df.iloc[i-2, df.columns.get_loc('downfractal')] = True  # Use .iloc and column name
-
-    
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def fractal_flags(high, low=None, window=5, strict=True):
+    """up/down fractal flags for every bar, vectorized over sliding windows
+
+    A bar is an up (down) fractal when its high (low) is above (below) the other
+    bars of the centred `window`-bar window. Pass only `high` (eg close) to use
+    one series for both. strict=True needs a strict extreme (as add_fractals
+    always did on close); strict=False accepts ties (as SignalGenerator does on
+    high/low). The first and last window // 2 bars are never fractals.
+
+    Args:
+        high (array): highs, or the single series
+        low (array): lows, default `high`
+        window (int): odd window length, eg 5
+        strict (bool): strict extreme vs equal to the window extreme
+
+    Returns:
+        (up, down): bool arrays
+    """
+    if window < 3 or window % 2 == 0:
+        raise ValueError(f"window must be odd and >= 3, got {window}")
+    high = np.asarray(high, dtype=np.float64)
+    low = high if low is None else np.asarray(low, dtype=np.float64)
+    up = np.zeros(len(high), dtype=bool)
+    down = np.zeros(len(low), dtype=bool)
+    if len(high) < window:
+        return up, down
+
+    m = window // 2
+    centre = slice(m, len(high) - m)
+    windows_high = sliding_window_view(high, window)
+    windows_low = sliding_window_view(low, window)
+    if strict:
+        # Extreme of the other bars in the window (left and right of the centre)
+        others_high = np.maximum(windows_high[:, :m].max(axis=1), windows_high[:, m + 1:].max(axis=1))
+        others_low = np.minimum(windows_low[:, :m].min(axis=1), windows_low[:, m + 1:].min(axis=1))
+        up[centre] = high[centre] > others_high
+        down[centre] = low[centre] < others_low
+    else:
+        up[centre] = high[centre] == windows_high.max(axis=1)
+        down[centre] = low[centre] == windows_low.min(axis=1)
+    return up, down
+
+
+def fractal_levels(high, low=None, window=5, strict=True, levels=3):
+    """recursive fractals: level k+1 is the same kernel run on the series of level k pivots
+
+    Returns:
+        (array): int8 array (n, levels), 1 = up fractal, -1 = down fractal, 0 = none.
+        A bar that is both (an outside bar with strict=False) is marked 1.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = high if low is None else np.asarray(low, dtype=np.float64)
+    out = np.zeros((len(high), levels), dtype=np.int8)
+    rows = np.arange(len(high))
+    for level in range(levels):
+        up, down = fractal_flags(high[rows], low[rows], window, strict)
+        out[rows, level] = np.where(up, 1, np.where(down, -1, 0))
+        # Compress to this level's pivots; every level is one O(n) pass over fewer bars
+        rows = rows[up | down]
+        if len(rows) < window:
+            break
+    return out
+
+
+def _column(df, name):
+    for candidate in (name, name.capitalize(), name.upper()):
+        if candidate in df.columns:
+            return df[candidate].to_numpy(dtype=np.float64)
+    raise KeyError(f"No '{name}' column in {list(df.columns)}")
+
+
+def _series(df, mode):
+    if mode == 'close':
+        return _column(df, 'close'), None
+    if mode == 'high_low':
+        return _column(df, 'high'), _column(df, 'low')
+    raise ValueError(f"mode must be 'close' or 'high_low', got {mode!r}")
+
+
+def add_fractals(df, window=5, mode='close', strict=True):
+    """adds upfractal (1/0), downfractal (-1/0) and Fractals (1/-1/0) columns and returns df
+
+    mode='close' compares closes (the original behaviour), mode='high_low' compares
+    highs for up and lows for down fractals. The columns are what
+    plotting_traces.create_fractal_traces expects.
+    """
+    up, down = fractal_flags(*_series(df, mode), window=window, strict=strict)
+    df['upfractal'] = up.astype(np.int8)
+    df['downfractal'] = -down.astype(np.int8)
+    df['Fractals'] = np.where(up, 1, np.where(down, -1, 0)).astype(np.int8)
     return df
 
-def add_recursive_fractals(df):
-    fr_test_df = df.copy()
-    fr_test_df.reset_index(drop=False, inplace=True)
-    fr_test_df['key'] = fr_test_df.index
-    fractal_75 = add_fractals(fr_test_df)
-    fractal_df_1 = fractal_75[(fractal_75['Fractals'] == 1) | (fractal_75['Fractals'] == -1)]
-
-    fractal_df_1['index_1'] = fractal_df_1.index
-    fractal_df_1.reset_index(drop=True, inplace=True)
-    fractal_df_2 = add_fractals(fractal_df_1)
-    fractal_df_2 = fractal_df_2[(fractal_df_2['Fractals'] == 1) | (fractal_df_2['Fractals'] == -1)]
-
-    fractal_df_2.reset_index(drop=True, inplace=True)
-    fractal_df_3 = add_fractals(fractal_df_2)
-    print(fractal_df_3[(fractal_df_3['Fractals'] == 1) | (fractal_df_3['Fractals'] == -1)].head(60))
-    fractal_df_3 = fractal_df_3[(fractal_df_3['Fractals'] == 1) | (fractal_df_3['Fractals'] == -1)]
-
-    # Step 6: Add Fractal 1, Fractal 2, and Fractal 3 columns to the original DataFrame
-    fr_test_df['Fractal_1'] = 0
-    fr_test_df['Fractal_2'] = 0
-    fr_test_df['Fractal_3'] = 0
-
-    df1 = fractal_df_1[['Fractals','key']].copy()
-    df2 = fractal_df_2[['Fractals','key']].copy()
-    df3 = fractal_df_3[['Fractals','key']].copy()
-
-    merged_df = pd.merge(fr_test_df, df1, on='key', how='left')
-    
-    merged_df['Fractal_1'] = merged_df['Fractals_x'].fillna(0).astype(int)
-    # print(merged_df)
-    merged_df.drop(columns=['Fractals_x'], inplace=True)
-    merged_df = pd.merge(merged_df, df2, on='key', how='left')
-    merged_df['Fractal_2'] = merged_df['Fractals_y'].fillna(0).astype(int)
-    merged_df.drop(columns=['Fractals_y'], inplace=True)
-    merged_df.drop(columns=['Fractals'], inplace=True)
-    # print(df3)
-    merged_df = pd.merge(merged_df, df3, on='key', how='left')
-    merged_df['Fractal_3'] = merged_df['Fractals'].fillna(0).astype(int)
-    merged_df.drop(columns=['Fractals'], inplace=True)
-    # print(merged_df.head(60))
-    # pass
-    return merged_df
\ No newline at end of file
+def add_recursive_fractals(df, levels=3, window=5, mode='close', strict=True):
+    """returns a copy of df with add_fractals columns plus Fractal_1 .. Fractal_<levels>
+
+    Fractal_2 are the fractals of the series of Fractal_1 pivots, Fractal_3 those
+    of the Fractal_2 pivots, and so on (1 = up, -1 = down, 0 = none).
+    """
+    df = add_fractals(df.copy(), window, mode, strict)
+    marks = fractal_levels(*_series(df, mode), window=window, strict=strict, levels=levels)
+    for level in range(levels):
+        df[f'Fractal_{level + 1}'] = marks[:, level]
+    return df
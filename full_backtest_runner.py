@@ -7,8 +7,13 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 import json
+import argparse
+import datetime as dt
 import pandas as pd
 from candle_df_multiprocessor import MultiTimeframeProcessor
+from tick_replay import load_tick_log, replay_fast_forward
+from historical_bar_cache import get_bar_cache
+from backtest_cache import BacktestCache, DEFAULT_CACHE_DIR
 
 # --- Helper Functions (from test_run.py) ---
 
@@ -33,9 +38,75 @@ def on_message_factory(processor):
             print(f"Error processing tick: {e}")
     return on_message
 
+def parse_file_date(file_path):
+    """Trading date from a tick file name like 'ws_120125_raw.txt' (MMDDYY), or None."""
+    try:
+        date_str = os.path.basename(file_path).split('_')[1]
+        return dt.datetime.strptime(date_str, '%m%d%y')
+    except (IndexError, ValueError):
+        return None
+
+def warm_up_processor(processor, bar_cache, file_path):
+    """Loads the 30 days before the file's date from the shared bar cache into the strategy."""
+    trade_date = parse_file_date(file_path)
+    if trade_date is None:
+        print(f"Could not parse date from filename: {os.path.basename(file_path)}. Running without history.")
+        return
+    signal_generator = processor.signal_generator
+    seed = bar_cache.seed_for_date(trade_date, timeframe=signal_generator.trading_timeframe,
+                                   fractal_length=signal_generator.fractal_length)
+    signal_generator.load_pre_fetched_data(seed['bars_1m'], df_tf=seed['bars'],
+                                           fractal_seed=(seed['up'], seed['down']))
+
 # --- Main Runner Logic ---
 
-def run_full_backtest(test_data_folder):
+def run_backtest_day(file_path, capital, hdf_file_path, fast_forward=False, bar_cache=None,
+                     timeframes_to_process=(1, 3), trading_timeframe=3, result_cache=None):
+    """
+    Replays one tick file through a fresh processor and returns the completed trades.
+
+    With `fast_forward`, only the events that can affect trades are replayed
+    (see tick_replay.replay_fast_forward). With a `bar_cache`, the strategy is
+    warmed up with the history before the file's date. With a `result_cache`
+    (backtest_cache.BacktestCache), a cached result is returned when still valid.
+    """
+    if result_cache is not None:
+        params = {'timeframes': list(timeframes_to_process), 'trading_timeframe': trading_timeframe,
+                  'fast_forward': fast_forward}
+        components = result_cache.key_components(file_path, capital, params, bar_cache=bar_cache,
+                                                 trade_date=parse_file_date(file_path))
+        cached_trades = result_cache.get(file_path, capital, components)
+        if cached_trades is not None:
+            print(f"Using cached result ({len(cached_trades)} trades).")
+            return cached_trades
+
+    # Instantiate a new processor for each file to ensure a clean state
+    processor = MultiTimeframeProcessor(
+        timeframes=timeframes_to_process,
+        trading_timeframe=trading_timeframe,
+        hdf_file_path=hdf_file_path,
+        mode='test',
+        plotter=None  # Disable plotter for speed
+    )
+
+    if bar_cache is not None:
+        warm_up_processor(processor, bar_cache, file_path)
+
+    # Set the capital for the upcoming day's trades
+    processor.trade_manager.set_capital(capital)
+
+    if fast_forward:
+        replay_fast_forward(processor, load_tick_log(file_path, cache_binary=True))
+    else:
+        on_message_callback = on_message_factory(processor)
+        stream_json_file(file_path, on_message_callback)
+
+    if result_cache is not None:
+        result_cache.put(file_path, capital, components, processor.trade_manager.completed_trades,
+                         processor.trade_manager.loss_limit_checks)
+    return processor.trade_manager.completed_trades
+
+def run_full_backtest(test_data_folder, fast_forward=False, use_cache=True, cache_dir=DEFAULT_CACHE_DIR):
     """
     Runs the backtest simulation on all .txt files in a given folder,
     tracks capital, and generates a consolidated trade journal.
@@ -67,30 +138,30 @@ def run_full_backtest(test_data_folder):
 
     print(f"--- Starting Full Backtest ---")
     print(f"Found {len(test_files)} files in '{os.path.basename(test_data_folder)}'.")
-    print(f"Initial Principal: {starting_principal:.2f}\n")
+    print(f"Initial Principal: {starting_principal:.2f}")
+    print(f"Replay mode: {'fast-forward' if fast_forward else 'full'}\n")
+
+    # Load the index history once for all days
+    try:
+        bar_cache = get_bar_cache(hdf_file_path)
+    except Exception as e:
+        print(f"Could not load historical bars ({e}). Running without warm-up.")
+        bar_cache = None
+
+    result_cache = BacktestCache(cache_dir) if use_cache else None
 
     # --- Main Loop ---
     for filename in sorted(test_files):
         file_path = os.path.join(test_data_folder, filename)
         print(f"--- Processing file: {filename} ---")
 
-        # Instantiate a new processor for each file to ensure a clean state
-        processor = MultiTimeframeProcessor(
-            timeframes=timeframes_to_process,
-            trading_timeframe=trading_timeframe,
-            hdf_file_path=hdf_file_path,
-            mode='test',
-            plotter=None  # Disable plotter for speed
+        day_trades = run_backtest_day(
+            file_path, current_principal, hdf_file_path, fast_forward=fast_forward, bar_cache=bar_cache,
+            timeframes_to_process=timeframes_to_process, trading_timeframe=trading_timeframe,
+            result_cache=result_cache
         )
-        
-        # Set the capital for the upcoming day's trades
-        processor.trade_manager.set_capital(current_principal)
-        
-        on_message_callback = on_message_factory(processor)
-        stream_json_file(file_path, on_message_callback)
 
         # Collect trades and update capital from the completed run
-        day_trades = processor.trade_manager.completed_trades
         if day_trades:
             day_pnl = sum(trade['pnl'] for trade in day_trades)
             current_principal += day_pnl
@@ -102,6 +173,10 @@ def run_full_backtest(test_data_folder):
             print("No trades were executed for this day.")
         print("-" * 40)
 
+    if result_cache is not None:
+        result_cache.save_index()
+        result_cache.print_report()
+
     # --- Reporting ---
     if not all_trades:
         print("\n--- Full backtest complete. No trades were executed across all files. ---")
@@ -161,10 +236,17 @@ def run_full_backtest(test_data_folder):
 if __name__ == "__main__":
     # The script expects the folder path as a command-line argument.
     # If no argument is given, it will use the default path from your request.
-    if len(sys.argv) > 1:
-        folder_path = sys.argv[1]
-    else:
+    parser = argparse.ArgumentParser(description="Run the strategy over a folder of recorded tick files.")
+    parser.add_argument('folder_path', nargs='?', help="Folder containing the .txt tick files.")
+    parser.add_argument('--fast', action='store_true',
+                        help="Fast-forward replay: skip option ticks that cannot affect trades.")
+    parser.add_argument('--no-cache', action='store_true', help="Re-simulate every day, ignoring cached results.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directory of the per-day result cache.")
+    args = parser.parse_args()
+
+    folder_path = args.folder_path
+    if folder_path is None:
         folder_path = os.path.join(project_root, 'websocket_raw_data')
         print(f"No folder path provided. Using default: '{folder_path}'")
     
-    run_full_backtest(folder_path)
+    run_full_backtest(folder_path, fast_forward=args.fast, use_cache=not args.no_cache, cache_dir=args.cache_dir)
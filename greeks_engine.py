@@ -0,0 +1,187 @@
+import math
+import datetime as dt
+from threading import Lock
+from collections import namedtuple
+import numpy as np
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+MIN_YEARS = 1e-9
+MIN_EXPIRY_YEARS = 1e-6   # ~30 seconds, keeps expiry-day greeks finite
+IV_BOUNDS = (0.005, 5.0)
+EXPIRY_TIME = dt.time(15, 30)
+
+ExpiryGreeks = namedtuple('ExpiryGreeks', ['expiry', 'strikes', 'symbols', 'iv', 'delta', 'gamma', 'theta'])
+
+
+def norm_cdf(x):
+    # Abramowitz & Stegun 7.1.26 erf approximation (|error| < 1.5e-7), vectorized
+    z = np.abs(x) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _d1_d2(spot, strike, years, vol, rate):
+    years = np.maximum(years, MIN_YEARS)
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t, years, sqrt_t
+
+
+def black_scholes_price(spot, strike, years, vol, rate, is_call):
+    """Vectorized Black-Scholes price (no dividends)."""
+    d1, d2, years, _ = _d1_d2(spot, strike, years, vol, rate)
+    discount = np.exp(-rate * years)
+    call = spot * norm_cdf(d1) - strike * discount * norm_cdf(d2)
+    put = strike * discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def black_scholes_greeks(spot, strike, years, vol, rate, is_call):
+    """Vectorized delta, gamma, theta (per calendar day) and vega (per 1.00 of vol)."""
+    d1, d2, years, sqrt_t = _d1_d2(spot, strike, years, vol, rate)
+    pdf = norm_pdf(d1)
+    discount = np.exp(-rate * years)
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0)
+    gamma = pdf / (spot * vol * sqrt_t)
+    decay = -spot * pdf * vol / (2.0 * sqrt_t)
+    theta = np.where(is_call, decay - rate * strike * discount * norm_cdf(d2),
+                     decay + rate * strike * discount * norm_cdf(-d2)) / 365.0
+    vega = spot * pdf * sqrt_t
+    return delta, gamma, theta, vega
+
+
+def implied_vol(price, spot, strike, years, rate, is_call, initial=None, tol=1e-4, max_iter=30):
+    """
+    Vectorized implied volatility: Newton steps safeguarded by a bisection bracket.
+
+    `initial` (e.g. the previous IVs) warm-starts the search; NaN entries start at
+    0.2. Prices outside the no-arbitrage bounds give NaN.
+    """
+    price, spot, strike, years = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, spot, strike, years)))
+    is_call = np.broadcast_to(is_call, price.shape)
+    discount = np.exp(-rate * np.maximum(years, MIN_YEARS))
+    intrinsic = np.where(is_call, np.maximum(spot - strike * discount, 0.0), np.maximum(strike * discount - spot, 0.0))
+    upper = np.where(is_call, spot, strike * discount)
+    valid = np.isfinite(price) & (price > intrinsic) & (price < upper)
+
+    vol = np.full(price.shape, 0.2)
+    if initial is not None:
+        initial = np.broadcast_to(np.asarray(initial, dtype=np.float64), price.shape)
+        warm = np.isfinite(initial) & (initial > IV_BOUNDS[0]) & (initial < IV_BOUNDS[1])
+        vol = np.where(warm, initial, vol)
+    lo = np.full(price.shape, IV_BOUNDS[0])
+    hi = np.full(price.shape, IV_BOUNDS[1])
+
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        v = vol[idx]
+        model = black_scholes_price(spot[idx], strike[idx], years[idx], v, rate, is_call[idx])
+        diff = model - price[idx]
+        done = np.abs(diff) < tol
+        # Price rises with vol: tighten the bracket on the side of the error
+        hi[idx] = np.where(diff > 0, v, hi[idx])
+        lo[idx] = np.where(diff <= 0, v, lo[idx])
+        vega = black_scholes_greeks(spot[idx], strike[idx], years[idx], v, rate, is_call[idx])[3]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = v - diff / vega
+        inside = np.isfinite(step) & (step > lo[idx]) & (step < hi[idx])
+        vol[idx] = np.where(done, v, np.where(inside, step, 0.5 * (lo[idx] + hi[idx])))
+        active[idx[done]] = False
+
+    return np.where(valid, vol, np.nan)
+
+
+class GreeksEngine:
+    """
+    IV, delta, gamma and theta for every option in a live_option_chain snapshot,
+    computed in one batched call per expiry.
+
+    Each refresh only recomputes the strikes whose premium changed, plus all of
+    them when the index has moved more than `spot_tolerance` points or
+    `max_age_seconds` have passed since they were computed (time decay). IV
+    searches warm-start from the previous values.
+    """
+    def __init__(self, rate=0.065, spot_tolerance=1.0, max_age_seconds=60):
+        self.rate = rate
+        self.spot_tolerance = spot_tolerance
+        self.max_age_seconds = max_age_seconds
+        self.state = {}   # expiry -> dict of arrays
+        self.lock = Lock()
+
+    def _state_for(self, view):
+        state = self.state.get(view.expiry)
+        if state is None or not np.array_equal(state['strikes'], view.strikes):
+            shape = view.ltp.shape
+            state = {
+                'strikes': view.strikes, 'symbols': view.symbols,
+                'priced_ltp': np.full(shape, np.nan), 'priced_spot': np.full(shape, np.nan),
+                'priced_at': np.full(shape, -np.inf),
+                'iv': np.full(shape, np.nan), 'delta': np.full(shape, np.nan),
+                'gamma': np.full(shape, np.nan), 'theta': np.full(shape, np.nan),
+            }
+            self.state[view.expiry] = state
+        state['symbols'] = view.symbols
+        return state
+
+    def refresh(self, snapshot, spot, now):
+        """Brings the greeks up to date with `snapshot` at index level `spot` and epoch `now`."""
+        if snapshot is None or not spot:
+            return
+        with self.lock:
+            for expiry, view in snapshot.books.items():
+                state = self._state_for(view)
+                ltp = view.ltp
+                gone = ~(ltp > 0)
+                for name in ('iv', 'delta', 'gamma', 'theta', 'priced_ltp'):
+                    state[name][gone] = np.nan
+                stale = ((ltp != state['priced_ltp'])
+                         | (np.abs(spot - state['priced_spot']) > self.spot_tolerance)
+                         | (now - state['priced_at'] > self.max_age_seconds))
+                stale &= ltp > 0
+                if not stale.any():
+                    continue
+
+                side, pos = np.nonzero(stale)
+                expiry_epoch = dt.datetime.combine(expiry, EXPIRY_TIME).timestamp()
+                years = max((expiry_epoch - now) / SECONDS_PER_YEAR, MIN_EXPIRY_YEARS)
+                strikes = view.strikes[pos]
+                is_call = side == 0
+                iv = implied_vol(ltp[side, pos], spot, strikes, years, self.rate, is_call,
+                                 initial=state['iv'][side, pos])
+                delta, gamma, theta, _ = black_scholes_greeks(spot, strikes, years, np.nan_to_num(iv, nan=0.2),
+                                                              self.rate, is_call)
+                ok = np.isfinite(iv)
+                state['iv'][side, pos] = iv
+                state['delta'][side, pos] = np.where(ok, delta, np.nan)
+                state['gamma'][side, pos] = np.where(ok, gamma, np.nan)
+                state['theta'][side, pos] = np.where(ok, theta, np.nan)
+                state['priced_ltp'][side, pos] = ltp[side, pos]
+                state['priced_spot'][side, pos] = spot
+                state['priced_at'][side, pos] = now
+
+    def results(self):
+        """{expiry: ExpiryGreeks} with (2, n) arrays (row 0 = CE, row 1 = PE), copied."""
+        with self.lock:
+            return {expiry: ExpiryGreeks(expiry, s['strikes'], s['symbols'], s['iv'].copy(), s['delta'].copy(),
+                                         s['gamma'].copy(), s['theta'].copy())
+                    for expiry, s in self.state.items()}
+
+    def by_symbol(self):
+        """{symbol: {'iv', 'delta', 'gamma', 'theta'}} for every option with greeks."""
+        found = {}
+        for greeks in self.results().values():
+            for side, pos in zip(*np.nonzero(np.isfinite(greeks.iv))):
+                found[greeks.symbols[side, pos]] = {
+                    'iv': float(greeks.iv[side, pos]), 'delta': float(greeks.delta[side, pos]),
+                    'gamma': float(greeks.gamma[side, pos]), 'theta': float(greeks.theta[side, pos]),
+                }
+        return found
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import datetime as dt
+import pandas as pd
+
+HISTORY_KEY = "/{symbol}/historical_data"
+
+
+def is_table_format(hdf_file_path, key):
+    """True if `key` in the file is stored in the queryable `table` format."""
+    with pd.HDFStore(hdf_file_path, mode='r') as store:
+        return key in store and store.get_storer(key).is_table
+
+
+def read_range(hdf_file_path, key, start, end, columns=None):
+    """
+    Rows with start <= index <= end from a `table`-format key. The condition is
+    pushed down to PyTables, so only the matching rows are read off disk.
+    """
+    where = [f"index >= Timestamp('{pd.Timestamp(start)}')", f"index <= Timestamp('{pd.Timestamp(end)}')"]
+    with pd.HDFStore(hdf_file_path, mode='r') as store:
+        df = store.select(key, where=where, columns=columns)
+    # Rows upserted into an earlier range are stored after the later ones
+    return df if df.index.is_monotonic_increasing else df.sort_index()
+
+
+def write_table(df, hdf_file_path, key, complevel=5):
+    """Writes `df` as a `table` key with an indexed timestamp, replacing any existing key."""
+    df.to_hdf(hdf_file_path, key=key, mode='a', format='table', index=True,
+              complevel=complevel, complib='blosc')
+
+
+def upsert_table(df, hdf_file_path, key, complevel=5):
+    """
+    Merges `df` into a `table` key without rewriting it: stored rows inside the
+    time range of `df` are deleted with a where clause (none when `df` starts after
+    the stored maximum timestamp), then `df` is appended. Rows of `df` win over
+    stored rows.
+    """
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    existing = None
+    with pd.HDFStore(hdf_file_path, mode='a') as store:
+        if key in store and store.get_storer(key).is_table:
+            store.remove(key, where=[f"index >= Timestamp('{df.index[0]}')", f"index <= Timestamp('{df.index[-1]}')"])
+            store.append(key, df, complevel=complevel, complib='blosc')
+            return
+        if key in store:
+            existing = store.select(key)
+    if existing is not None:
+        # Fixed-format key: merged and rewritten as a table once
+        df = pd.concat([existing, df])
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+    write_table(df, hdf_file_path, key, complevel)
+
+
+def migrate(src_hdf_path, dst_hdf_path, keys=None):
+    """
+    Copies the keys of `src_hdf_path` into `dst_hdf_path` in `table` format.
+    Keys already in table format in the destination are skipped.
+
+    Returns:
+        list: the migrated keys.
+    """
+    with pd.HDFStore(src_hdf_path, mode='r') as store:
+        keys = list(store.keys()) if keys is None else keys
+    migrated = []
+    for key in keys:
+        if os.path.exists(dst_hdf_path) and is_table_format(dst_hdf_path, key):
+            print(f"{key}: already a table in {dst_hdf_path}, skipping")
+            continue
+        t0 = time.perf_counter()
+        df = pd.read_hdf(src_hdf_path, key=key).sort_index()
+        write_table(df, dst_hdf_path, key)
+        print(f"{key}: {len(df)} rows migrated in {time.perf_counter() - t0:.1f}s")
+        migrated.append(key)
+    return migrated
+
+
+def _measure(read):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    df = read()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def compare_window_reads(src_hdf_path, table_hdf_path, symbol='NSE:NIFTY50-INDEX', days=30, end=None):
+    """
+    Times a `days`-long window read both ways: the full-series read followed by
+    `.loc`, and the pushed-down range read on the table copy.
+
+    Returns:
+        dict: latency (s), peak traced memory (MB) and rows for each method.
+    """
+    key = HISTORY_KEY.format(symbol=symbol)
+    if end is None:
+        with pd.HDFStore(table_hdf_path, mode='r') as store:
+            end = store.select_column(key, 'index').iloc[-1]
+    end = pd.Timestamp(end)
+    start = end - dt.timedelta(days=days)
+
+    full_df, full_s, full_peak = _measure(lambda: pd.read_hdf(src_hdf_path, key=key).loc[start:end])
+    range_df, range_s, range_peak = _measure(lambda: read_range(table_hdf_path, key, start, end))
+    if len(full_df) != len(range_df):
+        print(f"Warning: row counts differ (full {len(full_df)}, range {len(range_df)})")
+    return {
+        'window': f"{start} -> {end}",
+        'full_read': {'seconds': full_s, 'peak_mb': full_peak / 1e6, 'rows': len(full_df)},
+        'range_read': {'seconds': range_s, 'peak_mb': range_peak / 1e6, 'rows': len(range_df)},
+    }
+
+
+def print_comparison(report):
+    print(f"\n--- {report['window']} ---")
+    print(f"{'method':12s} {'latency':>10s} {'peak MB':>10s} {'rows':>8s}")
+    for method in ('full_read', 'range_read'):
+        r = report[method]
+        print(f"{method:12s} {r['seconds'] * 1000:8.1f}ms {r['peak_mb']:10.1f} {r['rows']:8d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate HDF history to table format and compare window reads.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = sub.add_parser('migrate', help="Copy keys into a table-format file.")
+    migrate_parser.add_argument('src')
+    migrate_parser.add_argument('dst')
+    migrate_parser.add_argument('--symbols', nargs='*', help="Symbols to migrate (default: every key).")
+    report_parser = sub.add_parser('report', help="Compare a window read on the original and the table copy.")
+    report_parser.add_argument('src')
+    report_parser.add_argument('dst')
+    report_parser.add_argument('--symbol', default='NSE:NIFTY50-INDEX')
+    report_parser.add_argument('--days', type=int, default=30)
+    report_parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        keys = None if not args.symbols else [HISTORY_KEY.format(symbol=s) for s in args.symbols]
+        migrate(args.src, args.dst, keys)
+        sys.exit(0)
+
+    report = compare_window_reads(args.src, args.dst, symbol=args.symbol, days=args.days)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_comparison(report)
@@ -1,5 +1,8 @@
 '''HisData_bydate (symbol, tf,sd,ed,fyers)'''
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from fyers_apiv3 import fyersModel
 import pandas as pd
 import numpy as np
@@ -13,38 +16,114 @@ folder_path = os.path.join(r'D:\00_ml_trading\api_logs', current_date)
 file_path = os.path.join(folder_path, 'symbols.txt')
 
 
-def HisData_bydate (symbol, tf,sd,ed,fyers):
-    """ 
-    example_usage = HisData_bydate ('NSE:BAJAJ-AUTO-EQ', '1','2023-10-14','2023-12-10',fyers)
-    """
-    data = {"symbol":symbol,"resolution":str(tf),
+def candles_to_df(candles):
+    """Fyers history candles ([epoch, o, h, l, c, v] rows) to a DataFrame indexed by naive IST timestamps."""
+    raw_df= pd.DataFrame(candles)                                                       #creating raw data frame
+    raw_df.columns=['timestamp','Open','High','Low','Close','tradingVolume']     # appending the collumns of data frame
+    raw_df['timestamp'] = pd.to_datetime(raw_df['timestamp'],unit='s')                                # converting date time from string to date time format
+    raw_df.timestamp = (raw_df.timestamp.dt.tz_localize('UTC').dt.tz_convert('Asia/Kolkata'))         #converting timeframe to IST
+    raw_df['timestamp'] = raw_df['timestamp'].dt.tz_localize(None)                                    # localizing
+    raw_df = raw_df.set_index('timestamp')
+    return raw_df
+
+
+def _history_request(symbol, tf, sd, ed):
+    return {"symbol":symbol,"resolution":str(tf),
     "date_format":"1",
     "range_from":str(sd),
     "range_to":str(ed),
     "cont_flag":"1"}
-    response = fyers.history(data=data)  
+
+
+def HisData_bydate (symbol, tf,sd,ed,fyers):
+    """ 
+    example_usage = HisData_bydate ('NSE:BAJAJ-AUTO-EQ', '1','2023-10-14','2023-12-10',fyers)
+    """
+    response = fyers.history(data=_history_request(symbol, tf, sd, ed))
     # print(response)                                                           #fetching the data from historical API
     try:
-        raw_df= pd.DataFrame(response['candles'])                                                       #creating raw data frame
-        raw_df.columns=['timestamp','Open','High','Low','Close','tradingVolume']     # appending the collumns of data frame
-        raw_df['timestamp'] = pd.to_datetime(raw_df['timestamp'],unit='s')                                # converting date time from string to date time format
-        raw_df.timestamp = (raw_df.timestamp.dt.tz_localize('UTC').dt.tz_convert('Asia/Kolkata'))         #converting timeframe to IST
-        raw_df['timestamp'] = raw_df['timestamp'].dt.tz_localize(None)                                    # localizing
-        raw_df = raw_df.set_index('timestamp')
-        return raw_df
+        return candles_to_df(response['candles'])
     except:
         print(response)
-        
-def full_df_generator(symbol, yrs, tf, fyers, start_date=None, end_date=None):
+
+
+# --- Concurrent chunked download ---
+
+class RateLimiter:
+    """Spaces calls at least 1/calls_per_second apart across threads."""
+    def __init__(self, calls_per_second):
+        self.interval = 1.0 / calls_per_second
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def plan_windows(start_date, end_date, window_days=99):
+    """(sd, ed) request windows covering [start_date, end_date], newest first, as full_df_generator walked them."""
+    windows = []
+    ed = end_date
+    while True:
+        sd = max(ed - dt.timedelta(days=window_days), start_date)
+        windows.append((sd, ed))
+        ed = sd
+        if ed <= start_date:
+            break
+    return windows
+
+
+def _fetch_window(symbol, tf, sd, ed, fyers, limiter, retries, backoff):
+    """
+    One window with retries. A successful response without candles (e.g. before
+    listing) is final; errors and malformed responses are retried with backoff.
+
+    Returns:
+        tuple: (df or None, attempts, seconds, last response on failure)
+    """
+    t0 = time.perf_counter()
+    response = None
+    for attempt in range(1, retries + 2):
+        limiter.wait()
+        try:
+            response = fyers.history(data=_history_request(symbol, tf, sd, ed))
+            if isinstance(response, dict) and response.get('s') in ('ok', 'no_data'):
+                candles = response.get('candles') or []
+                df = candles_to_df(candles) if candles else None
+                return df, attempt, time.perf_counter() - t0, None
+        except Exception as e:
+            response = e
+        if attempt <= retries:
+            time.sleep(backoff * 2 ** (attempt - 1))
+    return None, retries + 1, time.perf_counter() - t0, response
+
+
+def full_df_generator(symbol, yrs, tf, fyers, start_date=None, end_date=None,
+                      max_workers=4, calls_per_second=8, retries=3, backoff=1.0, verbose=True,
+                      raise_on_failure=False):
     """ 
     takes the number of years for the data pull
-    example usage : sample_df = full_df_generator ('NSE:BAJAJ-AUTO-EQ', fyers,3)
+    example usage : sample_df = full_df_generator ('NSE:BAJAJ-AUTO-EQ', 3, '1', fyers)
     
+    All 99-day windows are planned up front and fetched concurrently by a bounded
+    thread pool under the API rate limit; failed windows are retried. The pieces
+    are concatenated once, in order, keeping the later copy of boundary timestamps
+    that two windows share.
+
     Parameters:
     - symbol (str): The symbol for which the data is to be fetched.
     - fyers (object): The fyers model object.
     - start_date (datetime.date, optional): The start date for data fetching.
     - end_date (datetime.date, optional): The end date for data fetching.
+    - max_workers (int): Concurrent requests.
+    - calls_per_second (float): Request rate ceiling shared by the workers.
+    - retries (int): Retries per failed window.
+    - raise_on_failure (bool): Raise RuntimeError if any window still fails after retries.
     
     Returns:
     - pd.DataFrame: A dataframe with the historical data sorted by index.
@@ -58,34 +137,35 @@ def full_df_generator(symbol, yrs, tf, fyers, start_date=None, end_date=None):
     if start_date is None:
         start_date = end_date - dt.timedelta(weeks=yrs*53)
     
-    df = pd.DataFrame()
-    ed = end_date
-    
-    while True:
-        sd = (ed - dt.timedelta(days=99))
-        
-        # Stop if start date is reached
-        if sd < start_date:
-            sd = start_date
-        
-        # print(symbol)
-        # print(sd)
-        # print(ed)
-        
-    
-        try:
-            dx = HisData_bydate(symbol, tf, sd, ed, fyers)
-            df = df._append(dx)
-        except Exception as e:
-            print(f"Error or is done: {e}")
-            break
-        
-        ed = sd
-        
-        # Break the loop if the start date is reached
-        if ed <= start_date:
-            break
-    
-    df_sorted = df.sort_index()
-    return df_sorted
+    windows = plan_windows(start_date, end_date)
+    limiter = RateLimiter(calls_per_second)
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_fetch_window, symbol, tf, sd, ed, fyers, limiter, retries, backoff)
+                   for sd, ed in windows]
+        results = [future.result() for future in futures]
 
+    pieces, failed = [], []
+    for (sd, ed), (dx, attempts, seconds, error) in zip(windows, results):
+        if error is not None:
+            print(f"{symbol} {sd} -> {ed}: failed after {attempts} attempts: {error}")
+            failed.append((sd, ed))
+        elif verbose:
+            rows = 0 if dx is None else len(dx)
+            print(f"{symbol} {sd} -> {ed}: {rows} rows, {attempts} attempt(s), {seconds:.2f}s")
+        if dx is not None:
+            pieces.append(dx)
+
+    if failed and raise_on_failure:
+        raise RuntimeError(f"{symbol}: {len(failed)} window(s) failed: {failed}")
+    if not pieces:
+        return pd.DataFrame()
+
+    # Windows are newest first; concatenate oldest first so keep='last' keeps the later window's bar
+    df = pd.concat(pieces[::-1])
+    df = df.sort_index(kind='stable')
+    df_sorted = df[~df.index.duplicated(keep='last')]
+    if verbose:
+        print(f"{symbol}: {len(df_sorted)} rows from {len(windows)} windows in {time.perf_counter() - t0:.1f}s")
+    return df_sorted
@@ -0,0 +1,235 @@
+import hashlib
+import datetime as dt
+from threading import Lock
+import numpy as np
+import pandas as pd
+
+from bar_store import get_bar_store
+import fractals
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+HDF_COLUMN_MAP = {'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'tradingVolume': 'volume'}
+MARKET_OPEN_MINUTE = 9 * 60 + 15
+
+
+def session_bucket_starts(timestamps, minutes):
+    """
+    Start of the `minutes`-long bar each timestamp falls in, anchored at 09:15 of its own day.
+
+    Args:
+        timestamps (np.ndarray): datetime64[ns] timestamps.
+        minutes (int): bar length in minutes.
+
+    Returns:
+        np.ndarray: datetime64[ns] bucket starts.
+    """
+    minute = timestamps.astype('datetime64[m]').astype(np.int64)
+    minute_of_day = minute % 1440
+    bucket = minute - minute_of_day + MARKET_OPEN_MINUTE + ((minute_of_day - MARKET_OPEN_MINUTE) // minutes) * minutes
+    return bucket.astype('datetime64[m]').astype('datetime64[ns]')
+
+
+def fractal_flags(high, low, length):
+    """
+    Flags the bars whose high (low) is the max (min) of the centred `length`-bar window,
+    matching `SignalGenerator._calculate_historical_fractals`.
+    """
+    return fractals.fractal_flags(high, low, window=length, strict=False)
+
+
+class HistoricalBarCache:
+    """
+    One symbol's 1-minute history, held as sorted NumPy arrays.
+
+    The history is a list of time-ordered segments: one private copy for a frame,
+    or one per archive year whose arrays are views onto the memory-mapped year
+    files (so processes reading the same archive share its pages). Positions are
+    global across segments, and only a range that crosses a segment is copied.
+
+    Date-range slices are served by binary search, higher-timeframe bars are built once
+    for the whole history, and per-date warm-up seeds are memoized.
+    """
+    def __init__(self, df):
+        df = df.rename(columns=HDF_COLUMN_MAP, errors='ignore')
+        index = pd.to_datetime(df.index).values.astype('datetime64[ns]')
+        order = np.argsort(index, kind='stable')
+        columns = {col: df[col].to_numpy(dtype=np.float64)[order] for col in OHLCV_COLUMNS if col in df.columns}
+        self._set_segments([(index[order], columns)])
+
+    def _set_segments(self, segments):
+        self._segments = [seg for seg in segments if len(seg[0])] or [segments[0]]
+        sizes = [len(ts) for ts, _ in self._segments]
+        self._offsets = np.r_[0, np.cumsum(sizes)].astype(np.int64)   # offset table: segment k holds [offsets[k], offsets[k+1])
+        self._tf_bars = {}
+        self._seeds = {}
+        self._lock = Lock()
+
+    @classmethod
+    def from_hdf(cls, hdf_file_path, symbol):
+        print(f"--- Loading {symbol} history into bar cache from {hdf_file_path} ---")
+        return cls(pd.read_hdf(hdf_file_path, key=f"/{symbol}/historical_data"))
+
+    @classmethod
+    def from_archive(cls, archive, symbol):
+        """Builds the cache on a bar_archive.BarArchive's memory-mapped year arrays (no copy)."""
+        print(f"--- Mapping {symbol} history into bar cache from archive {archive.archive_dir} ---")
+        segments = []
+        for year in archive.years(symbol):
+            records = archive.year_array(symbol, year)
+            segments.append((records['ts'].view('datetime64[ns]'), {col: records[col] for col in OHLCV_COLUMNS}))
+        cache = cls.__new__(cls)
+        cache._set_segments(segments or [(np.empty(0, dtype='datetime64[ns]'),
+                                          {col: np.empty(0) for col in OHLCV_COLUMNS})])
+        return cache
+
+    @classmethod
+    def from_store(cls, store, symbol):
+        print(f"--- Loading {symbol} history into bar cache from {store.store_dir} ---")
+        return cls(store.read_all(symbol))
+
+    @staticmethod
+    def _bounds(timestamps, start, end):
+        lo = np.searchsorted(timestamps, pd.Timestamp(start).to_datetime64(), side='left')
+        hi = np.searchsorted(timestamps, pd.Timestamp(end).to_datetime64(), side='right')
+        return lo, hi
+
+    @staticmethod
+    def _to_frame(timestamps, columns, lo, hi):
+        index = pd.DatetimeIndex(timestamps[lo:hi], name='timestamp')
+        return pd.DataFrame({col: values[lo:hi] for col, values in columns.items()}, index=index, copy=True)
+
+    def slice_bounds(self, start, end):
+        """Positions [lo, hi) of the 1-minute bars with start <= timestamp <= end."""
+        lo = hi = 0
+        for ts, _ in self._segments:
+            seg_lo, seg_hi = self._bounds(ts, start, end)
+            lo += seg_lo
+            hi += seg_hi
+        return int(lo), int(hi)
+
+    def _pieces(self, lo, hi):
+        """(timestamps, columns) views of each segment's part of positions [lo, hi)."""
+        pieces = []
+        for offset, (ts, columns) in zip(self._offsets, self._segments):
+            a, b = max(lo - offset, 0), min(hi - offset, len(ts))
+            if b > a:
+                pieces.append((ts[a:b], {col: values[a:b] for col, values in columns.items()}))
+        return pieces
+
+    def arrays(self, lo, hi):
+        """
+        (timestamps, {column: values}) of the 1-minute bars at positions [lo, hi).
+        Views within one segment; a range crossing segments is concatenated.
+        """
+        pieces = self._pieces(lo, hi)
+        if len(pieces) == 1:
+            return pieces[0]
+        if not pieces:
+            ts, columns = self._segments[0]
+            return ts[:0], {col: values[:0] for col, values in columns.items()}
+        return (np.concatenate([ts for ts, _ in pieces]),
+                {col: np.concatenate([columns[col] for _, columns in pieces]) for col in pieces[0][1]})
+
+    def _frame_1m(self, lo, hi):
+        timestamps, columns = self.arrays(lo, hi)
+        return self._to_frame(timestamps, columns, 0, len(timestamps))
+
+    def bars_1m(self, start, end):
+        """1-minute bars with start <= timestamp <= end, as a new DataFrame."""
+        return self._frame_1m(*self.slice_bounds(start, end))
+
+    @staticmethod
+    def _reduce_timeframe(timestamps, columns, timeframe):
+        buckets = session_bucket_starts(timestamps, timeframe)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]]) if len(buckets) else np.array([], dtype=np.int64)
+        ends = np.r_[starts[1:], len(buckets)] - 1
+        reducers = {
+            'open': lambda v: v[starts],
+            'high': lambda v: np.maximum.reduceat(v, starts),
+            'low': lambda v: np.minimum.reduceat(v, starts),
+            'close': lambda v: v[ends],
+            'volume': lambda v: np.add.reduceat(v, starts),
+        }
+        return buckets[starts], {col: reducers[col](values) if len(starts) else np.asarray(values[:0])
+                                 for col, values in columns.items()}
+
+    def _timeframe_arrays(self, timeframe):
+        with self._lock:
+            if timeframe not in self._tf_bars:
+                # Buckets never span midnight, so segments (archive years) reduce independently
+                reduced = [self._reduce_timeframe(ts, columns, timeframe) for ts, columns in self._segments]
+                timestamps = np.concatenate([ts for ts, _ in reduced])
+                columns = {col: np.concatenate([c[col] for _, c in reduced]) for col in reduced[0][1]}
+                self._tf_bars[timeframe] = (timestamps, columns)
+            return self._tf_bars[timeframe]
+
+    def bars(self, timeframe, start, end):
+        """`timeframe`-minute session-anchored bars starting within [start, end]."""
+        timestamps, columns = self._timeframe_arrays(timeframe)
+        lo, hi = self._bounds(timestamps, start, end)
+        return self._to_frame(timestamps, columns, lo, hi)
+
+    def fingerprint(self, start, end):
+        """Hex digest of the 1-minute bars in [start, end]; changes when that history changes."""
+        pieces = self._pieces(*self.slice_bounds(start, end))
+        digest = hashlib.sha1()
+        for ts, _ in pieces:
+            digest.update(ts.tobytes())
+        for name in OHLCV_COLUMNS:
+            for _, columns in pieces:
+                digest.update(columns[name].tobytes())
+        return digest.hexdigest()
+
+    def seed_for_date(self, trade_date, timeframe=3, fractal_length=5, lookback_days=30):
+        """
+        Warm-up data for a trading day: the 1-minute and `timeframe` bars of the
+        `lookback_days` before it, and the fractal levels found in that window.
+
+        Returns:
+            dict: {'bars_1m': df, 'bars': df, 'up': [(ts, high)], 'down': [(ts, low)]}
+        """
+        day_start = pd.Timestamp(trade_date).normalize()
+        key = (day_start, timeframe, fractal_length, lookback_days)
+        if key not in self._seeds:
+            start = day_start - dt.timedelta(days=lookback_days)
+            end = day_start - dt.timedelta(seconds=1)
+            timestamps, columns = self._timeframe_arrays(timeframe)
+            lo, hi = self._bounds(timestamps, start, end)
+            up, down = fractal_flags(columns['high'][lo:hi], columns['low'][lo:hi], fractal_length)
+            window_ts = timestamps[lo:hi]
+            self._seeds[key] = {
+                'bounds_1m': self.slice_bounds(start, end),
+                'bounds': (lo, hi),
+                'up': [(pd.Timestamp(ts), v) for ts, v in zip(window_ts[up], columns['high'][lo:hi][up])],
+                'down': [(pd.Timestamp(ts), v) for ts, v in zip(window_ts[down], columns['low'][lo:hi][down])],
+            }
+        seed = self._seeds[key]
+        timestamps, columns = self._timeframe_arrays(timeframe)
+        return {
+            'bars_1m': self._frame_1m(*seed['bounds_1m']),
+            'bars': self._to_frame(timestamps, columns, *seed['bounds']),
+            'up': list(seed['up']),
+            'down': list(seed['down']),
+        }
+
+
+# --- Process-wide registry ---
+
+_bar_caches = {}
+_registry_lock = Lock()
+
+def get_bar_cache(hdf_file_path, symbol='NSE:NIFTY50-INDEX'):
+    """Returns the shared cache for (file, symbol), loaded through the local bar store on first use."""
+    key = (hdf_file_path, symbol)
+    with _registry_lock:
+        if key not in _bar_caches:
+            _bar_caches[key] = HistoricalBarCache.from_store(get_bar_store(hdf_file_path), symbol)
+        return _bar_caches[key]
+
+def is_bar_cache_loaded(hdf_file_path, symbol='NSE:NIFTY50-INDEX'):
+    return (hdf_file_path, symbol) in _bar_caches
+
+def register_bar_cache(hdf_file_path, symbol, cache):
+    """Installs an already-built cache, e.g. one made from synthetic bars."""
+    with _registry_lock:
+        _bar_caches[(hdf_file_path, symbol)] = cache
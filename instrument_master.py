@@ -0,0 +1,109 @@
+import re
+import datetime as dt
+from functools import lru_cache
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+WEEKLY_MONTH_CODES = {'1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, 'O': 10, 'N': 11, 'D': 12}
+MONTH_ABBR = {'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+              'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12}
+MONTHLY_EXPIRY_WEEKDAY = 3  # Thursday, as in option_bot_option_decoding.get_last_thursday
+
+# e.g. NSE:NIFTY25D0925950CE (weekly: YY, month code, DD) and NSE:NIFTY25DEC25950CE (monthly: YY, MON)
+WEEKLY_PATTERN = r"^(?:[A-Z]+:)?(?P<underlying>[A-Z&-]+?)(?P<yy>\d{2})(?P<month>[1-9OND])(?P<day>\d{2})(?P<strike>\d+)(?P<type>CE|PE)$"
+MONTHLY_PATTERN = r"^(?:[A-Z]+:)?(?P<underlying>[A-Z&-]+?)(?P<yy>\d{2})(?P<mon>" + "|".join(MONTH_ABBR) + r")(?P<strike>\d+)(?P<type>CE|PE)$"
+_WEEKLY_RE = re.compile(WEEKLY_PATTERN)
+_MONTHLY_RE = re.compile(MONTHLY_PATTERN)
+
+Instrument = namedtuple('Instrument', ['symbol', 'underlying', 'expiry', 'strike', 'option_type', 'weekly'])
+
+
+@lru_cache(maxsize=None)
+def monthly_expiry(year, month):
+    """Last MONTHLY_EXPIRY_WEEKDAY of the month."""
+    next_month = dt.date(year + month // 12, month % 12 + 1, 1)
+    last_day = next_month - dt.timedelta(days=1)
+    return last_day - dt.timedelta(days=(last_day.weekday() - MONTHLY_EXPIRY_WEEKDAY) % 7)
+
+
+@lru_cache(maxsize=None)
+def parse_symbol(symbol):
+    """
+    Parses a Fyers option symbol (weekly or monthly, exchange prefix optional) into
+    an Instrument; None for anything that is not an option (e.g. the index) or
+    whose expiry is not a real date.
+    """
+    match = _WEEKLY_RE.match(symbol)
+    if match:
+        try:
+            expiry = dt.date(2000 + int(match['yy']), WEEKLY_MONTH_CODES[match['month']], int(match['day']))
+        except ValueError:
+            return None  # weekly shape but an impossible date (e.g. day 31 of a 30-day month)
+        weekly = True
+    else:
+        match = _MONTHLY_RE.match(symbol)
+        if not match:
+            return None
+        expiry = monthly_expiry(2000 + int(match['yy']), MONTH_ABBR[match['mon']])
+        weekly = False
+    return Instrument(symbol, match['underlying'], expiry, int(match['strike']), match['type'], weekly)
+
+
+def parse_symbols(symbols):
+    """
+    Batch parse: a DataFrame (one row per input, same order) with columns symbol,
+    underlying, expiry (datetime64), strike (float, NaN for non-options),
+    option_type and weekly. Each distinct symbol is parsed once.
+    """
+    symbols = pd.Series(symbols, dtype=object).reset_index(drop=True)
+    unique = pd.Series(symbols.unique(), dtype=object)
+
+    weekly = unique.str.extract(WEEKLY_PATTERN)
+    monthly = unique.str.extract(MONTHLY_PATTERN)
+    is_weekly = weekly['type'].notna().to_numpy()
+    is_monthly = ~is_weekly & monthly['type'].notna().to_numpy()
+
+    expiry = np.full(len(unique), np.datetime64('NaT'), dtype='datetime64[D]')
+    if is_weekly.any():
+        w = weekly[is_weekly]
+        expiry[is_weekly] = pd.to_datetime(pd.DataFrame({
+            'year': 2000 + w['yy'].astype(int),
+            'month': w['month'].map(WEEKLY_MONTH_CODES),
+            'day': w['day'].astype(int),
+        }), errors='coerce').to_numpy().astype('datetime64[D]')
+        # Impossible dates are not options, as in parse_symbol
+        is_weekly = is_weekly & ~np.isnat(expiry)
+    if is_monthly.any():
+        m = monthly[is_monthly]
+        expiry[is_monthly] = [np.datetime64(monthly_expiry(2000 + int(yy), MONTH_ABBR[mon]))
+                              for yy, mon in zip(m['yy'], m['mon'])]
+
+    def pick(column):
+        return weekly[column].where(is_weekly, monthly[column])
+
+    table = pd.DataFrame({
+        'symbol': unique,
+        'underlying': pick('underlying'),
+        'expiry': expiry.astype('datetime64[ns]'),
+        'strike': pd.to_numeric(pick('strike')),
+        'option_type': pick('type'),
+        'weekly': is_weekly,
+    })
+    positions = pd.Index(unique).get_indexer(symbols)
+    return table.iloc[positions].reset_index(drop=True)
+
+
+def is_option(symbol):
+    return parse_symbol(symbol) is not None
+
+
+def option_type_of(symbol):
+    """'CE', 'PE' or None."""
+    instrument = parse_symbol(symbol)
+    return None if instrument is None else instrument.option_type
+
+
+def strike_of(symbol):
+    instrument = parse_symbol(symbol)
+    return None if instrument is None else instrument.strike
@@ -0,0 +1,176 @@
+import time
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # optional: the same loops run as plain Python
+    njit = None
+    HAVE_NUMBA = False
+
+BACKENDS = ('numba', 'python') if HAVE_NUMBA else ('python',)
+DEFAULT_BACKEND = BACKENDS[0]
+
+# Exit reasons returned by simulate_exits, as in TradeManager.check_for_exit
+EXIT_OPEN, EXIT_STOP_LOSS, EXIT_PARTIAL_TP, EXIT_FINAL_TP, EXIT_EOD = -1, 0, 1, 2, 3
+EXIT_REASONS = {EXIT_STOP_LOSS: "Stop-loss hit", EXIT_PARTIAL_TP: "Partial TP hit",
+                EXIT_FINAL_TP: "Final TP hit", EXIT_EOD: "End of day exit"}
+
+
+# --- Kernels (plain Python loops; compiled with numba when it is installed) ---
+
+def _supertrend_kernel(close, upper, lower):
+    """pandas_ta's supertrend band ratchet over precomputed hl2 +/- multiplier * ATR bands (modified in place)."""
+    n = close.shape[0]
+    trend = np.full(n, np.nan)
+    direction = np.ones(n, dtype=np.int8)
+    for i in range(1, n):
+        if close[i] > upper[i - 1]:
+            direction[i] = 1
+        elif close[i] < lower[i - 1]:
+            direction[i] = -1
+        else:
+            direction[i] = direction[i - 1]
+            if direction[i] > 0 and lower[i] < lower[i - 1]:
+                lower[i] = lower[i - 1]
+            if direction[i] < 0 and upper[i] > upper[i - 1]:
+                upper[i] = upper[i - 1]
+        trend[i] = lower[i] if direction[i] > 0 else upper[i]
+    return trend, direction
+
+
+def _confirm_fractals_kernel(up, down, high, low, lag):
+    """Latest up/down fractal level known at each bar: a fractal at bar i is only confirmed at bar i + lag."""
+    n = up.shape[0]
+    up_level = np.full(n, np.nan)
+    down_level = np.full(n, np.nan)
+    last_up = np.nan
+    last_down = np.nan
+    for t in range(n):
+        i = t - lag
+        if i >= 0:
+            if up[i]:
+                last_up = high[i]
+            if down[i]:
+                last_down = low[i]
+        up_level[t] = last_up
+        down_level[t] = last_down
+    return up_level, down_level
+
+
+def _simulate_exits_kernel(prices, eod, entry_price, tp_levels, sl_ratio, fill_at_level):
+    """
+    One trade's exits along a premium path, tick by tick as TradeManager.check_for_exit:
+    stop-loss first, then the next take-profit (a partial exit of one lot that
+    trails the SL to sl_ratio * exit price, or the final exit), then end of day.
+    With fill_at_level, stop and take-profit exits fill at their levels rather
+    than at the path price (bar extremes overshoot them).
+    Returns per-lot exit index, price and reason (EXIT_OPEN while not exited).
+    """
+    n_lots = tp_levels.shape[0]
+    exit_index = np.full(n_lots, -1, dtype=np.int64)
+    exit_price = np.full(n_lots, np.nan)
+    exit_reason = np.full(n_lots, -1, dtype=np.int8)
+    sl = entry_price * sl_ratio
+    lot = 0
+    for i in range(prices.shape[0]):
+        p = prices[i]
+        if not p > 0:
+            continue
+        if p <= sl:
+            fill = sl if fill_at_level else p
+            for k in range(lot, n_lots):
+                exit_index[k] = i
+                exit_price[k] = fill
+                exit_reason[k] = 0
+            return exit_index, exit_price, exit_reason
+        if p >= tp_levels[lot]:
+            fill = tp_levels[lot] if fill_at_level else p
+            exit_index[lot] = i
+            exit_price[lot] = fill
+            if lot == n_lots - 1:
+                exit_reason[lot] = 2
+                return exit_index, exit_price, exit_reason
+            exit_reason[lot] = 1
+            lot += 1
+            sl = fill * sl_ratio
+            continue
+        if eod[i]:
+            for k in range(lot, n_lots):
+                exit_index[k] = i
+                exit_price[k] = p
+                exit_reason[k] = 3
+            return exit_index, exit_price, exit_reason
+    return exit_index, exit_price, exit_reason
+
+
+_KERNELS = {
+    'python': {
+        'supertrend': _supertrend_kernel,
+        'confirm_fractals': _confirm_fractals_kernel,
+        'simulate_exits': _simulate_exits_kernel,
+    },
+}
+if HAVE_NUMBA:
+    _KERNELS['numba'] = {name: njit(cache=True, nogil=True)(kernel) for name, kernel in _KERNELS['python'].items()}
+
+
+def _kernel(name, backend):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in _KERNELS:
+        raise ValueError(f"Backend {backend!r} not available (have {', '.join(BACKENDS)})")
+    return _KERNELS[backend][name]
+
+
+def _f8(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# --- Public API ---
+
+def supertrend(high, low, close, atr, multiplier=3.0, backend=None):
+    """
+    Supertrend line and direction (1 up, -1 down) from an ATR series, as
+    pandas_ta.supertrend computes them once its ATR is known. The line is NaN
+    at bar 0, where pandas_ta reports 0 (checked in benchmark_suite jit_kernels).
+    """
+    hl2 = (_f8(high) + _f8(low)) / 2.0
+    matr = multiplier * _f8(atr)
+    return _kernel('supertrend', backend)(_f8(close), hl2 + matr, hl2 - matr)
+
+
+def confirm_fractals(up, down, high, low, length=5, backend=None):
+    """
+    Up and down fractal levels as they were known at each bar (no look-ahead):
+    a fractal centred at bar i is confirmed length // 2 bars later.
+    """
+    return _kernel('confirm_fractals', backend)(np.ascontiguousarray(up, dtype=np.bool_),
+                                                np.ascontiguousarray(down, dtype=np.bool_),
+                                                _f8(high), _f8(low), length // 2)
+
+
+def simulate_exits(prices, eod, entry_price, tp_levels, sl_ratio=0.90, fill_at_level=False, backend=None):
+    """
+    Exit legs of one trade over a premium tick path (see _simulate_exits_kernel).
+    `eod` flags the ticks at or after the end-of-day exit time; `tp_levels` has
+    one take-profit price per lot, in order.
+    """
+    return _kernel('simulate_exits', backend)(_f8(prices), np.ascontiguousarray(eod, dtype=np.bool_),
+                                              float(entry_price), _f8(tp_levels), float(sl_ratio),
+                                              bool(fill_at_level))
+
+
+def warmup(verbose=True):
+    """Compiles every kernel on tiny inputs so the JIT cost is not paid on the first live candle."""
+    if not HAVE_NUMBA:
+        return 0.0
+    t0 = time.perf_counter()
+    x = np.linspace(100.0, 110.0, 16)
+    flags = np.zeros(16, dtype=bool)
+    supertrend(x + 1, x - 1, x, np.ones(16), backend='numba')
+    confirm_fractals(flags, flags, x, x, backend='numba')
+    simulate_exits(x, flags, 100.0, np.array([120.0, 130.0]), backend='numba')
+    elapsed = time.perf_counter() - t0
+    if verbose:
+        print(f"JIT kernels compiled in {elapsed:.2f}s")
+    return elapsed
@@ -0,0 +1,175 @@
+from threading import Lock
+from collections import namedtuple
+import numpy as np
+
+from instrument_master import parse_symbol
+
+SIDES = ('CE', 'PE')
+FIELDS = ('ltp', 'volume', 'updated', 'oi')
+
+ExpiryView = namedtuple('ExpiryView', ['expiry', 'strikes', 'symbols', 'ltp', 'volume', 'updated', 'oi'])
+
+
+class _ExpiryBook:
+    """Arrays of one expiry: strikes (n,), and (2, n) per field with row 0 = CE, row 1 = PE."""
+    def __init__(self, expiry):
+        self.expiry = expiry
+        self.strikes = np.empty(0)
+        self.symbols = np.empty((2, 0), dtype=object)
+        self.fields = {name: np.empty((2, 0)) for name in FIELDS}
+
+    def add_strikes(self, new_strikes):
+        """Re-lays the arrays over the union of strikes; returns {old position: new position}."""
+        strikes = np.union1d(self.strikes, new_strikes)
+        remap = np.searchsorted(strikes, self.strikes)
+        symbols = np.full((2, len(strikes)), '', dtype=object)
+        symbols[:, remap] = self.symbols
+        fields = {}
+        for name, values in self.fields.items():
+            grown = np.full((2, len(strikes)), np.nan)
+            grown[:, remap] = values
+            fields[name] = grown
+        self.strikes, self.symbols, self.fields = strikes, symbols, fields
+        return dict(enumerate(remap.tolist()))
+
+    def view(self):
+        def frozen(values):
+            values = values.copy()
+            values.setflags(write=False)
+            return values
+        return ExpiryView(self.expiry, frozen(self.strikes), frozen(self.symbols),
+                          *(frozen(self.fields[name]) for name in FIELDS))
+
+
+class ChainSnapshot:
+    """
+    Read-only copy of the chain at one version: `books` maps expiry -> ExpiryView,
+    whose (2, n) arrays have row 0 = CE and row 1 = PE, columns by strike.
+    """
+    def __init__(self, version, books):
+        self.version = version
+        self.books = books
+        self.expiries = sorted(books)
+
+    @property
+    def empty(self):
+        return not self.books
+
+    def nearest_expiry(self):
+        return self.expiries[0] if self.expiries else None
+
+    def options(self, option_type, expiry=None):
+        """[{'symbol', 'price'}] of every option of the type with a positive premium."""
+        side = SIDES.index(option_type)
+        expiries = self.expiries if expiry is None else [expiry]
+        found = []
+        for exp in expiries:
+            book = self.books[exp]
+            ltp = book.ltp[side]
+            for pos in np.flatnonzero(ltp > 0):
+                found.append({'symbol': book.symbols[side, pos], 'price': float(ltp[pos])})
+        return found
+
+    def table_records(self, greeks=None):
+        """
+        Rows for the plotter's option chain table, one per (expiry, strike), by strike.
+        `greeks` ({expiry: greeks_engine.ExpiryGreeks}) adds IV (%) and delta columns.
+        """
+        records = []
+        for exp in self.expiries:
+            book = self.books[exp]
+            expiry_greeks = (greeks or {}).get(exp)
+            if expiry_greeks is not None and not np.array_equal(expiry_greeks.strikes, book.strikes):
+                expiry_greeks = None
+            for pos in range(len(book.strikes)):
+                ce, pe = book.symbols[0, pos], book.symbols[1, pos]
+                if not ce and not pe:
+                    continue
+                record = {
+                    "CE Option": ce, "CE LTP": _price(book.ltp[0, pos]),
+                    "PE Option": pe, "PE LTP": _price(book.ltp[1, pos]),
+                }
+                if expiry_greeks is not None:
+                    record.update({
+                        "CE IV": _price(expiry_greeks.iv[0, pos] * 100), "CE Delta": _price(expiry_greeks.delta[0, pos], 3),
+                        "PE IV": _price(expiry_greeks.iv[1, pos] * 100), "PE Delta": _price(expiry_greeks.delta[1, pos], 3),
+                    })
+                records.append(record)
+        return records
+
+
+def _price(value, digits=2):
+    return "" if np.isnan(value) else round(float(value), digits)
+
+
+class LiveOptionChain:
+    """
+    Option chain kept up to date from ticks: per expiry, CE and PE arrays of ltp,
+    volume, last update time and OI, indexed by strike and written in place.
+
+    `snapshot()` returns an immutable ChainSnapshot; it is rebuilt only when the
+    chain has changed since the last call.
+    """
+    def __init__(self):
+        self.books = {}
+        self.slots = {}          # symbol -> (book, side, position)
+        self.non_options = set()
+        self.version = 0
+        self._snapshot = None
+        self.lock = Lock()
+
+    def _slot(self, symbol):
+        slot = self.slots.get(symbol)
+        if slot is not None or symbol in self.non_options:
+            return slot
+        instrument = parse_symbol(symbol)
+        if instrument is None:
+            self.non_options.add(symbol)
+            return None
+        book = self.books.get(instrument.expiry)
+        if book is None:
+            book = self.books[instrument.expiry] = _ExpiryBook(instrument.expiry)
+        if instrument.strike not in book.strikes:
+            remap = book.add_strikes([instrument.strike])
+            for sym, (b, side, pos) in list(self.slots.items()):
+                if b is book:
+                    self.slots[sym] = (b, side, remap[pos])
+        side = SIDES.index(instrument.option_type)
+        pos = int(np.searchsorted(book.strikes, instrument.strike))
+        book.symbols[side, pos] = symbol
+        self.slots[symbol] = slot = (book, side, pos)
+        return slot
+
+    def update(self, symbol, ltp, volume=None, updated=None, oi=None):
+        """Writes a tick into the chain; ticks of non-option symbols are ignored."""
+        with self.lock:
+            slot = self._slot(symbol)
+            if slot is None:
+                return
+            book, side, pos = slot
+            fields = book.fields
+            fields['ltp'][side, pos] = ltp
+            if volume is not None:
+                fields['volume'][side, pos] = volume
+            if updated is not None:
+                fields['updated'][side, pos] = updated
+            if oi is not None:
+                fields['oi'][side, pos] = oi
+            self.version += 1
+
+    def drop(self, symbol):
+        """Clears a symbol's values (e.g. after unsubscribing) so stale premiums are not used."""
+        with self.lock:
+            slot = self.slots.get(symbol)
+            if slot is None:
+                return
+            book, side, pos = slot
+            for values in book.fields.values():
+                values[side, pos] = np.nan
+            self.version += 1
+
+    def snapshot(self):
+        with self.lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = ChainSnapshot(self.version, {exp: book.view() for exp, book in self.books.items()})
+            return self._snapshot
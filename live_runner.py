@@ -2,6 +2,7 @@ import json
 import os
 import time
 import sys
+import atexit
 import datetime as dt
 
 # Add the parent directory to sys.path for module imports
@@ -11,6 +12,10 @@ from fyers_apiv3 import fyersModel
 from fyers_apiv3.FyersWebsocket import data_ws, order_ws
 from candle_df_multiprocessor import MultiTimeframeProcessor
 from plotly_live_plotter import DashPlotter
+from plot_snapshot import PlotFeed
+from api_response_cache import CachedFyers
+from subscription_manager import SubscriptionManager
+import jit_kernels
 
 # Import from final_scripts
 from final_scripts.get_access_token import get_access_token
@@ -36,6 +41,12 @@ fyers = fyersModel.FyersModel(client_id=client_id, is_async=False, token=access_
 profile = fyers.get_profile()
 print("Fyers Profile:", profile)
 
+# Opt-in on-disk cache for history and option chain responses (development runs)
+api_cache_dir = config.get('api_response_cache_dir')
+if api_cache_dir:
+    fyers = CachedFyers(fyers, api_cache_dir)
+    print(f"API response cache enabled: {api_cache_dir}")
+
 # --- Websocket Logging Setup ---
 WS_LOGS_BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ws_logs')
 date_for_logs = dt.datetime.now().strftime("%m%d%y")
@@ -54,28 +65,56 @@ def wait_for_market_open():
 
 
 # --- Dynamic Symbol Generation ---
+def get_trading_chain(fyers_instance, number_of_strikes=20):
+    """Option chain frame and date of the nearest (trading) expiry."""
+    option_chain_data = opc.options_chain_for_trade("NSE:NIFTY50-INDEX", number_of_strikes, fyers_instance, expiries='nearest')
+    expiries_list = sorted(list(option_chain_data.keys()), key=lambda x: dt.datetime.strptime(x, '%d-%m-%Y') if '-' in x else dt.datetime.strptime(x, '%Y%m%d'))
+    trading_expiry = expiries_list[0]
+    return option_chain_data[trading_expiry], trading_expiry
+
+def save_ws_config(ws_symbols, trading_expiry):
+    json_config_file = os.path.join(WS_DATE_DIR, f"ws_config_{date_for_logs}.json")
+    config_data = {"ws_symbols": ws_symbols, "expiry_date": trading_expiry}
+    with open(json_config_file, "w") as f:
+        json.dump(config_data, f)
+    print(f"Config saved: {len(ws_symbols)} symbols, expiry: {trading_expiry}")
+
 def get_ws_symbols(fyers_instance):
     symbols_to_trade = ["NSE:NIFTY50-INDEX"]
     try:
-        option_chain_data = opc.options_chain_for_trade(symbols_to_trade[0], 20, fyers_instance)
-        expiries_list = sorted(list(option_chain_data.keys()), key=lambda x: dt.datetime.strptime(x, '%d-%m-%Y') if '-' in x else dt.datetime.strptime(x, '%Y%m%d'))
-        trading_expiry = expiries_list[0]
-        trading_option_chain_df = option_chain_data[trading_expiry]
+        trading_option_chain_df, trading_expiry = get_trading_chain(fyers_instance)
         filtered_chain = trading_option_chain_df[(trading_option_chain_df['ltp'] > 40) & (trading_option_chain_df['ltp'] < 300)]
         option_symbols = list(filtered_chain['symbol'])
         ws_symbols = symbols_to_trade + option_symbols
 
         # Save config
-        json_config_file = os.path.join(WS_DATE_DIR, f"ws_config_{date_for_logs}.json")
-        config_data = {"ws_symbols": ws_symbols, "expiry_date": trading_expiry}
-        with open(json_config_file, "w") as f:
-            json.dump(config_data, f)
-        print(f"Config saved: {len(ws_symbols)} symbols, expiry: {trading_expiry}")
+        save_ws_config(ws_symbols, trading_expiry)
         return ws_symbols
     except Exception as e:
         print(f"Error getting option chain: {e}. Subscribing to Nifty index only.")
         return symbols_to_trade
 
+def get_managed_ws_symbols(fyers_instance, processor):
+    """
+    Initial symbols from an ATM-tracking SubscriptionManager over a wide chain; the
+    manager is installed on the processor and re-subscribes as the index moves.
+    Falls back to the fixed get_ws_symbols list if the chain cannot be fetched.
+    """
+    try:
+        chain_df, trading_expiry = get_trading_chain(fyers_instance, number_of_strikes=40)
+        index_rows = chain_df[~chain_df['option_type'].isin(['CE', 'PE'])]
+        index_ltp = float(index_rows['ltp'].iloc[0]) if not index_rows.empty else float(chain_df['strike_price'].median())
+        manager = SubscriptionManager.from_chain(chain_df, processor.candle_manager,
+                                                 protected=processor.traded_symbols,
+                                                 option_chain=processor.option_chain)
+        ws_symbols = ["NSE:NIFTY50-INDEX"] + manager.initial_symbols(index_ltp)
+        processor.subscription_manager = manager
+        save_ws_config(ws_symbols, trading_expiry)
+        return ws_symbols
+    except Exception as e:
+        print(f"Error setting up the subscription manager: {e}. Using the fixed symbol list.")
+        return get_ws_symbols(fyers_instance)
+
 # --- Websocket Callbacks ---
 def on_message_factory(processor):
     def on_message(message):
@@ -172,7 +211,13 @@ if __name__ == "__main__":
     hdf_file_path = os.path.join(config['hdf_files_folder'], 'index_data.h5')
 
     # --- Initialize Components ---
-    plotter = DashPlotter()
+    jit_kernels.warmup()  # compile before the first live candle, not on it
+    if config.get('plot_process', True):
+        # Plot served from its own process, fed through shared memory, so rendering never competes with ticks
+        plotter = PlotFeed.with_server()
+        atexit.register(plotter.close)
+    else:
+        plotter = DashPlotter()
     processor = MultiTimeframeProcessor(
         timeframes=timeframes_to_process,
         trading_timeframe=trading_timeframe,
@@ -194,7 +239,12 @@ if __name__ == "__main__":
 
     # --- POST-MARKET START or CONTINUATION FROM PRE-MARKET ---
     print("--- Market is open. Bot starting. Will fetch historical data after collecting initial ticks. ---")
-    ws_symbols = get_ws_symbols(fyers)
+    if config.get('dynamic_subscriptions', True):
+        ws_symbols = get_managed_ws_symbols(fyers, processor)
+    else:
+        ws_symbols = get_ws_symbols(fyers)
+    if isinstance(fyers, CachedFyers):
+        fyers.print_stats()
 
     # --- Set Capital for Live Trading ---
     try:
@@ -231,6 +281,9 @@ if __name__ == "__main__":
         on_close=on_close, on_error=on_error, on_message=on_message_factory(processor)
     )
 
+    if processor.subscription_manager is not None:
+        processor.subscription_manager.attach(fyers_data_ws)
+
     print("Connecting to Fyers Order Websocket...")
     fyers_order_ws.connect()
     print("Connecting to Fyers Data Websocket...")
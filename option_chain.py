@@ -1,5 +1,6 @@
 '''HisData_bydate (symbol, tf,sd,ed,fyers)'''
 import os
+from concurrent.futures import ThreadPoolExecutor
 from fyers_apiv3 import fyersModel
 import pandas as pd
 import numpy as np
@@ -14,45 +15,78 @@ file_path = os.path.join(folder_path, 'symbols.txt')
 
 
 
-def options_chain_for_trade(symbol,number_of_strikes,fyers):
-    expiry_dfs = {}
+CHAIN_COLUMNS = ['strike_price','symbol','option_type','ltp','oi','volume']
+
+
+def chain_frame(response):
+    """Option chain rows of an optionchain response as a DataFrame with CHAIN_COLUMNS, built column by column."""
+    rows = response['data']['optionsChain']
+    return pd.DataFrame({col: [row.get(col) for row in rows] for col in CHAIN_COLUMNS}, columns=CHAIN_COLUMNS)
+
+
+def _expiry_date(exp):
+    return dt.datetime.strptime(exp['date'], '%d-%m-%Y') if '-' in exp['date'] else dt.datetime.strptime(exp['date'], '%Y%m%d')
+
+
+def select_expiries(expiry_timestamps, expiries='all'):
+    """
+    Picks the expiries to fetch from the response's expiryData.
+
+    expiries: 'all', 'nearest', an int N (the N nearest) or a list of expiry dates
+    as they appear in expiryData (e.g. '09-12-2025').
+    """
+    candidates = expiry_timestamps[1:]  # the chain has always been read from expiryData[1:]
+    if expiries == 'all':
+        return candidates
+    if expiries == 'nearest':
+        expiries = 1
+    if isinstance(expiries, int):
+        return sorted(candidates, key=_expiry_date)[:expiries]
+    wanted = set(expiries)
+    return [exp for exp in candidates if exp['date'] in wanted]
+
+
+def options_chain_for_trade(symbol,number_of_strikes,fyers, expiries='all', max_workers=4):
+    """
+    Option chain per expiry: {expiry date: DataFrame of CHAIN_COLUMNS}.
+
+    Only the expiries picked by `expiries` (see select_expiries) are fetched;
+    several are fetched concurrently.
+    """
     data = {
         "symbol":symbol,
         "strikecount":number_of_strikes,
         "timestamp": ""
     }
     response = fyers.optionchain(data=data)
-    oi_data = pd.DataFrame.from_dict(response['data']['optionsChain'])
-    current_expiry = response['data']['expiryData'][1]['date']
-    expiry_timestamps = response['data']['expiryData']
-    oi_data_1 = oi_data[['strike_price','symbol','option_type','ltp','oi','volume']].copy()
-    expiry_dfs[current_expiry] = oi_data_1
-    print(current_expiry)
-    for i in range(1,len(expiry_timestamps)):
-        exp_time_stamp = expiry_timestamps[i]['expiry'] 
-        exp_date = expiry_timestamps[i]['date']
+    selected = select_expiries(response['data']['expiryData'], expiries)
+
+    def fetch(exp):
         data_2 = {
             "symbol":symbol,
             "strikecount":number_of_strikes,
-            "timestamp": exp_time_stamp
+            "timestamp": exp['expiry']
             }
-        response_2 = fyers.optionchain(data=data_2)
-        oi_data_2 = pd.DataFrame.from_dict(response_2['data']['optionsChain'])
-        oi_data_2 = oi_data_2[['strike_price','symbol','option_type','ltp','oi','volume']].copy()
-        expiry_dfs[exp_date] = oi_data_2
-    return expiry_dfs
+        return exp['date'], chain_frame(fyers.optionchain(data=data_2))
+
+    if len(selected) <= 1:
+        results = [fetch(exp) for exp in selected]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(selected))) as pool:
+            results = list(pool.map(fetch, selected))
+    for exp_date, _ in results:
+        print(exp_date)
+    return dict(results)
 
 
 def current_expiry_option(symbol,number_of_strikes,fyers):
-    expiry_dfs = {}
     data = {
         "symbol":symbol,
         "strikecount":number_of_strikes,
         "timestamp": ""
     }
     response = fyers.optionchain(data=data)
-    oi_data = pd.DataFrame.from_dict(response['data']['optionsChain'])
     current_expiry = response['data']['expiryData'][1]['date']
     expiry_timestamps = response['data']['expiryData']
-    oi_data_1 = oi_data[['strike_price','symbol','option_type','ltp','oi','volume']].copy()
+    oi_data_1 = chain_frame(response)
     return [current_expiry,oi_data_1,expiry_timestamps]
\ No newline at end of file
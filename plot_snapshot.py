@@ -0,0 +1,250 @@
+import os
+import sys
+import time
+import pickle
+import struct
+import argparse
+import subprocess
+from threading import Thread, Lock
+from multiprocessing import shared_memory, resource_tracker
+
+from plotly_live_plotter import DashPlotter
+
+DEFAULT_NAME = 'fyers_bot_plot'
+DEFAULT_CAPACITY = 16 * 1024 * 1024
+HEADER = struct.Struct('<QQQ')  # sequence number, payload length, writer pid
+POLL_SECONDS = 0.25
+
+
+# --- Seqlock buffer (one writer, any number of readers) ---
+
+def _process_alive(pid):
+    """True while process `pid` is running (without signalling it on Windows, where os.kill terminates)."""
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SnapshotWriter:
+    """
+    Shared-memory buffer holding the latest published payload.
+
+    Seqlock: the sequence number is made odd before the payload is written and
+    even after, so a reader that sees the same even number before and after its
+    copy knows the copy is whole. The writer never waits for readers.
+
+    The header also records the writer's pid: an existing segment is only
+    replaced when that process is gone.
+    """
+    def __init__(self, name=DEFAULT_NAME, capacity=DEFAULT_CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + capacity)
+        except FileExistsError:
+            self._remove_stale(name)
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + capacity)
+        self.seq = 0
+        HEADER.pack_into(self.shm.buf, 0, 0, 0, os.getpid())
+
+    @staticmethod
+    def _remove_stale(name):
+        """Unlinks a segment left by a writer that is no longer running; refuses one whose writer is alive."""
+        existing = shared_memory.SharedMemory(name=name)
+        try:
+            owner = HEADER.unpack_from(existing.buf, 0)[2] if existing.size >= HEADER.size else 0
+            if owner and owner != os.getpid() and _process_alive(owner):
+                raise FileExistsError(f"Plot snapshot '{name}' is in use by running process {owner}; "
+                                      f"stop it or publish under another name.")
+            existing.unlink()
+        finally:
+            existing.close()
+
+    def publish(self, payload):
+        """Writes `payload` (bytes); False if it does not fit."""
+        size = len(payload)
+        if size > self.capacity:
+            print(f"Plot snapshot of {size} bytes exceeds the {self.capacity} byte buffer; not published.")
+            return False
+        buf = self.shm.buf
+        struct.pack_into('<Q', buf, 0, self.seq + 1)       # odd: write in progress
+        struct.pack_into('<Q', buf, 8, size)
+        buf[HEADER.size:HEADER.size + size] = payload
+        self.seq += 2
+        struct.pack_into('<Q', buf, 0, self.seq)           # even: consistent
+        return True
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SnapshotReader:
+    """Reads the latest payload of a SnapshotWriter from another process."""
+    def __init__(self, name=DEFAULT_NAME, retries=100):
+        self.shm = shared_memory.SharedMemory(name=name)
+        try:
+            # The writer owns the segment; do not let this process's tracker unlink it on exit
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        except Exception:
+            pass
+        self.capacity = self.shm.size - HEADER.size
+        self.retries = retries
+        self.last_seq = 0
+
+    def read(self):
+        """The payload published since the last read, or None if there is nothing new."""
+        buf = self.shm.buf
+        for _ in range(self.retries):
+            seq, size, _ = HEADER.unpack_from(buf, 0)
+            if seq == self.last_seq:
+                return None
+            if seq % 2:
+                time.sleep(0)  # writer mid-update
+                continue
+            payload = bytes(buf[HEADER.size:HEADER.size + min(size, self.capacity)])
+            if struct.unpack_from('<Q', buf, 0)[0] == seq:
+                self.last_seq = seq
+                return payload
+        return None
+
+    def close(self):
+        self.shm.close()
+
+
+# --- Trading process side ---
+
+class PlotFeed:
+    """
+    Stand-in for DashPlotter in the trading process: the same update_data /
+    update_partial_candle calls publish versioned snapshots to shared memory
+    instead of building figures. The candles, indicators, fractals and option
+    chain are pickled once per update_data; a forming-candle update only wraps
+    those bytes with the new partial candle.
+    """
+    def __init__(self, name=DEFAULT_NAME, capacity=DEFAULT_CAPACITY):
+        self.writer = SnapshotWriter(name, capacity)
+        self.version = 0
+        self.data_version = 0
+        self.data = None
+        self.partial = None
+        self.process = None
+        self.server_exit_reported = False
+        self.lock = Lock()  # keeps the seqlock single-writer if several threads update the plot
+
+    @classmethod
+    def with_server(cls, name=DEFAULT_NAME, port=8050, capacity=DEFAULT_CAPACITY):
+        """
+        Creates the feed and starts the plot server as a separate interpreter (not a
+        multiprocessing child, which would re-run the launching script's top level).
+        """
+        feed = cls(name, capacity)
+        feed.process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--name', name, '--port', str(port),
+                                         '--parent-pid', str(os.getpid())])
+        print(f"--- Plot server process started (pid {feed.process.pid}), reading snapshot '{name}' ---")
+        return feed
+
+    def update_data(self, new_df, trading_timeframe=None, option_chain=None, greeks=None):
+        data = pickle.dumps({'df': new_df, 'trading_timeframe': trading_timeframe,
+                             'option_chain': option_chain, 'greeks': greeks},
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.data_version += 1
+            self.data = data
+            self._publish()
+
+    def update_partial_candle(self, candle):
+        if not candle:
+            return
+        with self.lock:
+            self.partial = {k: candle[k] for k in ('timestamp', 'open', 'high', 'low', 'close')}
+            self._publish()
+
+    def _publish(self):
+        if self.process is not None and not self.server_exit_reported and self.process.poll() is not None:
+            print(f"Plot server process exited with code {self.process.returncode}; the live plot is not being served.")
+            self.server_exit_reported = True
+        self.version += 1
+        self.writer.publish(pickle.dumps({'version': self.version, 'data_version': self.data_version,
+                                          'data': self.data, 'partial': self.partial},
+                                         protocol=pickle.HIGHEST_PROTOCOL))
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+        self.writer.close()
+
+
+# --- Plot process side ---
+
+def run_plot_server(name=DEFAULT_NAME, port=8050, parent_pid=None):
+    """
+    Serves the DashPlotter from snapshots published by a PlotFeed. Returns when
+    the bot process `parent_pid` is gone (so a crashed bot does not leave the
+    port held and a stale chart served), and exits with an error when the web
+    server stops, e.g. because the port is already in use.
+    """
+    plotter = DashPlotter(start_server=False)
+    server_errors = []
+
+    def serve():
+        try:
+            plotter.app.run(debug=False, port=port)
+        except BaseException as e:  # werkzeug reports a failed bind with sys.exit
+            server_errors.append(e)
+
+    server = Thread(target=serve, daemon=True)
+    server.start()
+    print(f"--- Plot server on http://127.0.0.1:{port} (snapshot '{name}') ---")
+
+    parent_ppid = os.getppid()
+    reader = None
+    data_version = None
+    while True:
+        if parent_pid is not None and (os.getppid() != parent_ppid or not _process_alive(parent_pid)):
+            print(f"Plot server: bot process {parent_pid} is gone; shutting down.")
+            break
+        if not server.is_alive():
+            reason = server_errors[0] if server_errors else "stopped"
+            print(f"Plot server: could not serve on port {port} ({reason!r}); is another plot server still running?")
+            sys.exit(1)
+        if reader is None:
+            try:
+                reader = SnapshotReader(name)
+            except FileNotFoundError:
+                time.sleep(1)
+                continue
+        payload = reader.read()
+        if payload is not None:
+            snapshot = pickle.loads(payload)
+            if snapshot['data'] is not None and snapshot['data_version'] != data_version:
+                data = pickle.loads(snapshot['data'])
+                plotter.update_data(data['df'], data['trading_timeframe'], data['option_chain'], data['greeks'])
+                data_version = snapshot['data_version']
+            plotter.update_partial_candle(snapshot['partial'])
+        time.sleep(POLL_SECONDS)
+    if reader is not None:
+        reader.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the live plot from a trading process's shared-memory snapshots.")
+    parser.add_argument('--name', default=DEFAULT_NAME, help="Shared memory segment published by the bot.")
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--parent-pid', type=int, help="Exit when this process (the bot) is gone.")
+    args = parser.parse_args()
+    run_plot_server(args.name, args.port, args.parent_pid)
@@ -1,6 +1,8 @@
+import math
 import dash
-from dash import dcc, html, dash_table
-from dash.dependencies import Input, Output
+from dash import dcc, html, dash_table, Patch, no_update
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
@@ -10,10 +12,31 @@ import logging
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
+# Fixed trace order, so incremental updates can address traces by index
+CANDLE_TRACE, SMA_TRACE, UP_TRACE, DOWN_TRACE = 0, 1, 2, 3
+WILLR_TRACES = {'WILLR_20': 4, 'WILLR_15': 5, 'WILLR_45': 6}
+UP_WILLR_TRACE, DOWN_WILLR_TRACE = 7, 8
+LINE_TRACES = {'SMA_50': SMA_TRACE, **WILLR_TRACES}
+FRACTAL_TRACES = (('up_fractal', UP_TRACE, UP_WILLR_TRACE, 5), ('down_fractal', DOWN_TRACE, DOWN_WILLR_TRACE, -5))
+MAX_CLIENT_BARS = 240  # a browser figure grown past this many bars gets a full re-render
+
+
+def _num(value):
+    """JSON-safe number (NaN/None -> None)."""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
 class DashPlotter:
-    def __init__(self):
+    def __init__(self, start_server=True):
         self.df = pd.DataFrame()
-        self.option_chain = pd.DataFrame()
+        self.option_chain = None  # live_option_chain.ChainSnapshot (immutable, shared without copying)
+        self.greeks = None  # {expiry: greeks_engine.ExpiryGreeks}
+        self.partial = None  # forming candle of the trading timeframe
+        self.version = 0  # bumped on every data change; clients at this version are skipped
+        self.layout_version = 0  # bumped when the figure must be rebuilt from scratch
+        self.table_version = 0
         self.lock = Lock()
         self.app = dash.Dash(__name__)
         self.trading_timeframe = 3
@@ -23,14 +46,19 @@ class DashPlotter:
             html.H1("Live Nifty Multi-Timeframe Chart", style={'textAlign': 'center'}),
             dcc.Graph(id='live-update-graph', style={'height': '1200px', 'width': '100%'}),
             dcc.Interval(id='interval-component', interval=2*1000, n_intervals=0),
+            dcc.Store(id='client-state'),  # what this browser's figure already shows
             html.H2("Option Chain", style={'textAlign': 'center'}),
             dash_table.DataTable(
                 id='option-chain-table',
                 columns=[
                     {"name": "CE Option", "id": "CE Option"},
                     {"name": "CE LTP", "id": "CE LTP"},
+                    {"name": "CE IV", "id": "CE IV"},
+                    {"name": "CE Δ", "id": "CE Delta"},
                     {"name": "PE Option", "id": "PE Option"},
                     {"name": "PE LTP", "id": "PE LTP"},
+                    {"name": "PE IV", "id": "PE IV"},
+                    {"name": "PE Δ", "id": "PE Delta"},
                 ],
                 data=[],
             )
@@ -38,8 +66,13 @@ class DashPlotter:
 
         self.app.callback(
             [Output('live-update-graph', 'figure'),
-             Output('option-chain-table', 'data')],
-            [Input('interval-component', 'n_intervals')])(self.update_graph_and_table)
+             Output('option-chain-table', 'data'),
+             Output('client-state', 'data')],
+            [Input('interval-component', 'n_intervals')],
+            [State('client-state', 'data')])(self.update_graph_and_table)
+
+        if not start_server:
+            return
 
         self.server_thread = Thread(target=self.run_app)
         self.server_thread.daemon = True
@@ -53,25 +86,142 @@ class DashPlotter:
     def run_app(self):
         self.app.run(debug=False, port=8050)
 
-    def update_data(self, new_df, trading_timeframe=None, option_chain=None):
+    def update_data(self, new_df, trading_timeframe=None, option_chain=None, greeks=None):
         with self.lock:
             self.df = new_df
-            if trading_timeframe:
+            if trading_timeframe and trading_timeframe != self.trading_timeframe:
                 self.trading_timeframe = trading_timeframe
+                self.layout_version += 1
+            if self.partial is not None and not new_df.empty and self.partial['timestamp'] <= new_df.index[-1]:
+                self.partial = None
             if option_chain is not None:
                 self.option_chain = option_chain
-
-    def update_graph_and_table(self, n):
+            if greeks is not None:
+                self.greeks = greeks
+            if option_chain is not None or greeks is not None:
+                self.table_version += 1
+            self.version += 1
+
+    def update_partial_candle(self, candle):
+        """Shows the forming candle (CandleManager.get_partial_candle of the trading timeframe)."""
+        if not candle:
+            return
+        with self.lock:
+            if not self.df.empty and candle['timestamp'] < self.df.index[-1]:
+                return
+            self.partial = {k: candle[k] for k in ('timestamp', 'open', 'high', 'low', 'close')}
+            self.version += 1
+
+    @staticmethod
+    def _plot_frame(df, partial):
+        """Completed bars plus the forming one (its indicators are unknown until it closes)."""
+        if partial is None:
+            return df
+        row = pd.DataFrame([{k: partial[k] for k in ('open', 'high', 'low', 'close')}],
+                           index=pd.DatetimeIndex([partial['timestamp']]))
+        if not df.empty and partial['timestamp'] == df.index[-1]:
+            return pd.concat([df.iloc[:-1], row.combine_first(df.iloc[-1:])])
+        return pd.concat([df, row])
+
+    @staticmethod
+    def _price_range(df):
+        return [float(df['low'].min() - 25), float(df['high'].max() + 25)]
+
+    def update_graph_and_table(self, n, client_state=None):
+        """
+        Interval callback. A browser whose figure is at the current data version is
+        skipped (nothing is built or sent); one at the current layout gets a Patch
+        with the new bars appended and its last bar rewritten; anything else gets
+        the full figure.
+        """
         with self.lock:
-            df = self.df.copy()
-            option_chain = self.option_chain.copy()
+            if client_state and client_state.get('version') == self.version:
+                raise PreventUpdate
+            df = self._plot_frame(self.df, self.partial)
+            option_chain = self.option_chain
+            greeks = self.greeks
+            version, layout_version, table_version = self.version, self.layout_version, self.table_version
             title = f'Live Nifty {self.trading_timeframe}-Min Chart'
 
+        if client_state and client_state.get('table') == table_version:
+            records = no_update
+        else:
+            # Option chain table straight from the live chain snapshot (rows by strike)
+            records = option_chain.table_records(greeks) if option_chain is not None else []
+
         if df.empty:
             empty_fig = go.Figure()
             empty_fig.update_layout(title_text='Waiting for data...', height=1200)
-            return empty_fig, []
-
+            return empty_fig, records, {'version': version, 'layout': None, 'table': table_version}
+
+        patch = self._figure_patch(df, client_state, layout_version)
+        if patch is not None:
+            figure, state = patch
+        else:
+            figure, state = self._build_figure(df, title), self._client_state(df, layout_version)
+        state.update(version=version, table=table_version)
+        return figure, records, state
+
+    def _client_state(self, df, layout_version):
+        state = {'layout': layout_version, 'n': len(df), 'last_ts': df.index[-1].isoformat(),
+                 'y_range': self._price_range(df)}
+        for column, *_ in FRACTAL_TRACES:
+            points = df[column].dropna() if column in df.columns else pd.Series(dtype=float)
+            state[column] = points.index[-1].isoformat() if not points.empty else None
+        return state
+
+    def _figure_patch(self, df, client_state, layout_version):
+        """(Patch, new client state) bringing the client's figure up to `df`, or None if it needs a full render."""
+        if not client_state or client_state.get('layout') != layout_version or not client_state.get('last_ts'):
+            return None
+        last_ts = pd.Timestamp(client_state['last_ts'])
+        pos = df.index.searchsorted(last_ts)
+        if pos >= len(df) or df.index[pos] != last_ts:
+            return None
+        n, new = client_state['n'], df.iloc[pos + 1:]
+        if n + len(new) > MAX_CLIENT_BARS:
+            return None
+
+        patch = Patch()
+        # The client's last bar may have been the forming candle: rewrite it
+        row = df.iloc[pos]
+        for field in ('open', 'high', 'low', 'close'):
+            patch['data'][CANDLE_TRACE][field][n - 1] = _num(row[field])
+        for column, trace in LINE_TRACES.items():
+            patch['data'][trace]['y'][n - 1] = _num(row.get(column))
+
+        if not new.empty:
+            x = [ts.isoformat() for ts in new.index]
+            patch['data'][CANDLE_TRACE]['x'].extend(x)
+            for field in ('open', 'high', 'low', 'close'):
+                patch['data'][CANDLE_TRACE][field].extend([_num(v) for v in new[field]])
+            for column, trace in LINE_TRACES.items():
+                patch['data'][trace]['x'].extend(x)
+                values = new[column] if column in new.columns else [None] * len(new)
+                patch['data'][trace]['y'].extend([_num(v) for v in values])
+
+        for column, trace, willr_trace, offset in FRACTAL_TRACES:
+            if column not in df.columns:
+                continue
+            points = df[column].dropna()
+            if client_state.get(column):
+                points = points[points.index > pd.Timestamp(client_state[column])]
+            if points.empty:
+                continue
+            x = [ts.isoformat() for ts in points.index]
+            patch['data'][trace]['x'].extend(x)
+            patch['data'][trace]['y'].extend([_num(v) for v in points.values])
+            if 'WILLR_20' in df.columns:
+                patch['data'][willr_trace]['x'].extend(x)
+                patch['data'][willr_trace]['y'].extend([_num(v) for v in df['WILLR_20'].loc[points.index] + offset])
+
+        state = self._client_state(df, layout_version)
+        state['n'] = n + len(new)
+        if state['y_range'] != client_state.get('y_range'):
+            patch['layout']['yaxis']['range'] = state['y_range']
+        return patch, state
+
+    def _build_figure(self, df, title):
         # === CREATE SUBPLOTS: 2 rows ===
         # Row 1: Candles + Fractals (900px)
         # Row 2: Williams %R (300px)
@@ -93,60 +243,57 @@ class DashPlotter:
             name='Candles'
         ), row=1, col=1)
 
+        # Every trace is always added (possibly empty) so trace indices stay fixed for patches
+        def column(name):
+            return df[name] if name in df.columns else pd.Series(float('nan'), index=df.index)
+        empty = pd.Series(dtype=float)
+        up = df['up_fractal'].dropna() if 'up_fractal' in df.columns else empty
+        down = df['down_fractal'].dropna() if 'down_fractal' in df.columns else empty
+
         # SMA Line
-        if 'SMA_50' in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df['SMA_50'],
-                mode='lines', name='SMA 50',
-                line=dict(color='blue', width=2)
-            ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=df.index, y=column('SMA_50'),
+            mode='lines', name='SMA 50', showlegend='SMA_50' in df.columns,
+            line=dict(color='blue', width=2)
+        ), row=1, col=1)
 
         # Up Fractals (on price chart)
-        if 'up_fractal' in df.columns:
-            up = df['up_fractal'].dropna()
-            if not up.empty:
-                fig.add_trace(go.Scatter(
-                    x=up.index, y=up.values,
-                    mode='markers', name='Up Fractal',
-                    marker=dict(symbol='triangle-up', color='lime', size=14,
-                                line=dict(width=2, color='darkgreen'))
-                ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=up.index, y=up.values,
+            mode='markers', name='Up Fractal',
+            marker=dict(symbol='triangle-up', color='lime', size=14,
+                        line=dict(width=2, color='darkgreen'))
+        ), row=1, col=1)
 
         # Down Fractals (on price chart)
-        if 'down_fractal' in df.columns:
-            down = df['down_fractal'].dropna()
-            if not down.empty:
-                fig.add_trace(go.Scatter(
-                    x=down.index, y=down.values,
-                    mode='markers', name='Down Fractal',
-                    marker=dict(symbol='triangle-down', color='red', size=14,
-                                line=dict(width=2, color='darkred'))
-                ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=down.index, y=down.values,
+            mode='markers', name='Down Fractal',
+            marker=dict(symbol='triangle-down', color='red', size=14,
+                        line=dict(width=2, color='darkred'))
+        ), row=1, col=1)
 
         # === ROW 2: WILLIAMS %R SUBPLOT ===
-        # WILLR_14 (current TF)
-        if 'WILLR_20' in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df['WILLR_20'],
-                mode='lines', name='WILLR 20',
-                line=dict(color='purple', width=2)
-            ), row=2, col=1)
+        # WILLR_20 (current TF)
+        fig.add_trace(go.Scatter(
+            x=df.index, y=column('WILLR_20'),
+            mode='lines', name='WILLR 20', showlegend='WILLR_20' in df.columns,
+            line=dict(color='purple', width=2)
+        ), row=2, col=1)
 
         # WILLR_15 (projected)
-        if 'WILLR_15' in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df['WILLR_15'],
-                mode='lines', name='WILLR 15-min',
-                line=dict(color='sienna', width=2, dash='dot')
-            ), row=2, col=1)
+        fig.add_trace(go.Scatter(
+            x=df.index, y=column('WILLR_15'),
+            mode='lines', name='WILLR 15-min', showlegend='WILLR_15' in df.columns,
+            line=dict(color='sienna', width=2, dash='dot')
+        ), row=2, col=1)
 
         # WILLR_45 (projected)
-        if 'WILLR_45' in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df['WILLR_45'],
-                mode='lines', name='WILLR 45-min',
-                line=dict(color='darkviolet', width=2, dash='dashdot')
-            ), row=2, col=1)
+        fig.add_trace(go.Scatter(
+            x=df.index, y=column('WILLR_45'),
+            mode='lines', name='WILLR 45-min', showlegend='WILLR_45' in df.columns,
+            line=dict(color='darkviolet', width=2, dash='dashdot')
+        ), row=2, col=1)
 
         # Overbought / Oversold lines
         fig.add_hline(y=-80, line_dash="dash", line_color="red",
@@ -161,28 +308,24 @@ class DashPlotter:
                       annotation_text="Bearish Rejection", row=2, col=1)
 
         # === FRACTALS ON WILLR SUBPLOT (±5 units) ===
-        if 'WILLR_20' in df.columns:
-            willr_val = df['WILLR_20']
-
-            # Up Fractal: +5 above current WILLR
-            if 'up_fractal' in df.columns:
-                up_idx = df['up_fractal'].dropna().index
-                up_willr = willr_val.loc[up_idx]
-                fig.add_trace(go.Scatter(
-                    x=up_idx, y=up_willr + 5,
-                    mode='markers', name='Up Fractal (WILLR)',
-                    marker=dict(symbol='triangle-up', color='lime', size=10)
-                ), row=2, col=1)
-
-            # Down Fractal: -5 below current WILLR
-            if 'down_fractal' in df.columns:
-                down_idx = df['down_fractal'].dropna().index
-                down_willr = willr_val.loc[down_idx]
-                fig.add_trace(go.Scatter(
-                    x=down_idx, y=down_willr - 5,
-                    mode='markers', name='Down Fractal (WILLR)',
-                    marker=dict(symbol='triangle-down', color='red', size=10)
-                ), row=2, col=1)
+        willr_val = column('WILLR_20')
+        has_willr = 'WILLR_20' in df.columns
+
+        # Up Fractal: +5 above current WILLR
+        up_idx = up.index if has_willr else empty.index
+        fig.add_trace(go.Scatter(
+            x=up_idx, y=willr_val.loc[up_idx] + 5,
+            mode='markers', name='Up Fractal (WILLR)',
+            marker=dict(symbol='triangle-up', color='lime', size=10)
+        ), row=2, col=1)
+
+        # Down Fractal: -5 below current WILLR
+        down_idx = down.index if has_willr else empty.index
+        fig.add_trace(go.Scatter(
+            x=down_idx, y=willr_val.loc[down_idx] - 5,
+            mode='markers', name='Down Fractal (WILLR)',
+            marker=dict(symbol='triangle-down', color='red', size=10)
+        ), row=2, col=1)
 
         # === LAYOUT & STYLING ===
         fig.update_layout(
@@ -195,9 +338,7 @@ class DashPlotter:
         )
 
         # Y-axis for price
-        price_min = df['low'].min() - 25
-        price_max = df['high'].max() + 25
-        fig.update_yaxes(title_text="Price", range=[price_min, price_max], row=1, col=1)
+        fig.update_yaxes(title_text="Price", range=self._price_range(df), row=1, col=1)
 
         # Y-axis for WILLR
         fig.update_yaxes(title_text="Williams %R", range=[-100, 0], row=2, col=1)
@@ -210,30 +351,4 @@ class DashPlotter:
             ]
         )
 
-        # Prepare option chain data for the table
-        ce_options = option_chain[option_chain['Symbol'].str.contains('CE')].copy()
-        pe_options = option_chain[option_chain['Symbol'].str.contains('PE')].copy()
-
-        # Sort by strike price (assuming strike is part of the symbol and can be extracted)
-        ce_options['Strike'] = ce_options['Symbol'].apply(lambda x: int(''.join(filter(str.isdigit, x.split('CE')[0].split(':')[-1]))))
-        pe_options['Strike'] = pe_options['Symbol'].apply(lambda x: int(''.join(filter(str.isdigit, x.split('PE')[0].split(':')[-1]))))
-
-        ce_options = ce_options.sort_values(by='Strike').drop(columns=['Strike'])
-        pe_options = pe_options.sort_values(by='Strike').drop(columns=['Strike'])
-
-        # Pad with empty rows if one side has fewer options
-        max_len = max(len(ce_options), len(pe_options))
-        if len(ce_options) < max_len:
-            ce_options = pd.concat([ce_options, pd.DataFrame([{"Symbol": "", "Price": ""}] * (max_len - len(ce_options)))])
-        if len(pe_options) < max_len:
-            pe_options = pd.concat([pe_options, pd.DataFrame([{"Symbol": "", "Price": ""}] * (max_len - len(pe_options)))])
-
-        # Combine into a single DataFrame for display
-        combined_option_chain = pd.DataFrame({
-            "CE Option": ce_options['Symbol'].reset_index(drop=True),
-            "CE LTP": ce_options['Price'].reset_index(drop=True),
-            "PE Option": pe_options['Symbol'].reset_index(drop=True),
-            "PE LTP": pe_options['Price'].reset_index(drop=True),
-        })
-
-        return fig, combined_option_chain.to_dict('records')
\ No newline at end of file
+        return fig
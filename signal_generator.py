@@ -6,12 +6,18 @@ import json
 import pandas as pd
 import pandas_ta as ta
 import datetime as dt
-from final_scripts.historical import HisData_bydate
+from historical_bar_cache import get_bar_cache, is_bar_cache_loaded
+from bar_store import get_bar_store
+from fractals import fractal_flags
+import jit_kernels
 
 class SignalGenerator:
-    def __init__(self, candle_manager, trade_manager, timeframes, trading_timeframe, hdf_file_path, mode='test', fyers_model=None, plotter=None):
+    def __init__(self, candle_manager, trade_manager, timeframes, trading_timeframe, hdf_file_path, mode='test', fyers_model=None, plotter=None,
+                 option_chain_provider=None):
         self.candle_manager = candle_manager
         self.trade_manager = trade_manager
+        # Callable returning (chain snapshot, {expiry: ExpiryGreeks}) for the plot; None plots without a chain
+        self.option_chain_provider = option_chain_provider
         self.timeframes = timeframes
         self.trading_timeframe = 3  # Strategy is fixed to 3-minute timeframe
         self.mode = mode
@@ -38,8 +44,13 @@ class SignalGenerator:
         self.breakout_level = None
         self.stop_loss_level = None
 
-    def load_pre_fetched_data(self, df_1m):
-        """Loads pre-fetched historical data and prepares the strategy."""
+    def load_pre_fetched_data(self, df_1m, df_tf=None, fractal_seed=None):
+        """
+        Loads pre-fetched historical data and prepares the strategy.
+
+        `df_tf` (trading timeframe bars) and `fractal_seed` ((up, down) lists of
+        (timestamp, level)) can be passed precomputed, e.g. from the bar cache.
+        """
         if df_1m is None or df_1m.empty:
             print("Pre-fetched data is empty, will fetch on-the-fly.")
             return
@@ -49,12 +60,21 @@ class SignalGenerator:
 
         print("--- Building initial 3-min dataframe and indicators from pre-fetched data... ---")
         tf = self.trading_timeframe
-        self.dataframes[tf] = (df_1m.resample(f'{tf}min', origin='09:15')
-                                   .agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
-                                   .dropna())
+        if df_tf is not None:
+            self.dataframes[tf] = df_tf.copy()
+        else:
+            self.dataframes[tf] = (df_1m.resample(f'{tf}min', origin='09:15')
+                                       .agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+                                       .dropna())
         
         self._calculate_historical_indicators()
-        self._calculate_historical_fractals()
+        if fractal_seed is not None:
+            self.fractals[tf]['up'].clear()
+            self.fractals[tf]['down'].clear()
+            self.fractals[tf]['up'].extend(fractal_seed[0])
+            self.fractals[tf]['down'].extend(fractal_seed[1])
+        else:
+            self._calculate_historical_fractals()
         
         self.historical_data_fetched = True
         print(f"--- Pre-fetched data loaded. Strategy is active and ready for market open. ---")
@@ -133,16 +153,13 @@ class SignalGenerator:
         plot_df['up_fractal'] = plot_df.index.map(up_fractals)
         plot_df['down_fractal'] = plot_df.index.map(down_fractals)
 
-        option_chain = self._get_option_chain()
-        self.plotter.update_data(plot_df, self.trading_timeframe, option_chain)
+        option_chain, greeks = self._get_option_chain()
+        self.plotter.update_data(plot_df, self.trading_timeframe, option_chain, greeks)
 
     def _get_option_chain(self):
-        option_chain = []
-        if 1 in self.candle_manager.tick_candles:
-            for symbol, candle_data in self.candle_manager.tick_candles[1].items():
-                if 'CE' in symbol or 'PE' in symbol:
-                    option_chain.append({'Symbol': symbol, 'Price': candle_data.get('close', 0)})
-        return pd.DataFrame(option_chain)
+        if self.option_chain_provider is None:
+            return None, None
+        return self.option_chain_provider()
 
     def check_signal(self):
         if self.awaiting_breakout is not None or self.trade_manager.in_trade: return
@@ -278,9 +295,8 @@ class SignalGenerator:
         df[f'WILLR_{self.willr_length}'] = ta.willr(df['high'], df['low'], df['close'], length=self.willr_length)
         df[f'SMA_{self.sma_length}'] = ta.sma(df['close'], length=self.sma_length)
         
-        st = ta.supertrend(df['high'], df['low'], df['close'], length=self.supertrend_length, multiplier=self.supertrend_multiplier)
-        if st is not None and not st.empty:
-            df[f'SUPERT_{self.supertrend_length}_{self.supertrend_multiplier}'] = st[f'SUPERT_{self.supertrend_length}_{self.supertrend_multiplier}']
+        st = self._supertrend(df)
+        if st is not None: df[f'SUPERT_{self.supertrend_length}_{self.supertrend_multiplier}'] = st
 
     def _calculate_live_indicators(self):
         df = self.dataframes[self.trading_timeframe]
@@ -292,8 +308,18 @@ class SignalGenerator:
         sma_series = ta.sma(df['close'], length=self.sma_length)
         if sma_series is not None: df[f'SMA_{self.sma_length}'] = sma_series
 
-        st = ta.supertrend(df['high'], df['low'], df['close'], length=self.supertrend_length, multiplier=self.supertrend_multiplier)
-        if st is not None: df[f'SUPERT_{self.supertrend_length}_{self.supertrend_multiplier}'] = st[f'SUPERT_{self.supertrend_length}_{self.supertrend_multiplier}']
+        st = self._supertrend(df)
+        if st is not None: df[f'SUPERT_{self.supertrend_length}_{self.supertrend_multiplier}'] = st
+
+    def _supertrend(self, df):
+        """
+        Supertrend line: pandas_ta ATR, band ratchet in jit_kernels (compiled when numba is installed).
+        Same values as ta.supertrend(...)[SUPERT_*] except bar 0, which is NaN here and 0 in pandas_ta.
+        """
+        atr = ta.atr(df['high'], df['low'], df['close'], length=self.supertrend_length)
+        if atr is None: return None
+        trend, _ = jit_kernels.supertrend(df['high'], df['low'], df['close'], atr, self.supertrend_multiplier)
+        return pd.Series(trend, index=df.index)
 
     def _check_live_fractal(self):
         df = self.dataframes[self.trading_timeframe]
@@ -320,25 +346,20 @@ class SignalGenerator:
         
         self.fractals[tf]['up'].clear()
         self.fractals[tf]['down'].clear()
-        n = self.fractal_length
-        m = n // 2
-        for i in range(m, len(df) - m):
-            window = df.iloc[i-m : i+m+1]
-            candle = window.iloc[m]
-            
-            if candle['high'] == window['high'].max():
-                self.fractals[tf]['up'].append((window.index[m], candle['high']))
-            if candle['low'] == window['low'].min():
-                self.fractals[tf]['down'].append((window.index[m], candle['low']))
+        high, low = df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float)
+        up, down = fractal_flags(high, low, window=self.fractal_length, strict=False)
+        # deques keep the last 20 of each, as the bar-by-bar scan did
+        self.fractals[tf]['up'].extend(zip(df.index[up], high[up]))
+        self.fractals[tf]['down'].extend(zip(df.index[down], low[down]))
     
     def fetch_historical_data(self, symbol, start_date, end_date):
         if self.mode == 'live':
-            print(f"--- Fetching live historical data for {symbol} from Fyers API ---")
+            print(f"--- Fetching live historical data for {symbol} (local bar store, API for missing dates) ---")
             try:
-                df = HisData_bydate(symbol, '1', start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), self.fyers_model)
+                # Only dates the store does not cover yet are requested from the API
+                df = get_bar_store(self.hdf_file_path).read(symbol, start_date, end_date, fyers=self.fyers_model)
                 if df is not None and not df.empty:
-                    df.rename(columns={'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'tradingVolume': 'volume'}, inplace=True, errors='ignore')
-                    return df
+                    return df.rename(columns={'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'tradingVolume': 'volume'}, errors='ignore')
                 else:
                     print("Failed to fetch live historical data from Fyers API.")
                     return None
@@ -348,12 +369,12 @@ class SignalGenerator:
         else: # test mode
             print(f"--- Fetching test historical data for {symbol} from HDF file ---")
             try:
-                key = f"/{symbol}/historical_data"
-                df = pd.read_hdf(self.hdf_file_path, key=key)
-                df = df.loc[start_date:end_date].copy()
-                df.rename(columns={'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'tradingVolume': 'volume'}, inplace=True, errors='ignore')
-                df.index = pd.to_datetime(df.index)
-                return df
+                # Slice the shared bar cache when a backtest has loaded it; otherwise a
+                # range read on the bar store touches only the requested window
+                if is_bar_cache_loaded(self.hdf_file_path, symbol):
+                    return get_bar_cache(self.hdf_file_path, symbol).bars_1m(start_date, end_date)
+                df = get_bar_store(self.hdf_file_path).read(symbol, start_date, end_date)
+                return df.rename(columns={'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'tradingVolume': 'volume'}, errors='ignore')
             except Exception as e:
                 print(f"Test hist error: {e}")
                 return None
@@ -0,0 +1,148 @@
+import time
+from threading import Lock
+
+from instrument_master import parse_symbols
+
+INDEX_SYMBOL = 'NSE:NIFTY50-INDEX'
+DATA_TYPE = "SymbolUpdate"
+
+
+class SubscriptionManager:
+    """
+    Keeps the websocket subscribed to a window of option strikes around ATM and
+    around the strikes trading nearest the target premium, as the index moves.
+
+    - The window is `strikes_each_side` strikes either side of ATM (CE and PE);
+      on top of that, `premium_strikes` strikes either side of the strike whose
+      last premium is closest to `target_premium`, per option type.
+    - Hysteresis: the window is only re-centred once ATM has moved `hysteresis`
+      strikes from the last centre, and a subscribed strike is only dropped once
+      it is more than `hysteresis` strikes outside the new window.
+    - The traded option (and any symbol in `protected()`) is never unsubscribed.
+
+    `universe` is every option symbol that may be subscribed (e.g. the trading
+    expiry's chain). Unsubscribed symbols are dropped from the candle manager and
+    the live option chain so their stale premiums are not used for strike selection.
+    """
+    def __init__(self, universe, candle_manager, socket=None, strike_step=50, strikes_each_side=6,
+                 premium_strikes=2, target_premium=120, hysteresis=2, min_interval_seconds=5, protected=None,
+                 option_chain=None):
+        self.candle_manager = candle_manager
+        self.option_chain = option_chain
+        self.socket = socket
+        self.strike_step = strike_step
+        self.strikes_each_side = strikes_each_side
+        self.premium_strikes = premium_strikes
+        self.target_premium = target_premium
+        self.hysteresis = hysteresis
+        self.min_interval_seconds = min_interval_seconds
+        self.protected = protected or (lambda: set())
+
+        # (option_type, strike) -> symbol, from one batch parse of the whole universe
+        table = parse_symbols(list(universe))
+        options = table[table['option_type'].notna()]
+        self.by_key = {(option_type, int(strike)): symbol
+                       for symbol, option_type, strike in zip(options['symbol'], options['option_type'], options['strike'])}
+        self.strikes = sorted({strike for _, strike in self.by_key})
+
+        self.subscribed = set()
+        self.last_premium = {}
+        self.center = None
+        self.last_change = 0.0
+        self.lock = Lock()
+        self.stats = {'subscribed': 0, 'unsubscribed': 0, 'recenters': 0}
+
+    @classmethod
+    def from_chain(cls, chain_df, candle_manager, **kwargs):
+        """Builds the manager from an options_chain_for_trade frame, remembering its premiums."""
+        options = chain_df[chain_df['option_type'].isin(['CE', 'PE'])]
+        manager = cls(list(options['symbol']), candle_manager, **kwargs)
+        manager.last_premium.update(zip(options['symbol'], options['ltp']))
+        return manager
+
+    def attach(self, socket):
+        self.socket = socket
+
+    # --- Window ---
+
+    def _atm(self, index_ltp):
+        return round(index_ltp / self.strike_step) * self.strike_step
+
+    def _premium_anchor(self, option_type):
+        """Strike whose last known premium is closest to the target, or None."""
+        best = None
+        for (opt, strike), symbol in self.by_key.items():
+            premium = self.last_premium.get(symbol)
+            if opt == option_type and premium:
+                distance = abs(premium - self.target_premium)
+                if best is None or distance < best[0]:
+                    best = (distance, strike)
+        return None if best is None else best[1]
+
+    def _window(self, center, extra=0):
+        """Symbols inside the window around `center` (widened by `extra` strikes)."""
+        wanted = set()
+        span = (self.strikes_each_side + extra) * self.strike_step
+        for option_type in ('CE', 'PE'):
+            anchors = [(center, span)]
+            premium_strike = self._premium_anchor(option_type)
+            if premium_strike is not None:
+                anchors.append((premium_strike, (self.premium_strikes + extra) * self.strike_step))
+            for strike in self.strikes:
+                if any(abs(strike - anchor) <= width for anchor, width in anchors):
+                    symbol = self.by_key.get((option_type, strike))
+                    if symbol is not None:
+                        wanted.add(symbol)
+        return wanted
+
+    def initial_symbols(self, index_ltp):
+        """Option symbols to subscribe at startup; marks them as subscribed."""
+        with self.lock:
+            self.center = self._atm(index_ltp)
+            self.subscribed = self._window(self.center)
+            return sorted(self.subscribed)
+
+    # --- Ticks ---
+
+    def on_tick(self, message):
+        """Feed every tick; re-centres the subscription on index ticks when due."""
+        symbol = message.get('symbol')
+        ltp = message.get('ltp')
+        if not symbol or not ltp:
+            return
+        if symbol != INDEX_SYMBOL:
+            self.last_premium[symbol] = ltp
+            return
+        atm = self._atm(ltp)
+        if self.center is not None and abs(atm - self.center) < self.hysteresis * self.strike_step:
+            return
+        now = time.monotonic()
+        if now - self.last_change < self.min_interval_seconds:
+            return
+        self._recenter(atm)
+        self.last_change = now
+
+    def _recenter(self, atm):
+        with self.lock:
+            self.center = atm
+            wanted = self._window(atm)
+            keep = self._window(atm, extra=self.hysteresis) | set(self.protected())
+            to_subscribe = sorted(wanted - self.subscribed)
+            to_unsubscribe = sorted(s for s in self.subscribed if s not in keep)
+            self.subscribed = (self.subscribed | set(to_subscribe)) - set(to_unsubscribe)
+            self.stats['recenters'] += 1
+
+        if to_subscribe or to_unsubscribe:
+            print(f"--- Subscription re-centred on ATM {atm}: +{len(to_subscribe)} / -{len(to_unsubscribe)} "
+                  f"({len(self.subscribed)} options) ---")
+        if self.socket is not None:
+            if to_subscribe:
+                self.socket.subscribe(symbols=to_subscribe, data_type=DATA_TYPE)
+            if to_unsubscribe:
+                self.socket.unsubscribe(symbols=to_unsubscribe, data_type=DATA_TYPE)
+        for symbol in to_unsubscribe:
+            self.candle_manager.drop_symbol(symbol)
+            if self.option_chain is not None:
+                self.option_chain.drop(symbol)
+        self.stats['subscribed'] += len(to_subscribe)
+        self.stats['unsubscribed'] += len(to_unsubscribe)
@@ -0,0 +1,30 @@
+import os
+import sys
+import datetime as dt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from instrument_master import parse_symbol, parse_symbols
+
+
+def test_parse_symbol_weekly_and_monthly():
+    weekly = parse_symbol('NSE:NIFTY25D0925950CE')
+    assert (weekly.expiry, weekly.strike, weekly.option_type, weekly.weekly) == (dt.date(2025, 12, 9), 25950, 'CE', True)
+    monthly = parse_symbol('NSE:NIFTY25DEC25950PE')
+    assert (monthly.expiry, monthly.strike, monthly.option_type, monthly.weekly) == (dt.date(2025, 12, 25), 25950, 'PE', False)
+
+
+def test_parse_symbol_rejects_non_options():
+    assert parse_symbol('NSE:NIFTY50-INDEX') is None
+
+
+def test_parse_symbol_invalid_weekly_date_is_not_an_option():
+    # Weekly shape, but November has 30 days
+    assert parse_symbol('NSE:NIFTY25N3125950CE') is None
+    assert parse_symbol('NSE:NIFTY25D0025950CE') is None
+
+
+def test_parse_symbols_invalid_weekly_date_is_not_an_option():
+    table = parse_symbols(['NSE:NIFTY25N3125950CE', 'NSE:NIFTY25D0925950CE'])
+    assert table['option_type'].isna().tolist() == [True, False]
+    assert bool(table['weekly'].iloc[0]) is False
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import math
+import argparse
+import datetime as dt
+import numpy as np
+
+from tick_replay import TickLog, save_tick_log, INDEX_SYMBOL
+from greeks_engine import black_scholes_price
+
+WEEKLY_MONTH_CODES = {1: '1', 2: '2', 3: '3', 4: '4', 5: '5', 6: '6', 7: '7', 8: '8', 9: '9', 10: 'O', 11: 'N', 12: 'D'}
+MONTH_ABBR = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+SECONDS_PER_YEAR = 365 * 24 * 3600
+TICK_SIZE = 0.05
+
+
+def option_symbol(expiry, strike, option_type, monthly=False, underlying='NIFTY'):
+    """
+    Fyers option symbol, e.g. NSE:NIFTY25D0925950CE (weekly) or NSE:NIFTY25DEC25950CE (monthly).
+    """
+    yy = expiry.strftime('%y')
+    if monthly:
+        return f"NSE:{underlying}{yy}{MONTH_ABBR[expiry.month - 1]}{int(strike)}{option_type}"
+    return f"NSE:{underlying}{yy}{WEEKLY_MONTH_CODES[expiry.month]}{expiry.day:02d}{int(strike)}{option_type}"
+
+
+def _round_to_tick(values):
+    return np.maximum(np.round(values / TICK_SIZE) * TICK_SIZE, TICK_SIZE)
+
+
+class SyntheticTickGenerator:
+    """
+    Seeded NIFTY index + option-chain tick stream in the Fyers websocket format.
+
+    The index follows geometric Brownian motion, optionally with Poisson jumps; every
+    option is priced from it with Black-Scholes and a linear volatility skew, so premiums
+    stay consistent with the underlying. Each symbol ticks `ticks_per_second` times a
+    second (the index included); fractional rates are allowed.
+    """
+    def __init__(self, trade_date, spot=24000.0, annual_vol=0.14, drift=0.0,
+                 jump_intensity=0.0, jump_std=0.004, strikes_per_side=10, strike_step=50,
+                 n_expiries=1, expiry_weekday=1, ticks_per_second=1, skew=-0.8,
+                 rate=0.065, max_options=None, seed=42):
+        self.trade_date = trade_date if isinstance(trade_date, dt.date) else dt.date.fromisoformat(trade_date)
+        self.spot = spot
+        self.annual_vol = annual_vol
+        self.drift = drift
+        self.jump_intensity = jump_intensity      # expected jumps per trading day
+        self.jump_std = jump_std                  # log-size std of a jump
+        self.ticks_per_second = ticks_per_second
+        self.skew = skew
+        self.rate = rate
+        self.rng = np.random.default_rng(seed)
+
+        self.expiries = self._expiries(n_expiries, expiry_weekday)
+        atm = round(spot / strike_step) * strike_step
+        strikes = atm + strike_step * np.arange(-strikes_per_side, strikes_per_side + 1)
+
+        options = []
+        for expiry in self.expiries:
+            monthly = (expiry + dt.timedelta(days=7)).month != expiry.month
+            for strike in strikes:
+                for option_type in ('CE', 'PE'):
+                    options.append((abs(strike - atm), expiry, strike, option_type, monthly))
+        if max_options is not None:
+            # Keep the contracts nearest ATM
+            options = sorted(options, key=lambda o: (o[0], o[1]))[:max_options]
+
+        self.symbols = [INDEX_SYMBOL]
+        strike_col, expiry_col, call_col = [], [], []
+        for _, expiry, strike, option_type, monthly in options:
+            self.symbols.append(option_symbol(expiry, strike, option_type, monthly=monthly))
+            strike_col.append(strike)
+            expiry_col.append(dt.datetime.combine(expiry, dt.time(15, 30)).timestamp())
+            call_col.append(option_type == 'CE')
+        self.strikes = np.array(strike_col, dtype=np.float64)
+        self.expiry_epochs = np.array(expiry_col, dtype=np.float64)
+        self.is_call = np.array(call_col, dtype=bool)
+        self.volumes = np.zeros(len(self.symbols), dtype=np.int64)
+
+    def _expiries(self, n_expiries, weekday):
+        expiries, day = [], self.trade_date
+        while len(expiries) < n_expiries:
+            if day.weekday() == weekday:
+                expiries.append(day)
+            day += dt.timedelta(days=1)
+        return expiries
+
+    def iter_chunks(self, start=dt.time(9, 15), duration_seconds=375 * 60, chunk_seconds=60):
+        """
+        Yields (feed_time, symbol_ids, ltp, cumulative_volume) arrays, one chunk of
+        about `chunk_seconds` at a time, in feed order.
+        """
+        session_start = dt.datetime.combine(self.trade_date, start).timestamp()
+        rate = self.ticks_per_second
+        step_years = 1.0 / rate / (375 * 60) / 252  # one trading day = 375 minutes
+        total_steps = int(duration_seconds * rate)
+        chunk_steps = max(1, int(chunk_seconds * rate))
+        n_symbols = len(self.symbols)
+        spot = self.spot
+
+        for first_step in range(0, total_steps, chunk_steps):
+            steps = min(chunk_steps, total_steps - first_step)
+
+            # Underlying path for the chunk
+            shocks = self.rng.normal(0.0, 1.0, steps) * self.annual_vol * math.sqrt(step_years)
+            log_ret = (self.drift - 0.5 * self.annual_vol ** 2) * step_years + shocks
+            if self.jump_intensity > 0:
+                jumps = self.rng.poisson(self.jump_intensity / (375 * 60 * rate), steps)
+                log_ret += jumps * self.rng.normal(0.0, self.jump_std, steps)
+            path = spot * np.exp(np.cumsum(log_ret))
+            spot = path[-1]
+
+            feed_time = session_start + np.floor((first_step + np.arange(steps)) / rate)
+            years = (self.expiry_epochs[None, :] - feed_time[:, None]) / SECONDS_PER_YEAR
+            moneyness = np.log(self.strikes[None, :] / path[:, None])
+            vol = np.maximum(self.annual_vol + self.skew * moneyness, 0.03)
+            premiums = black_scholes_price(path[:, None], self.strikes[None, :], years, vol, self.rate, self.is_call[None, :])
+
+            ltp = np.empty((steps, n_symbols))
+            ltp[:, 0] = np.round(path / TICK_SIZE) * TICK_SIZE
+            ltp[:, 1:] = _round_to_tick(premiums)
+
+            # Every symbol ticks once per step, in a shuffled order within the step
+            order = np.argsort(self.rng.random((steps, n_symbols)), axis=1)
+            traded = self.rng.integers(0, 50, (steps, n_symbols)) * 25
+            traded[:, 0] = 0
+            volumes = self.volumes[None, :] + np.cumsum(traded, axis=0)
+            self.volumes = volumes[-1].copy()
+
+            rows = np.repeat(np.arange(steps), n_symbols)
+            cols = order.ravel()
+            yield (feed_time[rows].astype(np.int64), cols.astype(np.int32), ltp[rows, cols], volumes[rows, cols])
+
+    def iter_ticks(self, **kwargs):
+        """Yields Fyers-format tick dicts (symbol, ltp, vol_traded_today, exch_feed_time)."""
+        for feed_time, symbol_ids, ltp, volume in self.iter_chunks(**kwargs):
+            for t, sid, price, vol in zip(feed_time.tolist(), symbol_ids.tolist(), ltp.tolist(), volume.tolist()):
+                yield {'symbol': self.symbols[sid], 'ltp': round(price, 2), 'vol_traded_today': vol, 'exch_feed_time': t}
+
+
+def paced(ticks, speed=1.0):
+    """Releases ticks in step with the wall clock (`speed` x real time)."""
+    wall_start, feed_start = None, None
+    for tick in ticks:
+        if wall_start is None:
+            wall_start, feed_start = time.monotonic(), tick['exch_feed_time']
+        delay = (tick['exch_feed_time'] - feed_start) / speed - (time.monotonic() - wall_start)
+        if delay > 0:
+            time.sleep(delay)
+        yield tick
+
+
+def write_json_lines(ticks, path):
+    """Writes ticks one JSON object per line, readable by `stream_json_file`."""
+    count = 0
+    with open(path, 'w') as f:
+        for tick in ticks:
+            f.write(json.dumps(tick) + "\n")
+            count += 1
+    return count
+
+
+def write_binary(generator, path, **kwargs):
+    """Writes the stream straight from the generator's arrays in the .ticks.npz format."""
+    chunks = list(generator.iter_chunks(**kwargs))
+    feed_time, symbol_ids, ltp, volume = (np.concatenate(parts) for parts in zip(*chunks))
+    save_tick_log(TickLog(generator.symbols, symbol_ids, ltp, volume, feed_time), path)
+    return len(symbol_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic NIFTY + option-chain ticks for load testing.")
+    parser.add_argument('output', help="Output file (.txt for JSON lines, .ticks.npz for binary).")
+    parser.add_argument('--date', default=dt.date.today().isoformat(), help="Trading date, YYYY-MM-DD.")
+    parser.add_argument('--spot', type=float, default=24000.0)
+    parser.add_argument('--vol', type=float, default=0.14, help="Annualised volatility of the index.")
+    parser.add_argument('--jumps', type=float, default=0.0, help="Expected jumps per day.")
+    parser.add_argument('--strikes', type=int, default=10, help="Strikes on each side of ATM.")
+    parser.add_argument('--expiries', type=int, default=1, help="Number of weekly expiries.")
+    parser.add_argument('--rate', type=float, default=1.0, help="Ticks per second per symbol.")
+    parser.add_argument('--max-options', type=int, help="Keep only this many contracts nearest ATM.")
+    parser.add_argument('--minutes', type=int, default=375, help="Session minutes to generate from 09:15.")
+    parser.add_argument('--pace', choices=['max', 'realtime'], default='max')
+    parser.add_argument('--speed', type=float, default=1.0, help="Wall-clock multiple when pacing.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    generator = SyntheticTickGenerator(args.date, spot=args.spot, annual_vol=args.vol, jump_intensity=args.jumps,
+                                       strikes_per_side=args.strikes, n_expiries=args.expiries,
+                                       ticks_per_second=args.rate, max_options=args.max_options, seed=args.seed)
+    print(f"Generating {len(generator.symbols)} symbols x {args.rate} ticks/s for {args.minutes} minutes "
+          f"(expiries: {', '.join(str(e) for e in generator.expiries)})")
+
+    t0 = time.perf_counter()
+    if args.output.endswith('.ticks.npz'):
+        if args.pace != 'max':
+            print("Pacing applies to JSON output only; writing binary at max speed.")
+        count = write_binary(generator, args.output, duration_seconds=args.minutes * 60)
+    else:
+        ticks = generator.iter_ticks(duration_seconds=args.minutes * 60)
+        if args.pace == 'realtime':
+            ticks = paced(ticks, args.speed)
+        count = write_json_lines(ticks, args.output)
+    print(f"Wrote {count} ticks to {os.path.abspath(args.output)} in {time.perf_counter() - t0:.1f}s")
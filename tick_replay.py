@@ -0,0 +1,182 @@
+import os
+import json
+import numpy as np
+
+INDEX_SYMBOL = 'NSE:NIFTY50-INDEX'
+BINARY_SUFFIX = '.ticks.npz'
+
+
+class TickLog:
+    """
+    Columnar, in-memory copy of a recorded websocket tick file with a per-symbol index.
+
+    Only the fields `process_tick` reads are kept (symbol, ltp, vol_traded_today,
+    exch_feed_time). Missing values are stored as NaN and handed back as None.
+    """
+    def __init__(self, symbols, symbol_ids, ltp, volume, feed_time):
+        self.symbols = list(symbols)
+        self.symbol_ids = np.asarray(symbol_ids, dtype=np.int32)
+        self.ltp = np.asarray(ltp, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.feed_time = np.asarray(feed_time, dtype=np.float64)
+        self.symbol_to_id = {s: i for i, s in enumerate(self.symbols)}
+
+        # Per-symbol index: sorted positions of every tick of that symbol in the log
+        order = np.argsort(self.symbol_ids, kind='stable')
+        counts = np.bincount(self.symbol_ids, minlength=len(self.symbols))
+        self.positions = dict(enumerate(np.split(order, np.cumsum(counts)[:-1])))
+
+    def __len__(self):
+        return len(self.symbol_ids)
+
+    def message(self, pos):
+        """Rebuilds the Fyers-format tick dict at a log position."""
+        ltp = self.ltp[pos]
+        feed_time = self.feed_time[pos]
+        return {
+            'symbol': self.symbols[self.symbol_ids[pos]],
+            'ltp': None if np.isnan(ltp) else float(ltp),
+            'vol_traded_today': int(self.volume[pos]),
+            'exch_feed_time': None if np.isnan(feed_time) else int(feed_time),
+        }
+
+    def iter_messages(self):
+        for pos in range(len(self)):
+            yield self.message(pos)
+
+
+def parse_tick_file(file_path):
+    """Parses a JSON-lines tick file (as written by live_runner) into a TickLog."""
+    symbol_to_id = {}
+    ids, ltps, volumes, times = [], [], [], []
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping invalid JSON line in {os.path.basename(file_path)}: {e}")
+                continue
+            symbol = item.get('symbol')
+            if not symbol:
+                continue
+            ltp = item.get('ltp')
+            feed_time = item.get('exch_feed_time')
+            ids.append(symbol_to_id.setdefault(symbol, len(symbol_to_id)))
+            ltps.append(np.nan if ltp is None else ltp)
+            volumes.append(item.get('vol_traded_today', 0) or 0)
+            times.append(np.nan if feed_time is None else feed_time)
+    return TickLog(list(symbol_to_id), ids, ltps, volumes, times)
+
+
+def save_tick_log(tick_log, path):
+    """Writes a TickLog in the binary .ticks.npz format."""
+    with open(path, 'wb') as f:
+        np.savez(f, symbols=np.array(tick_log.symbols, dtype=str), symbol_ids=tick_log.symbol_ids,
+                 ltp=tick_log.ltp, volume=tick_log.volume, feed_time=tick_log.feed_time)
+
+
+def load_tick_log(file_path, cache_binary=False):
+    """
+    Loads a tick file into a TickLog.
+
+    Args:
+        file_path (str): JSON-lines tick file or a binary .ticks.npz file.
+        cache_binary (bool): write/reuse a .ticks.npz sidecar next to a JSON-lines file.
+    """
+    if file_path.endswith(BINARY_SUFFIX):
+        with np.load(file_path) as data:
+            return TickLog(data['symbols'].tolist(), data['symbol_ids'], data['ltp'], data['volume'], data['feed_time'])
+
+    sidecar = os.path.splitext(file_path)[0] + BINARY_SUFFIX
+    if cache_binary and os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(file_path):
+        return load_tick_log(sidecar)
+
+    tick_log = parse_tick_file(file_path)
+    if cache_binary:
+        save_tick_log(tick_log, sidecar)
+    return tick_log
+
+
+# --- Event-skipping replay ---
+
+def _safe_call(fn, message):
+    try:
+        fn(message)
+    except Exception as e:
+        print(f"Error processing tick: {e}")
+
+
+def _sync_option_premiums(processor, tick_log, premium_positions, upto_pos):
+    """
+    Brings the live option chain up to date as of `upto_pos` with each option's
+    latest tick, so that `TradeManager._find_options` sees exactly what a full
+    replay would have built.
+    """
+    option_chain = processor.option_chain
+    for sid, positions in premium_positions.items():
+        i = np.searchsorted(positions, upto_pos) - 1
+        if i < 0:
+            continue
+        message = tick_log.message(positions[i])
+        option_chain.update(message['symbol'], message['ltp'], message['vol_traded_today'],
+                            message['exch_feed_time'], message.get('oi'))
+
+
+def replay_fast_forward(processor, tick_log):
+    """
+    Replays a TickLog through a MultiTimeframeProcessor, touching only the events that
+    can change the outcome of the strategy:
+
+    - index ticks always go through `process_tick`;
+    - ticks of the traded option go to `TradeManager.check_for_exit` while a trade is open;
+    - other option ticks are skipped, and their latest premiums are synced from the
+      per-symbol index only right before an index tick that could trigger an entry.
+
+    Option candles are not built in this mode; trades match a full replay.
+    """
+    trade_manager = processor.trade_manager
+    signal_generator = processor.signal_generator
+
+    index_id = tick_log.symbol_to_id.get(INDEX_SYMBOL)
+    if index_id is None:
+        print(f"No {INDEX_SYMBOL} ticks in log, nothing to replay.")
+        return
+    index_positions = tick_log.positions[index_id]
+
+    # Option positions the chain would have taken (non-zero ltp, valid feed time), for premium syncing at entry
+    valid_ltp = (np.nan_to_num(tick_log.ltp) != 0) & ~np.isnan(tick_log.feed_time)
+    premium_positions = {}
+    for sid, positions in tick_log.positions.items():
+        if sid == index_id:
+            continue
+        positions = positions[valid_ltp[positions]]
+        if len(positions):
+            premium_positions[sid] = positions
+
+    def replay_traded_option(start_pos, end_pos):
+        symbol = trade_manager.current_trade.get('symbol')
+        sid = tick_log.symbol_to_id.get(symbol)
+        if sid is None:
+            return
+        positions = tick_log.positions[sid]
+        lo = np.searchsorted(positions, start_pos, side='right')
+        hi = np.searchsorted(positions, end_pos)
+        for pos in positions[lo:hi]:
+            if not trade_manager.in_trade:
+                return
+            _safe_call(trade_manager.check_for_exit, tick_log.message(pos))
+
+    prev_pos = -1
+    for pos in index_positions:
+        if trade_manager.in_trade:
+            replay_traded_option(prev_pos, pos)
+        if signal_generator.awaiting_breakout is not None and not trade_manager.in_trade:
+            _sync_option_premiums(processor, tick_log, premium_positions, pos)
+        _safe_call(lambda message: processor.process_tick(message=message), tick_log.message(pos))
+        prev_pos = pos
+
+    if trade_manager.in_trade:
+        replay_traded_option(prev_pos, len(tick_log))
@@ -4,7 +4,7 @@ import os
 import time
 
 class TradeManager:
-    def __init__(self, processor, mode='test', fyers_model=None, real_trade=False, log_dir=None):
+    def __init__(self, processor, mode='test', fyers_model=None, real_trade=False, log_dir=None, target_delta=None):
         self.processor = processor
         self.mode = mode
         self.fyers_model = fyers_model
@@ -21,6 +21,8 @@ class TradeManager:
         self.completed_trades = []
         self.lot_size = 75
         self.brokerage_per_lot = 50
+        self.target_premium = 120
+        self.target_delta = target_delta  # e.g. 0.35: pick by |delta| instead of premium when greeks are available
 
         # Capital and Lot Sizing
         self.capital = 30000  # Default starting capital
@@ -28,6 +30,7 @@ class TradeManager:
         self.daily_pnl = 0.0
         self.daily_loss_limit = 0.0
         self.trading_halted = False
+        self.loss_limit_checks = []  # daily P&L at each loss-limit check, until halted
 
     def set_capital(self, capital):
         """Sets the current capital and the daily loss limit."""
@@ -37,9 +40,43 @@ class TradeManager:
         self.daily_pnl = 0.0
         self.daily_loss_limit = -0.05 * self.capital
         self.trading_halted = False
+        self.loss_limit_checks = []
             
         print(f"Capital updated to: {self.capital:.2f}. Daily Loss Limit: {self.daily_loss_limit:.2f}")
 
+    @staticmethod
+    def lots_for_capital(capital):
+        """Capital-based lot sizing used on Tuesday, Thursday and Friday."""
+        if capital < 50000:
+            return 1
+        elif 50000 <= capital < 80000:
+            return 2
+        else:  # capital >= 80000
+            return int((capital - 80000) / 30000) + 2
+
+    @staticmethod
+    def take_profit_multiples(trade_lots):
+        """R-multiple of the take-profit level for each lot (one entry per lot)."""
+        if trade_lots == 1:
+            return [4]
+        elif trade_lots == 2:
+            return [3, 4]
+
+        base_lots = trade_lots // 3
+        remainder = trade_lots % 3
+
+        lots_at_2r = base_lots
+        lots_at_3r = base_lots
+        lots_at_4r = base_lots
+
+        if remainder == 1:
+            lots_at_3r += 1
+        elif remainder == 2:
+            lots_at_3r += 1
+            lots_at_4r += 1
+
+        return [2] * lots_at_2r + [3] * lots_at_3r + [4] * lots_at_4r
+
     def long_trade_triggered(self, trig_time, sl_price, breakout_level, ltp):
         if self.state != 'IDLE': return
         if dt.datetime.fromtimestamp(trig_time).time() >= dt.time(15, 15):
@@ -72,12 +109,7 @@ class TradeManager:
             print(f"  - Day is {trade_date.strftime('%A')}. Trading with 1 lot only.")
         else:  # Other days (Tuesday, Thursday, Friday)
             # Use capital-based lot sizing
-            if self.capital < 50000:
-                trade_lots = 1
-            elif 50000 <= self.capital < 80000:
-                trade_lots = 2
-            else:  # capital >= 100000
-                trade_lots = int((self.capital - 80000) / 30000) + 2
+            trade_lots = self.lots_for_capital(self.capital)
             print(f"  - Day is {trade_date.strftime('%A')}. Using capital-based lots: {trade_lots}")
 
         all_options = self._find_options(option_type)
@@ -85,7 +117,7 @@ class TradeManager:
             print(f"  - No {option_type} options found at all.")
             return
 
-        best_option = min(all_options, key=lambda x: abs(x['price'] - 120))
+        best_option = self._select_option(all_options)
         entry_price = best_option['price']
         limit_price = entry_price + 1
 
@@ -94,33 +126,7 @@ class TradeManager:
         risk_per_share = entry_price - initial_sl_price
         
         # --- Generate Take-Profit Levels based on the new complex distribution logic ---
-        tp_levels = []
-        tp_price_2r = entry_price + (risk_per_share * 2)
-        tp_price_3r = entry_price + (risk_per_share * 3)
-        tp_price_4r = entry_price + (risk_per_share * 4)
-
-        if trade_lots == 1:
-            tp_levels.append(tp_price_4r)
-        elif trade_lots == 2:
-            tp_levels.append(tp_price_3r)
-            tp_levels.append(tp_price_4r)
-        elif trade_lots >= 3:
-            base_lots = trade_lots // 3
-            remainder = trade_lots % 3
-
-            lots_at_2r = base_lots
-            lots_at_3r = base_lots
-            lots_at_4r = base_lots
-
-            if remainder == 1:
-                lots_at_3r += 1
-            elif remainder == 2:
-                lots_at_3r += 1
-                lots_at_4r += 1
-            
-            tp_levels.extend([tp_price_2r] * lots_at_2r)
-            tp_levels.extend([tp_price_3r] * lots_at_3r)
-            tp_levels.extend([tp_price_4r] * lots_at_4r)
+        tp_levels = [entry_price + (risk_per_share * r) for r in self.take_profit_multiples(trade_lots)]
 
         self.current_trade = {
             'symbol': best_option['symbol'],
@@ -366,6 +372,8 @@ class TradeManager:
         self._reset_trade_state()
 
     def _check_daily_loss_limit(self):
+        if not self.trading_halted:
+            self.loss_limit_checks.append(self.daily_pnl)
         if not self.trading_halted and self.daily_pnl <= self.daily_loss_limit:
             self.trading_halted = True
             print("\n" + "="*50)
@@ -411,13 +419,22 @@ class TradeManager:
         self.active_sl_order_id = None
 
     def _find_options(self, option_type):
-        all_options = []
-        candle_manager = self.processor.candle_manager
-        if 1 in candle_manager.tick_candles:
-            for symbol, candle_data in candle_manager.tick_candles[1].items():
-                if option_type in symbol and candle_data.get('close', 0) > 0:
-                    all_options.append({'symbol': symbol, 'price': candle_data['close']})
-        return all_options
+        if self.target_delta is None:
+            return self.processor.option_chain.snapshot().options(option_type)
+        options = self.processor.chain_with_greeks().options(option_type)
+        greeks = self.processor.greeks.by_symbol()
+        for option in options:
+            option['delta'] = greeks.get(option['symbol'], {}).get('delta')
+        return options
+
+    def _select_option(self, options):
+        """Option whose |delta| is closest to target_delta if set and known, else whose premium is closest to target_premium."""
+        if self.target_delta is not None:
+            with_delta = [o for o in options if o.get('delta') is not None]
+            if with_delta:
+                return min(with_delta, key=lambda x: abs(abs(x['delta']) - self.target_delta))
+            print(f"  - No greeks available; selecting by premium {self.target_premium}.")
+        return min(options, key=lambda x: abs(x['price'] - self.target_premium))
 
     def print_statistics(self):
         if not self.completed_trades:
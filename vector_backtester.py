@@ -0,0 +1,331 @@
+import sys
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from historical_bar_cache import HistoricalBarCache, get_bar_cache, fractal_flags, MARKET_OPEN_MINUTE
+from bar_archive import BarArchive
+from trade_manager import TradeManager
+import jit_kernels
+
+SESSION_MINUTES = 375          # 09:15 -> 15:30
+EOD_EXIT_MINUTE = 360          # 15:15, after which no entries are taken and trades are closed
+NO_HIT = SESSION_MINUTES
+
+
+def _first_hit(mask, start):
+    """Index of the first True at or after `start[k]` on each row of `mask`, NO_HIT if none."""
+    cols = np.arange(mask.shape[1])
+    mask = mask & (cols >= np.asarray(start)[:, None])
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), NO_HIT)
+
+
+def _rolling_mean(values, length):
+    out = np.full(len(values), np.nan)
+    if len(values) >= length:
+        csum = np.cumsum(np.r_[0.0, values])
+        out[length - 1:] = (csum[length:] - csum[:-length]) / length
+    return out
+
+
+def _willr(high, low, close, length):
+    out = np.full(len(close), np.nan)
+    if len(close) >= length:
+        highest = np.lib.stride_tricks.sliding_window_view(high, length).max(axis=1)
+        lowest = np.lib.stride_tricks.sliding_window_view(low, length).min(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[length - 1:] = 100 * ((close[length - 1:] - highest) / (highest - lowest))
+    return out
+
+
+class VectorBacktester:
+    """
+    Bar-level approximation of the live strategy over the 1-minute history.
+
+    Indicators, fractals and signals are computed for every 3-minute bar in one pass.
+    Breakout entries, cancellations, stops and targets are resolved from 1-minute
+    highs/lows on a (day x minute) matrix; the option premium is modelled as
+    `entry_premium + delta * index move`. When a stop and a target/entry fall in the same
+    minute the adverse outcome is assumed. Use it to shortlist days for tick-level
+    confirmation with `full_backtest_runner`.
+    """
+    def __init__(self, bar_cache, entry_premium=120.0, delta=0.5, starting_capital=25000.0):
+        self.bar_cache = bar_cache
+
+        # Strategy settings (mirror SignalGenerator / TradeManager)
+        self.trading_timeframe = 3
+        self.fractal_length = 5
+        self.willr_length = 20
+        self.sma_length = 50
+        self.down_rejection_level = -70
+        self.up_rejection_level = -30
+        self.willr_cancel_level = -50
+        self.max_sl_points = 50
+        self.sl_pct = 0.10
+        self.lot_size = 75
+        self.brokerage_per_lot = 50
+        self.daily_loss_pct = 0.05
+
+        # Option premium model
+        self.entry_premium = entry_premium
+        self.delta = delta
+        self.starting_capital = starting_capital
+
+    # --- Data layout ---
+
+    def _day_matrices(self, start, end):
+        """1-minute OHLC as (day x session minute) matrices, NaN where no bar exists."""
+        ts, columns = self.bar_cache.arrays(*self.bar_cache.slice_bounds(start, end))
+        minute = ts.astype('datetime64[m]').astype(np.int64)
+        slot = minute % 1440 - MARKET_OPEN_MINUTE
+        in_session = (slot >= 0) & (slot < SESSION_MINUTES)
+        day = ts.astype('datetime64[D]')[in_session]
+        days, day_idx = np.unique(day, return_inverse=True)
+        slot = slot[in_session]
+
+        matrices = {}
+        for col in ('high', 'low', 'close'):
+            mat = np.full((len(days), SESSION_MINUTES), np.nan)
+            mat[day_idx, slot] = columns[col][in_session]
+            matrices[col] = mat
+        return days, matrices
+
+    def _trading_bars(self, matrices):
+        """3-minute bars from the minute matrices, flattened to the sequence of existing bars."""
+        tf = self.trading_timeframe
+        n_days = matrices['high'].shape[0]
+        shape = (n_days, SESSION_MINUTES // tf, tf)
+        high = matrices['high'].reshape(shape)
+        low = matrices['low'].reshape(shape)
+        close = matrices['close'].reshape(shape)
+        present = ~np.isnan(close)
+
+        bar_high = np.where(present, high, -np.inf).max(axis=2)
+        bar_low = np.where(present, low, np.inf).min(axis=2)
+        last = tf - 1 - np.argmax(present[:, :, ::-1], axis=2)
+        bar_close = np.take_along_axis(close, last[..., None], axis=2)[..., 0]
+        valid = present.any(axis=2)
+
+        day_of_bar, slot_of_bar = np.nonzero(valid)
+        return {
+            'day': day_of_bar, 'slot': slot_of_bar,
+            'high': bar_high[valid], 'low': bar_low[valid], 'close': bar_close[valid],
+        }
+
+    # --- Signals ---
+
+    def _signals(self, bars):
+        close, high, low = bars['close'], bars['high'], bars['low']
+        sma = _rolling_mean(close, self.sma_length)
+        willr = _willr(high, low, close, self.willr_length)
+        up, down = fractal_flags(high, low, self.fractal_length)
+        last_up, last_down = jit_kernels.confirm_fractals(up, down, high, low, self.fractal_length)
+
+        prev_willr = np.r_[np.nan, willr[:-1]]
+        long_sig = (close > sma) & (prev_willr <= self.up_rejection_level) & (willr > self.up_rejection_level)
+        short_sig = (close < sma) & (prev_willr >= self.down_rejection_level) & (willr < self.down_rejection_level)
+        has_levels = ~np.isnan(last_up) & ~np.isnan(last_down)
+        within_risk = np.abs(last_up - last_down) <= self.max_sl_points
+
+        sig = np.flatnonzero((long_sig | short_sig) & has_levels & within_risk)
+        direction = np.where(long_sig[sig], 1, -1)
+        return {
+            'bar': sig,
+            'direction': direction,
+            'breakout': np.where(direction == 1, last_up[sig], last_down[sig]),
+            'stop': np.where(direction == 1, last_down[sig], last_up[sig]),
+            'willr': willr,
+        }
+
+    # --- Vectorized path resolution ---
+
+    def _resolve(self, days, matrices, bars, signals):
+        tf = self.trading_timeframe
+        day = bars['day'][signals['bar']]
+        direction = signals['direction']
+        dir_col = direction[:, None]
+        start = (bars['slot'][signals['bar']] + 1) * tf
+
+        # Signed paths: "favourable" / "adverse" extreme of the index for each candidate
+        high, low = matrices['high'][day], matrices['low'][day]
+        favourable = np.where(dir_col == 1, high, -low)
+        adverse = np.where(dir_col == 1, low, -high)
+        level = (direction * signals['breakout'])[:, None]
+        stop_level = (direction * signals['stop'])[:, None]
+
+        with np.errstate(invalid='ignore'):
+            entry = _first_hit(favourable > level, start)
+            price_cancel = _first_hit(adverse < stop_level, start)
+
+            # WILLR cancellation takes effect from the close of the offending bar
+            willr_day = np.full((len(days), SESSION_MINUTES // tf), np.nan)
+            willr_day[bars['day'], bars['slot']] = signals['willr']
+            willr_rows = willr_day[day]
+            cancel_bar = np.where(dir_col == 1, willr_rows < self.willr_cancel_level,
+                                  willr_rows > self.willr_cancel_level)
+            willr_hit = _first_hit(cancel_bar, bars['slot'][signals['bar']] + 1)
+            willr_cancel = np.where(willr_hit < NO_HIT, (willr_hit + 1) * tf, NO_HIT)
+
+        cancel = np.minimum(price_cancel, willr_cancel)
+        triggered = entry < cancel
+        resolved_at = np.where(triggered, entry, cancel)
+
+        # Exit paths, expressed as premium levels: P = P0 + delta * signed index move
+        p0, delta = self.entry_premium, self.delta
+        entry_index = level
+        best = p0 + delta * (favourable - entry_index)
+        worst = p0 + delta * (adverse - entry_index)
+
+        # EOD exits use the last close before 15:15
+        close = matrices['close'][day][:, :EOD_EXIT_MINUTE]
+        last_seen = np.maximum.accumulate(np.where(np.isnan(close), -1, np.arange(EOD_EXIT_MINUTE)), axis=1)[:, -1]
+        eod_index = direction * close[np.arange(len(day)), np.maximum(last_seen, 0)]
+        eod_premium = np.maximum(p0 + delta * (eod_index - entry_index[:, 0]), 0.05)
+
+        return {
+            'day': day, 'start': start, 'direction': direction,
+            'entry': entry, 'triggered': triggered, 'resolved_at': resolved_at,
+            'entry_index': signals['breakout'],
+            'best': best, 'worst': worst,
+            'eod_premium': eod_premium,
+        }
+
+    def _trade_legs(self, paths, k, trade_lots):
+        """
+        One trade's partial and final exits, from jit_kernels.simulate_exits over its
+        minute path. Each minute is walked as worst, best, worst premium: a stop and a
+        target in the same minute resolve to the stop, and a partial exit's trailed SL
+        can still be hit within its minute. Exits fill at the TP / SL levels.
+        """
+        p0 = self.entry_premium
+        risk = p0 * self.sl_pct
+        exit_start = min(paths['entry'][k] + 1, SESSION_MINUTES - 1)
+        minutes = np.arange(exit_start, max(exit_start, EOD_EXIT_MINUTE))
+        worst, best = paths['worst'][k][minutes], paths['best'][k][minutes]
+        # The premium model can go below zero; the floor keeps those minutes on the path
+        path = np.maximum(np.stack([worst, best, worst], axis=1).ravel(), 0.05)
+        prices = np.r_[path, paths['eod_premium'][k]]
+        eod = np.zeros(len(prices), dtype=bool)
+        eod[-1] = True
+
+        tp_levels = np.array([p0 + risk * r for r in TradeManager.take_profit_multiples(trade_lots)])
+        exit_index, exit_price, exit_reason = jit_kernels.simulate_exits(prices, eod, p0, tp_levels,
+                                                                         1 - self.sl_pct, fill_at_level=True)
+        legs = []
+        for lot in range(len(tp_levels)):
+            i = exit_index[lot]
+            # Still open (no EOD price for the day) is booked as the EOD exit
+            minute = EOD_EXIT_MINUTE if i < 0 or i == len(path) else minutes[i // 3]
+            leg = (minute, exit_price[lot], 1, jit_kernels.EXIT_REASONS.get(exit_reason[lot], "End of day exit"))
+            if legs and legs[-1][0] == leg[0] and legs[-1][3] == leg[3]:
+                legs[-1] = (minute, exit_price[lot], legs[-1][2] + 1, leg[3])
+            else:
+                legs.append(leg)
+        return legs
+
+    # --- Sequential bookkeeping over the (few) candidates ---
+
+    def run(self, start, end):
+        """
+        Backtests [start, end] and returns (trades DataFrame, daily summary DataFrame).
+        """
+        t0 = time.perf_counter()
+        days, matrices = self._day_matrices(start, end)
+        bars = self._trading_bars(matrices)
+        signals = self._signals(bars)
+        paths = self._resolve(days, matrices, bars, signals)
+        t_vector = time.perf_counter() - t0
+
+        capital = self.starting_capital
+        trades, daily = [], {}
+        busy_until = (-1, -1)  # (day, minute) until which the strategy is armed or in a trade
+        current_day, daily_pnl, daily_limit, halted = None, 0.0, 0.0, False
+
+        for k in range(len(paths['day'])):
+            d, start_min = paths['day'][k], paths['start'][k]
+            if start_min >= SESSION_MINUTES or (d, start_min) <= busy_until:
+                continue
+            if d != current_day:
+                current_day, daily_pnl, halted = d, 0.0, False
+                daily_limit = -self.daily_loss_pct * capital
+
+            session_open = pd.Timestamp(days[d]) + pd.Timedelta(minutes=MARKET_OPEN_MINUTE)
+            if not paths['triggered'][k]:
+                busy_until = (d, paths['resolved_at'][k])
+                continue
+
+            entry_at = paths['entry'][k]
+            weekday = session_open.weekday()
+            if entry_at >= EOD_EXIT_MINUTE or halted or weekday == 0:
+                halted = halted or weekday == 0
+                busy_until = (d, entry_at)
+                continue
+
+            trade_lots = 1 if weekday == 2 else TradeManager.lots_for_capital(capital)
+            legs = self._trade_legs(paths, k, trade_lots)
+            pnl = 0.0
+            for _, premium, lots, _ in legs:
+                pnl += (premium - self.entry_premium) * self.lot_size * lots - self.brokerage_per_lot / trade_lots * lots
+            exit_at, exit_premium, _, reason = legs[-1]
+            busy_until = (d, exit_at)
+
+            daily_pnl += pnl
+            capital += pnl
+            halted = halted or daily_pnl <= daily_limit
+            daily[days[d]] = daily.get(days[d], 0.0) + pnl
+            trades.append({
+                'entry_time': session_open + pd.Timedelta(minutes=int(entry_at)),
+                'exit_time': session_open + pd.Timedelta(minutes=int(exit_at)),
+                'type': 'long' if paths['direction'][k] == 1 else 'short',
+                'index_entry': paths['entry_index'][k],
+                'actual_entry_price': self.entry_premium,
+                'exit_price': exit_premium,
+                'initial_lots': trade_lots,
+                'pnl': pnl,
+                'exit_reason': reason,
+            })
+
+        trades_df = pd.DataFrame(trades)
+        daily_df = pd.DataFrame({'date': list(daily.keys()), 'pnl': list(daily.values())})
+        print(f"--- Vector backtest: {len(days)} days, {len(bars['close'])} bars, {len(paths['day'])} signals, "
+              f"{len(trades_df)} trades (vectorized pass {t_vector:.2f}s, total {time.perf_counter() - t0:.2f}s) ---")
+        return trades_df, daily_df
+
+    def candidate_days(self, start, end):
+        """Dates with at least one simulated trade, for tick-level confirmation."""
+        trades_df, _ = self.run(start, end)
+        if trades_df.empty:
+            return []
+        return sorted(set(trades_df['entry_time'].dt.date))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized bar-level backtest over the 1-minute HDF history.")
+    parser.add_argument('--start', required=True, help="First date, YYYY-MM-DD.")
+    parser.add_argument('--end', required=True, help="Last date, YYYY-MM-DD.")
+    parser.add_argument('--premium', type=float, default=120.0, help="Assumed option premium at entry.")
+    parser.add_argument('--delta', type=float, default=0.5, help="Assumed option delta.")
+    parser.add_argument('--capital', type=float, default=25000.0, help="Starting capital.")
+    parser.add_argument('--archive', help="Read bars from a bar_archive directory instead of index_data.h5.")
+    args = parser.parse_args()
+
+    config_path = os.path.join(os.path.dirname(__file__), '..', '01_bot_configuration', 'file_folder_configuration.txt')
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    hdf_file_path = os.path.join(config['hdf_files_folder'], 'index_data.h5')
+
+    if args.archive:
+        bar_cache = HistoricalBarCache.from_archive(BarArchive(args.archive), 'NSE:NIFTY50-INDEX')
+    else:
+        bar_cache = get_bar_cache(hdf_file_path)
+    backtester = VectorBacktester(bar_cache, entry_premium=args.premium,
+                                  delta=args.delta, starting_capital=args.capital)
+    trades_df, daily_df = backtester.run(args.start, pd.Timestamp(args.end) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+    if trades_df.empty:
+        print("No trades.")
+        sys.exit(0)
+    print(trades_df.to_string(index=False))
+    print(f"\nTotal P&L: {trades_df['pnl'].sum():.2f} over {len(daily_df)} trading days with trades")